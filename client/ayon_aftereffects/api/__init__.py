@@ -8,10 +8,20 @@ from .ws_stub import (
     get_stub,
 )
 
+from .ws_stub_async import (
+    get_async_stub,
+)
+
+from .render_progress import (
+    register_render_progress_callback,
+    unregister_render_progress_callback,
+)
+
 from .pipeline import (
     AfterEffectsHost,
     ls,
-    containerise
+    containerise,
+    containerise_many,
 )
 
 from .lib import (
@@ -30,10 +40,18 @@ __all__ = [
     # ws_stub
     "get_stub",
 
+    # ws_stub_async
+    "get_async_stub",
+
+    # render_progress
+    "register_render_progress_callback",
+    "unregister_render_progress_callback",
+
     # pipeline
     "AfterEffectsHost",
     "ls",
     "containerise",
+    "containerise_many",
 
     # lib
     "maintained_selection",
@@ -78,16 +78,19 @@ function main(websocket_url){
     }
     RPC = new WSRPC(websocket_url, 5000); // spin connection
 
+    // ping on every (re)connect, wakes up calls waiting for client
+    RPC.addEventListener('onconnect', function () {
+        RPC.call('AfterEffects.ping').then(function (data) {
+            log.warn('Result for calling server route "ping": ', data);
+        }, function (error) {
+            log.warn(error);
+        });
+    });
+
     RPC.connect();
 
     log.warn("connected");
 
-    RPC.call('AfterEffects.ping').then(function (data) {
-        log.warn('Result for calling server route "ping": ', data);
-    }, function (error) {
-        log.warn(error);
-    });
-
     RPC.addRoute('AfterEffects.open', function (data) {
         log.warn('Server called client route "open":', data);
         var escapedPath = EscapeStringForJSX(data.path);
@@ -117,6 +120,16 @@ function main(websocket_url){
             });
     });
 
+    RPC.addRoute('AfterEffects.get_project_generation', function (data) {
+        log.warn('Server called client route "get_project_generation":',
+                 data);
+        return runEvalScript("getProjectGeneration()")
+            .then(function(result){
+                log.warn("get_project_generation: " + result);
+                return result;
+            });
+    });
+
     RPC.addRoute('AfterEffects.get_active_document_name', function (data) {
         log.warn('Server called client route ' +
             '"get_active_document_name":', data);
@@ -152,7 +165,9 @@ function main(websocket_url){
         log.warn('Server called client route "get_items":', data);
         return runEvalScript("getItems("  + data.comps + "," +
                                             data.folders + "," +
-                                            data.footages + ")")
+                                            data.footages + "," +
+                                 JSON.stringify(data.fields || null) + "," +
+                                 JSON.stringify(data.ids || null) + ")")
             .then(function(result){
                 log.warn("get_items: " + result);
                 return result;
@@ -173,7 +188,8 @@ function main(websocket_url){
         log.warn('Server called client route "get_selected_items":', data);
         return runEvalScript("getSelectedItems(" + data.comps + "," +
                                                    data.folders + "," +
-                                                   data.footages  + ")")
+                                                   data.footages  + "," +
+                                 JSON.stringify(data.fields || null) + ")")
             .then(function(result){
                 log.warn("get_items: " + result);
                 return result;
@@ -205,6 +221,18 @@ function main(websocket_url){
             });
     });
 
+    RPC.addRoute('AfterEffects.set_proxy', function (data) {
+        log.warn('Server called client route "set_proxy":', data);
+        var escapedPath = EscapeStringForJSX(data.path);
+        return runEvalScript("setProxy(" + data.item_id + ", " +
+                                   "'" + escapedPath + "', " +
+                                   data.is_sequence + ")")
+            .then(function(result){
+                log.warn("setProxy: " + result);
+                return result;
+            });
+    });
+
     RPC.addRoute('AfterEffects.rename_item', function (data) {
         log.warn('Server called client route "rename_item":', data);
         return runEvalScript("renameItem(" + data.item_id + ", " +
@@ -226,7 +254,8 @@ function main(websocket_url){
 
     RPC.addRoute('AfterEffects.imprint', function (data) {
         log.warn('Server called client route "imprint":', data);
-        var escaped = data.payload.replace(/\n/g, "\\n");
+        var escaped = EscapeStringForJSX(data.payload)
+            .replace(/\n/g, "\\n");
         return runEvalScript("imprint('" + escaped +"')")
             .then(function(result){
                 log.warn("imprint: " + result);
@@ -234,6 +263,16 @@ function main(websocket_url){
             });
     });
 
+    RPC.addRoute('AfterEffects.imprint_patches', function (data) {
+        log.warn('Server called client route "imprint_patches":', data);
+        return runEvalScript("imprintPatches(" +
+                             JSON.stringify(data.patches) + ")")
+            .then(function(result){
+                log.warn("imprint_patches: " + result);
+                return result;
+            });
+    });
+
     RPC.addRoute('AfterEffects.set_label_color', function (data) {
         log.warn('Server called client route "set_label_color":', data);
         return runEvalScript("setLabelColor(" + data.item_id + "," +
@@ -320,7 +359,8 @@ function main(websocket_url){
         log.warn('Server called client route "reload_background":', data);
         return runEvalScript("reloadBackground(" + data.comp_id + ", " +
                                                "'" + data.comp_name + "', " +
-                                               JSON.stringify(data.files) + ")")
+                                               JSON.stringify(data.files) + ", " +
+                                               JSON.stringify(data.unchanged_files || []) + ")")
             .then(function(result){
                 log.warn("reloadBackground: " + result);
                 return result;
@@ -374,13 +414,61 @@ function main(websocket_url){
    RPC.addRoute('AfterEffects.render', function (data) {
     log.warn('Server called client route "render":', data);
     var escapedPath = EscapeStringForJSX(data.folder_url);
+    var stopProgress = watchRenderProgress(
+        data.folder_url, data.comp_id, data.frames_total, data.extension);
     return runEvalScript("render('" + escapedPath +"', " + data.comp_id + ")")
         .then(function(result){
+            stopProgress();
             log.warn("render: " + result);
             return result;
         });
     });
 
+    RPC.addRoute('AfterEffects.get_render_instances_info', function (data) {
+        log.warn('Server called client route "get_render_instances_info":', data);
+        return runEvalScript("getRenderInstancesInfo(" +
+                             JSON.stringify(data.comp_ids) + ")")
+            .then(function(result){
+                log.warn("get_render_instances_info: " + result);
+                return result;
+            });
+    });
+
+    RPC.addRoute('AfterEffects.get_render_fingerprints', function (data) {
+        log.warn('Server called client route "get_render_fingerprints":', data);
+        return runEvalScript("getRenderFingerprints(" +
+                             JSON.stringify(data.comp_ids) + ")")
+            .then(function(result){
+                log.warn("get_render_fingerprints: " + result);
+                return result;
+            });
+    });
+
+    RPC.addRoute('AfterEffects.render_many', function (data) {
+        log.warn('Server called client route "render_many":', data);
+        var stopProgress = data.items.map(function(item){
+            return watchRenderProgress(
+                item.folder, item.comp_id, item.frames_total, item.extension);
+        });
+        return runEvalScript("renderMany(" + JSON.stringify(data.items) + ")")
+            .then(function(result){
+                stopProgress.forEach(function(stop){
+                    stop();
+                });
+                log.warn("render_many: " + result);
+                return result;
+            });
+    });
+
+    RPC.addRoute('AfterEffects.batch', function (data) {
+        log.warn('Server called client route "batch":', data);
+        return runEvalScript("batch(" + JSON.stringify(data.operations) + ")")
+            .then(function(result){
+                log.warn("batch: " + result);
+                return result;
+            });
+    });
+
     RPC.addRoute('AfterEffects.get_extension_version', function (data) {
       log.warn('Server called client route "get_extension_version":', data);
       return get_extension_version();
@@ -456,6 +544,93 @@ function EscapeStringForJSX(str){
     return str.replace(/\\/g, '\\\\').replace(/'/g, "\\'").replace(/"/g,'\\"');
 }
 
+var RENDER_PROGRESS_INTERVAL_MS = 1000;
+
+function watchRenderProgress(folder, comp_id, frames_total, extension){
+    /**
+     * Polls 'folder' while composition is rendering, pushes progress to
+     * 'AfterEffects.render_progress' route on server.
+     *
+     * Files already present before render are ignored, each new file is
+     * considered as single finished frame.
+     *
+     * Returns:
+     *    (function): stops polling and sends final event
+     */
+    var suffix = extension ? "." + extension : null;
+    var startTime = Date.now();
+    var finishedFrames = [];
+    var reported = 0;
+
+    function listFiles(){
+        var result = window.cep.fs.readdir(folder);
+        if (result.err !== 0){
+            return [];
+        }
+        return result.data.filter(function(fileName){
+            return !suffix || fileName.endsWith(suffix);
+        });
+    }
+
+    var known = new Set(listFiles());
+
+    function sendProgress(finished){
+        var now = Date.now();
+        listFiles().forEach(function(fileName){
+            if (known.has(fileName)){
+                return;
+            }
+            known.add(fileName);
+            var match = fileName.match(/(\d+)\.[^.]+$/);
+            finishedFrames.push({
+                "frame": match ? parseInt(match[1], 10) : null,
+                "time_ms": now - startTime
+            });
+        });
+        if (!finished && finishedFrames.length == reported){
+            return;
+        }
+
+        var framesDone = finishedFrames.length;
+        var elapsed = now - startTime;
+        var remaining = null;
+        if (frames_total && framesDone > 0){
+            // intervals between frames, other comps might render before
+            var perFrame = elapsed / framesDone;
+            if (framesDone > 1){
+                perFrame = (finishedFrames[framesDone - 1].time_ms -
+                            finishedFrames[0].time_ms) / (framesDone - 1);
+            }
+            remaining = Math.max(frames_total - framesDone, 0) * perFrame;
+        }
+        var newFrames = finishedFrames.slice(reported);
+        reported = framesDone;
+        var lastFrame = framesDone ? finishedFrames[framesDone - 1].frame : null;
+
+        RPC.call('AfterEffects.render_progress', {
+            "comp_id": comp_id,
+            "frames_done": framesDone,
+            "frames_total": frames_total || null,
+            "current_frame": lastFrame,
+            "elapsed_ms": elapsed,
+            "remaining_ms": remaining,
+            "finished_frames": newFrames,
+            "finished": finished
+        }).then(null, function (error) {
+            log.warn(error);
+        });
+    }
+
+    var timer = setInterval(function(){
+        sendProgress(false);
+    }, RENDER_PROGRESS_INTERVAL_MS);
+
+    return function(){
+        clearInterval(timer);
+        sendProgress(true);
+    };
+}
+
 function runEvalScript(script) {
     // because of asynchronous nature of functions in jsx
     // this waits for response
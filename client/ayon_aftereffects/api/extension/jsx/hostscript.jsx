@@ -18,6 +18,42 @@ if(!Array.prototype.indexOf) {
         };
 }
 
+// Project state generation, changed by every mutating call, Python side
+// uses it to decide if cached metadata and items are still valid.
+// Session id differentiates reloads of this script.
+var _ayonSessionId = new Date().getTime().toString(36);
+var _ayonGeneration = 0;
+
+function _bumpGeneration(){
+    _ayonGeneration += 1;
+}
+
+function getProjectGeneration(){
+    /**
+     * Returns stamp of current project state.
+     *
+     * Stamp changes with every mutating call of this extension, with
+     * count of project items (artist added or removed items) or when
+     * different project is opened.
+     *
+     * Returns:
+     *     (str): json {"result": "STAMP"}
+     */
+    return _prepareSingleValue(_getGenerationStamp());
+}
+
+// prefix of compressed metadata, see 'metadata_format.py'
+var METADATA_COMPRESSED_PREFIX = "ayon-zlib-v1:";
+
+function _getGenerationStamp(){
+    var project_path = "";
+    if (app.project.file){
+        project_path = app.project.file.fsName;
+    }
+    return _ayonSessionId + ":" + _ayonGeneration + ":" +
+        app.project.numItems + ":" + project_path;
+}
+
 function sayHello(){
     alert("hello from ExtendScript");
 }
@@ -29,6 +65,7 @@ function runJsxFile(path){
      * Args:
      *     path (string): Absolute path to jsx.
      */
+    _bumpGeneration();
     var jsxFile = new File(path);
     if (!jsxFile.exists){
         return _prepareError("JSX file not found: " + path);
@@ -79,6 +116,7 @@ function imprint(payload){
      * Args:
      *     payload (string): json content
      */
+    _bumpGeneration();
     if (ExternalObject.AdobeXMPScript === undefined){
         ExternalObject.AdobeXMPScript =
             new ExternalObject('lib:AdobeXMPScript');
@@ -95,11 +133,150 @@ function imprint(payload){
 
 }
 
+function imprintPatches(patches){
+    /**
+     * Applies 'patches' to list stored in 'Label' field of project's metadata
+     *
+     * Stored list is parsed and written back only once for all patches.
+     * Entries whose first member is not existing item anymore are removed.
+     * Compressed metadata are not touched, {"encoded": true} is returned.
+     *
+     * Patch 'match' decides which entries are matched by 'key':
+     *     "item" - first member is 'key' or 'instance_id' is 'key'
+     *     "instance" - 'instance_id' (or legacy 'uuid') is 'key'
+     *
+     * Args:
+     *     patches (list): of {"op": "upsert"|"delete", "match": "item"|
+     *         "instance", "key": ID, "data": {}}, "data" only for "upsert"
+     * Returns:
+     *     (str): json {"result": {"previous_generation": STAMP,
+     *                             "generation": STAMP, "pruned": COUNT}}
+     */
+    var previous_generation = _getGenerationStamp();
+    _bumpGeneration();
+    if (ExternalObject.AdobeXMPScript === undefined){
+        ExternalObject.AdobeXMPScript =
+            new ExternalObject('lib:AdobeXMPScript');
+    }
+
+    var meta = new XMPMeta(app.project.xmpPacket);
+    var schemaNS = XMPMeta.getNamespaceURI("xmp");
+    var label = "xmp:Label";
+
+    var entries = [];
+    if (meta.doesPropertyExist(schemaNS, label)){
+        var stored = meta.getProperty(schemaNS, label).value;
+        if (stored.indexOf(METADATA_COMPRESSED_PREFIX) === 0){
+            // compressed metadata are patched on Python side
+            return _prepareSingleValue({"encoded": true});
+        }
+        try{
+            entries = JSON.parse(stored);
+        } catch (error) {
+            return _prepareError("Stored metadata are not valid JSON: " +
+                                 error.toString());
+        }
+    }
+
+    var positions = {};
+    function register(key, position){
+        if (!positions.hasOwnProperty(key)){
+            positions[key] = [];
+        }
+        positions[key].push(position);
+    }
+    function registerEntry(position){
+        var entry = entries[position];
+        if (entry.members && entry.members.length){
+            register("m:" + String(entry.members[0]), position);
+        }
+        if (entry.instance_id){
+            register("i:" + entry.instance_id, position);
+        }
+        var instance_key = entry.instance_id || entry.uuid;
+        if (instance_key){
+            register("k:" + instance_key, position);
+        }
+    }
+    function getPositions(key){
+        return positions.hasOwnProperty(key) ? positions[key] : [];
+    }
+
+    for (var entry_idx = 0; entry_idx < entries.length; entry_idx++){
+        registerEntry(entry_idx);
+    }
+
+    for (var patch_idx = 0; patch_idx < patches.length; patch_idx++){
+        var patch = patches[patch_idx];
+        var matched = [];
+        if (patch.match == "instance"){
+            matched = getPositions("k:" + patch.key);
+        } else {
+            matched = getPositions("m:" + String(patch.key));
+            if (typeof patch.key == "string"){
+                matched = matched.concat(getPositions("i:" + patch.key));
+            }
+        }
+
+        var found = false;
+        for (var match_idx = 0; match_idx < matched.length; match_idx++){
+            var position = matched[match_idx];
+            if (entries[position] === null){  // already deleted
+                continue;
+            }
+            found = true;
+            if (patch.op == "delete"){
+                entries[position] = null;
+            } else {
+                for (var key in patch.data){
+                    if (patch.data.hasOwnProperty(key)){
+                        entries[position][key] = patch.data[key];
+                    }
+                }
+            }
+        }
+
+        if (!found && patch.op == "upsert"){
+            entries.push(patch.data);
+            registerEntry(entries.length - 1);
+        }
+    }
+
+    var cleaned = [];
+    var pruned = 0;
+    for (entry_idx = 0; entry_idx < entries.length; entry_idx++){
+        var entry = entries[entry_idx];
+        if (entry === null){
+            continue;
+        }
+        // do not keep entries with nonexistent item id
+        if (entry.members && entry.members.length){
+            var item = null;
+            try{
+                item = app.project.itemByID(parseInt(entry.members[0]));
+            } catch (error) {}
+            if (!item){
+                pruned += 1;
+                continue;
+            }
+        }
+        cleaned.push(entry);
+    }
+
+    meta.setProperty(schemaNS, label, JSON.stringify(cleaned));
+    app.project.xmpPacket = meta.serialize();
+
+    return _prepareSingleValue({"previous_generation": previous_generation,
+                                "generation": _getGenerationStamp(),
+                                "pruned": pruned});
+}
+
 
 function fileOpen(path){
     /**
      * Opens (project) file on 'path'
      */
+    _bumpGeneration();
     fp = new File(path);
     return _prepareSingleValue(app.open(fp))
 }
@@ -148,6 +325,7 @@ function addItem(name, item_type){
      * Returns:
      *      SingleItemValue: eg {"result": VALUE}
      */
+    _bumpGeneration();
     if (item_type == "COMP"){
         // dummy values, will be rewritten later
         item = app.project.items.addComp(name, 1920, 1060, 1, 10, 25);
@@ -160,7 +338,7 @@ function addItem(name, item_type){
 
 }
 
-function getItems(comps, folders, footages){
+function getItems(comps, folders, footages, fields, ids){
     /**
      * Returns JSON representation of compositions and
      * if 'collectLayers' then layers in comps too.
@@ -169,21 +347,42 @@ function getItems(comps, folders, footages){
      *     comps (bool): return selected compositions
      *     folders (bool): return folders
      *     footages (bool): return FootageItem
+     *     fields (list): names of returned properties, all if empty,
+     *         'id' is returned always
+     *     ids (list): return only items with these ids, all if empty
      * Returns:
      *     (list) of JSON items
      */
-    var items = []
+    var items = [];
+    var ret;
+    if (ids && ids.length){
+        for (var id_idx = 0; id_idx < ids.length; id_idx++){
+            var id_item = null;
+            try{
+                id_item = app.project.itemByID(parseInt(ids[id_idx]));
+            } catch (error) {}
+            if (!id_item){
+                continue;
+            }
+            ret = _getItem(id_item, comps, folders, footages, fields);
+            if (ret){
+                items.push(ret);
+            }
+        }
+        return JSON.stringify(items);
+    }
+
     for (i = 1; i <= app.project.items.length; ++i){
         var item = app.project.items[i];
         if (!item){
             continue;
         }
-        var ret = _getItem(item, comps, folders, footages);
+        ret = _getItem(item, comps, folders, footages, fields);
         if (ret){
             items.push(ret);
         }
     }
-    return '[' + items.join() + ']';
+    return JSON.stringify(items);
 
 }
 
@@ -205,7 +404,7 @@ function selectItems(items){
 
 }
 
-function getSelectedItems(comps, folders, footages){
+function getSelectedItems(comps, folders, footages, fields){
     /**
      * Returns list of selected items from Project menu
      *
@@ -213,6 +412,7 @@ function getSelectedItems(comps, folders, footages){
      *     comps (bool): return selected compositions
      *     folders (bool): return folders
      *     footages (bool): return FootageItem
+     *     fields (list): names of returned properties, all if empty
      * Returns:
      *     (list) of JSON items
      */
@@ -222,56 +422,78 @@ function getSelectedItems(comps, folders, footages){
         if (!item){
             continue;
         }
-        var ret = _getItem(item, comps, folders, footages);
+        var ret = _getItem(item, comps, folders, footages, fields);
         if (ret){
             items.push(ret);
         }
     }
-    return '[' + items.join() + ']';
+    return JSON.stringify(items);
 }
 
-function _getItem(item, comps, folders, footages){
+function _getItem(item, comps, folders, footages, fields){
     /**
      * Auxiliary function as project items and selections
      * are indexed in different way :/
-     * Refactor
+     *
+     * Only requested 'fields' are computed, null is returned for items
+     * filtered out by type.
      */
     var item_type = '';
-    var path = '';
-    var containing_comps = [];
     if (item instanceof FolderItem){
         item_type = 'folder';
         if (!folders){
-            return "{}";
+            return null;
         }
     }
     if (item instanceof FootageItem){
         if (!footages){
-            return "{}";
+            return null;
         }
         item_type = 'footage';
-        if (item.file){
-            path = item.file.fsName;
-        }
-        if (item.usedIn){
-            for (j = 0; j < item.usedIn.length; ++j){
-                containing_comps.push(item.usedIn[j].id);
-            }
-        }
     }
     if (item instanceof CompItem){
         item_type = 'comp';
         if (!comps){
-            return "{}";
+            return null;
         }
     }
 
-    var item = {"name": item.name,
-                "id": item.id,
-                "type": item_type,
-                "path": path,
-                "containing_comps": containing_comps};
-    return JSON.stringify(item);
+    function wanted(field){
+        return !fields || !fields.length || fields.indexOf(field) > -1;
+    }
+
+    var ret = {"id": item.id};
+    if (wanted("name")){
+        ret["name"] = item.name;
+    }
+    if (wanted("type")){
+        ret["type"] = item_type;
+    }
+    if (wanted("path")){
+        var path = '';
+        if (item_type == 'footage' && item.file){
+            path = item.file.fsName;
+        }
+        ret["path"] = path;
+    }
+    if (wanted("containing_comps")){
+        var containing_comps = [];
+        if (item_type == 'footage' && item.usedIn){
+            for (var used_idx = 0; used_idx < item.usedIn.length; ++used_idx){
+                containing_comps.push(item.usedIn[used_idx].id);
+            }
+        }
+        ret["containing_comps"] = containing_comps;
+    }
+    if (wanted("frames_count")){
+        // only image sequences, 0 for single files
+        var frames_count = 0;
+        if (item_type == 'footage' && isFileSequence(item)){
+            frames_count = Math.round(item.duration * item.frameRate);
+        }
+        ret["frames_count"] = frames_count;
+    }
+    return ret;
 }
 
 function importFile(path, item_name, import_options){
@@ -285,6 +507,7 @@ function importFile(path, item_name, import_options){
      * Returns:
      *    JSON {name, id}
      */
+    _bumpGeneration();
     var comp;
     var ret = {};
     try{
@@ -374,6 +597,7 @@ function replaceItem(item_id, path, item_name){
      *    path (string): absolute path to new file
      *    item_name (string): new composition name
      */
+    _bumpGeneration();
     app.beginUndoGroup("Replace File");
 
     fp = new File(path);
@@ -401,6 +625,42 @@ function replaceItem(item_id, path, item_name){
     app.endUndoGroup();
 }
 
+function setProxy(item_id, path, is_sequence){
+    /**
+     * Attaches file (or sequence starting by it) as proxy of footage item
+     * and enables it.
+     *
+     * Args:
+     *    item_id (int): id of FootageItem
+     *    path (string): absolute path to proxy file
+     *    is_sequence (bool): 'path' is first frame of image sequence
+     */
+    _bumpGeneration();
+    var item = app.project.itemByID(item_id);
+    if (!(item instanceof FootageItem)){
+        return _prepareError("There is no footage item with "+ item_id);
+    }
+    var fp = new File(path);
+    if (!fp.exists){
+        return _prepareError("File " + path + " not found.");
+    }
+
+    app.beginUndoGroup("Set Proxy");
+    try{
+        if (is_sequence){
+            item.setProxyWithSequence(fp, false);
+        }else{
+            item.setProxy(fp);
+        }
+        item.useProxy = true;
+    } catch (error) {
+        return _prepareError(error.toString() + path);
+    } finally {
+        fp.close();
+        app.endUndoGroup();
+    }
+}
+
 function renameItem(item_id, new_name){
     /**
      * Renames item with 'item_id' to 'new_name'
@@ -409,6 +669,7 @@ function renameItem(item_id, new_name){
      *    item_id (int): id to search item
      *    new_name (str)
      */
+    _bumpGeneration();
     var item = app.project.itemByID(item_id);
     if (item){
         item.name = new_name;
@@ -424,6 +685,7 @@ function deleteItem(item_id){
      *  Not restricted only to comp, it could delete
      *  any item with 'id'
      */
+    _bumpGeneration();
     var item = app.project.itemByID(item_id);
     if (item){
         item.remove();
@@ -516,6 +778,7 @@ function saveAs(path){
     /**
      *   Saves current project as 'path'
      * */
+    _bumpGeneration();
     app.project.save(fp = new File(path));
 }
 
@@ -599,6 +862,273 @@ function getRenderInfo(comp_id){
     return '[' + output_metadata.join() + ']';
 }
 
+function getRenderInstancesInfo(comp_ids){
+    /**
+     * Composition properties and render queue info of multiple comps.
+     *
+     * Bulk version of 'getCompProperties' and 'getRenderInfo', render
+     * queue is indexed by composition id only once.
+     *
+     * Args:
+     *    comp_ids (list): of int
+     * Returns:
+     *    (str): JSON {comp_id: {"comp": dict|null,
+     *                            "render_queue": [{file_name, width, height}],
+     *                            "error": str (only if render queue is
+     *                                          not usable)}}
+     */
+    var requested = {};
+    for (var compIdx = 0; compIdx < comp_ids.length; compIdx++){
+        requested[comp_ids[compIdx]] = true;
+    }
+
+    var result = {};
+    var renderItemsByComp = {};
+    try{
+        // duplicating and removing items shifts indexes, collect them first
+        var renderItems = [];
+        for (var rqIdx = 1; rqIdx <= app.project.renderQueue.numItems; ++rqIdx){
+            renderItems.push(app.project.renderQueue.item(rqIdx));
+        }
+
+        for (var renderIdx = 0; renderIdx < renderItems.length; renderIdx++){
+            var render_item = renderItems[renderIdx];
+            var item_comp_id = render_item.comp.id;
+            if (!requested[item_comp_id]){
+                continue;
+            }
+            // same as in 'getRenderInfo', DONE item cannot be changed
+            if (render_item.status == RQItemStatus.DONE){
+                var original_file_names = [];
+                for (var omIdx = 1; omIdx <= render_item.numOutputModules; ++omIdx){
+                    original_file_names.push(render_item.outputModule(omIdx).file);
+                }
+                var new_item = render_item.duplicate();
+                render_item.remove();
+                render_item = new_item;
+                for (var newOmIdx = 1; newOmIdx <= render_item.numOutputModules; ++newOmIdx){
+                    if (original_file_names.length > newOmIdx - 1){
+                        render_item.outputModule(newOmIdx).file =
+                            original_file_names[newOmIdx - 1];
+                    }
+                }
+            }
+            if (!renderItemsByComp[item_comp_id]){
+                renderItemsByComp[item_comp_id] = [];
+            }
+            renderItemsByComp[item_comp_id].push(render_item);
+        }
+    } catch (error) {
+        return _prepareError("There is no render queue, create one");
+    }
+
+    for (var infoIdx = 0; infoIdx < comp_ids.length; infoIdx++){
+        var comp_id = comp_ids[infoIdx];
+        var comp = app.project.itemByID(comp_id);
+        if (!comp || !(comp instanceof CompItem)){
+            result[comp_id] = {"comp": null, "render_queue": []};
+            continue;
+        }
+
+        var info = {
+            "comp": {
+                "id": comp.id,
+                "name": comp.name,
+                "frameStart": comp.displayStartFrame,
+                "framesDuration": comp.duration * comp.frameRate,
+                "frameRate": comp.frameRate,
+                "width": comp.width,
+                "height": comp.height,
+                "pixelAspect": comp.pixelAspect
+            },
+            "render_queue": []
+        };
+
+        var compRenderItems = renderItemsByComp[comp_id] || [];
+        if (compRenderItems.length > 1){
+            info["error"] = "There cannot be more items in Render Queue for '" + comp.name + "'!";
+        } else if (compRenderItems.length == 0){
+            info["error"] = "There is no item in Render Queue for '" + comp.name + "'! Add composition to Render Queue.";
+        } else {
+            var comp_render_item = compRenderItems[0];
+            for (var outIdx = 1; outIdx <= comp_render_item.numOutputModules; ++outIdx){
+                info["render_queue"].push({
+                    "file_name": comp_render_item.outputModule(outIdx).file.toString(),
+                    "width": comp.width,
+                    "height": comp.height
+                });
+            }
+        }
+        result[comp_id] = info;
+    }
+    return JSON.stringify(result);
+}
+
+function getRenderFingerprints(comp_ids){
+    /**
+     * Describe state of compositions which affects rendered frames.
+     *
+     * Layers of composition and all nested compositions (including
+     * values and keyframes of all properties and expressions) are
+     * returned as single string, it is hashed in Python (hashing in
+     * ExtendScript is too slow). Composition with property whose value
+     * is not accessible from scripting is marked as 'uncacheable'.
+     *
+     * Args:
+     *    comp_ids (list): of int
+     * Returns:
+     *    (str): JSON {comp_id: {"layers": str,
+     *                            "uncacheable": bool,
+     *                            "render_settings": dict,
+     *                            "output_modules": [dict],
+     *                            "footage": [{"id", "path", "is_sequence"}]}
+     *                 or null if composition doesn't exist}
+     */
+    var result = {};
+    for (var compIdx = 0; compIdx < comp_ids.length; compIdx++){
+        var comp_id = comp_ids[compIdx];
+        var comp = app.project.itemByID(comp_id);
+        if (!comp || !(comp instanceof CompItem)){
+            result[comp_id] = null;
+            continue;
+        }
+
+        var parts = [];
+        var footageById = {};
+        var state = {"uncacheable": false};
+        _fingerprintComp(comp, parts, footageById, {}, state);
+
+        var renderSettings = null;
+        var outputModules = [];
+        var renderItem = _getRenderQueueItem(comp_id);
+        if (renderItem){
+            renderSettings = renderItem.getSettings(
+                GetSettingsFormat.STRING_SETTABLE);
+            for (var omIdx = 1; omIdx <= renderItem.numOutputModules; omIdx++){
+                var omSettings = renderItem.outputModule(omIdx).getSettings(
+                    GetSettingsFormat.STRING_SETTABLE);
+                // output folder is changed by each local render
+                delete omSettings["Output File Info"];
+                outputModules.push(omSettings);
+            }
+        }
+
+        var footage = [];
+        for (var footageId in footageById){
+            footage.push(footageById[footageId]);
+        }
+        result[comp_id] = {
+            "layers": parts.join("\n"),
+            "uncacheable": state.uncacheable,
+            "render_settings": renderSettings,
+            "output_modules": outputModules,
+            "footage": footage
+        };
+    }
+    return JSON.stringify(result);
+}
+
+function _fingerprintComp(comp, parts, footageById, visited, state){
+    /**
+     * Append description of 'comp' and its layers to 'parts', recurse
+     * into nested compositions, collect used footage into 'footageById'.
+     * Sets 'state.uncacheable' if some property value is not accessible.
+     */
+    if (visited[comp.id]){
+        parts.push("comp|" + comp.id);
+        return;
+    }
+    visited[comp.id] = true;
+
+    parts.push([
+        "comp", comp.id, comp.width, comp.height, comp.pixelAspect,
+        comp.frameRate, comp.duration, comp.displayStartFrame,
+        comp.workAreaStart, comp.workAreaDuration, comp.bgColor,
+        comp.frameBlending, comp.motionBlur, comp.shutterAngle,
+        comp.shutterPhase, comp.renderer
+    ].join("|"));
+
+    for (var layerIdx = 1; layerIdx <= comp.numLayers; layerIdx++){
+        var layer = comp.layer(layerIdx);
+        parts.push([
+            "layer", layerIdx, layer.name, layer.enabled, layer.solo,
+            layer.inPoint, layer.outPoint, layer.startTime, layer.stretch
+        ].join("|"));
+
+        var source = layer.source;
+        if (source instanceof CompItem){
+            _fingerprintComp(source, parts, footageById, visited, state);
+        } else if (source instanceof FootageItem){
+            parts.push("source|" + source.id);
+            if (source.mainSource instanceof SolidSource){
+                parts.push("solid|" + source.mainSource.color);
+            } else if (!footageById[source.id]){
+                footageById[source.id] = {
+                    "id": source.id,
+                    "path": source.file ? source.file.fsName : null,
+                    "is_sequence": isFileSequence(source)
+                };
+            }
+        }
+        _fingerprintProperties(layer, parts, state);
+    }
+}
+
+function _fingerprintProperties(group, parts, state){
+    /**
+     * Append values, keyframes and expressions of all properties in
+     * 'group' (recursively) to 'parts'.
+     */
+    for (var propIdx = 1; propIdx <= group.numProperties; propIdx++){
+        var prop = group.property(propIdx);
+        if (!prop){
+            continue;
+        }
+        if (prop.propertyType != PropertyType.PROPERTY){
+            parts.push("group|" + prop.matchName + "|" + prop.enabled);
+            _fingerprintProperties(prop, parts, state);
+            continue;
+        }
+        if (prop.propertyValueType == PropertyValueType.NO_VALUE){
+            continue;
+        }
+
+        var value;
+        try{
+            if (prop.numKeys > 0){
+                var keys = [];
+                for (var keyIdx = 1; keyIdx <= prop.numKeys; keyIdx++){
+                    keys.push(prop.keyTime(keyIdx) + ":" +
+                              _valueToString(prop.keyValue(keyIdx)));
+                }
+                value = keys.join(";");
+            } else {
+                value = _valueToString(prop.value);
+            }
+        } catch (error) {
+            // custom values are not accessible from scripting, changes
+            // of them couldn't be detected
+            state.uncacheable = true;
+            return;
+        }
+        if (prop.canSetExpression && prop.expressionEnabled){
+            value += "|expr:" + prop.expression;
+        }
+        parts.push(prop.matchName + "=" + value);
+    }
+}
+
+function _valueToString(value){
+    if (value instanceof TextDocument){
+        return [value.text, value.font, value.fontSize,
+                value.fillColor, value.justification].join("|");
+    }
+    if (value instanceof Array){
+        return value.join(",");
+    }
+    return String(value);
+}
+
 function getAudioUrlForComp(comp_id){
     /**
      * Searches composition for audio layer
@@ -670,6 +1200,7 @@ function importBackground(comp_id, composition_name, files_to_import){
      * Returns:
      *  (str): json representation (id, name, members)
      */
+    _bumpGeneration();
     var comp;
     var folder;
     var imported_ids = [];
@@ -718,26 +1249,35 @@ function importBackground(comp_id, composition_name, files_to_import){
     return JSON.stringify(item);
 }
 
-function reloadBackground(comp_id, composition_name, files_to_import){
+function reloadBackground(comp_id, composition_name, files_to_import,
+                          unchanged_files){
     /**
      * Reloads existing composition.
      *
-     * It deletes complete composition with encompassing folder, recreates
-     * from scratch via 'importBackground' functionality.
+     * Existing footage items are matched to 'files_to_import' by name,
+     * matched items are replaced in place, new files are imported and
+     * added as layers, items not in 'files_to_import' are deleted.
+     *
+     * Items of 'unchanged_files' are kept as they are, without replacing
+     * their source, if they still exist in the folder.
      *
      * Args:
      *   comp_id (int): id of existing composition (null if new)
      *   composition_name (str): used when new composition
      *   files_to_import (list): list of absolute paths to import and
      *      add as layers
+     *   unchanged_files (list): subset of 'files_to_import' with same
+     *      content as currently loaded files (optional)
      *
      * Returns:
      *  (str): json representation (id, name, members)
      *
      */
+    _bumpGeneration();
     var imported_ids = []; // keep track of members of composition
-    comp = app.project.itemByID(comp_id);
-    folder = comp.parentFolder;
+    var comp = app.project.itemByID(comp_id);
+    var folder = comp.parentFolder;
+    unchanged_files = unchanged_files || [];
     if (folder){
         renameItem(folder.id, composition_name);
         imported_ids.push(folder.id);
@@ -749,32 +1289,35 @@ function reloadBackground(comp_id, composition_name, files_to_import){
 
     var existing_layer_names = [];
     var existing_layer_ids = []; // because ExtendedScript doesnt have keys()
-    for (i = 1; i <= folder.items.length; ++i){
-        layer = folder.items[i];
+    for (var folder_idx = 1; folder_idx <= folder.items.length; ++folder_idx){
+        var folder_item = folder.items[folder_idx];
         //because comp.layers[i] doesnt have 'id' accessible
-        if (layer instanceof CompItem){
+        if (folder_item instanceof CompItem){
             continue;
         }
-        existing_layer_names.push(layer.name);
-        existing_layer_ids.push(layer.id);
+        existing_layer_names.push(folder_item.name);
+        existing_layer_ids.push(folder_item.id);
     }
 
     var new_filenames = [];
     if (files_to_import){
-        for (i = 0; i < files_to_import.length; ++i){
-            file_name = _get_file_name(files_to_import[i]);
+        for (var file_idx = 0; file_idx < files_to_import.length; ++file_idx){
+            var file_url = files_to_import[file_idx];
+            var file_name = _get_file_name(file_url);
             new_filenames.push(file_name);
 
-            idx = existing_layer_names.indexOf(file_name);
+            var idx = existing_layer_names.indexOf(file_name);
             if (idx >= 0){  // update
                 var layer_id = existing_layer_ids[idx];
-                replaceItem(layer_id, files_to_import[i], file_name);
+                if (unchanged_files.indexOf(file_url) < 0){
+                    replaceItem(layer_id, file_url, file_name);
+                }
                 imported_ids.push(layer_id);
             }else{ // new layer
-                item = _importItem(files_to_import[i]);
+                var item = _importItem(file_url);
                 if (!item){
                     return _prepareError(
-                        "No item for " + files_to_import[i] +
+                        "No item for " + file_url +
                         ". Reload background failed.");
                 }
                 imported_ids.push(item.id);
@@ -784,13 +1327,20 @@ function reloadBackground(comp_id, composition_name, files_to_import){
         }
     }
 
-    _delete_obsolete_items(folder, new_filenames);
+    // folder was already listed, remove items in old, but not in new
+    for (var existing_idx = 0;
+         existing_idx < existing_layer_names.length;
+         ++existing_idx){
+        if (new_filenames.indexOf(existing_layer_names[existing_idx]) < 0){
+            deleteItem(existing_layer_ids[existing_idx]);
+        }
+    }
 
-    var item = {"name": comp.name,
-                "id": folder.id,
-                "members": imported_ids};
+    var result = {"name": comp.name,
+                  "id": folder.id,
+                  "members": imported_ids};
 
-    return JSON.stringify(item);
+    return JSON.stringify(result);
 }
 
 function _get_file_name(file_url){
@@ -807,32 +1357,6 @@ function _get_file_name(file_url){
     return file_name;
 }
 
-function _delete_obsolete_items(folder, new_filenames){
-    /***
-     * Goes through 'folder' and removes layers not in new
-     * background
-     *
-     * Args:
-     *   folder (FolderItem)
-     *   new_filenames (array): list of layer names in new bg
-     */
-    // remove items in old, but not in new
-    delete_ids = []
-    for (i = 1; i <= folder.items.length; ++i){
-        layer = folder.items[i];
-        //because comp.layers[i] doesnt have 'id' accessible
-        if (layer instanceof CompItem){
-            continue;
-        }
-        if (new_filenames.indexOf(layer.name) < 0){
-            delete_ids.push(layer.id);
-        }
-    }
-    for (i = 0; i < delete_ids.length; ++i){
-        deleteItem(delete_ids[i]);
-    }
-}
-
 function _importItem(file_url){
     /**
      * Imports 'file_url' as new FootageItem
@@ -1026,6 +1550,180 @@ function render(target_folder, comp_id) {
     app.endSuppressDialogs(false);
 }
 
+function renderMany(items){
+    /**
+     * Render multiple compositions in single pass of Render Queue.
+     *
+     * Output module of each matching Render Queue item is redirected into
+     * its folder, other not yet rendered items are disabled.
+     *
+     * If item contains 'ranges' only these frame ranges are rendered, each
+     * range by temporary duplicate of Render Queue item. Rendered frames
+     * must be numbered by composition frames then, so 'Use Comp Frame
+     * Number' is enabled on output modules. If it cannot be enabled, whole
+     * composition is rendered instead. Time span and output module
+     * settings of original item are restored after render.
+     *
+     * Args:
+     *    items (list): of {"comp_id": int, "folder": str,
+     *                      "ranges": [[frame_start, frame_end]] (optional)}
+     * Returns:
+     *    (str): Prepared JSON response with {"rendered_whole": [comp_id]}
+     *        - items whose 'ranges' were ignored
+     */
+    var itemsByComp = {};
+    for (var itemIdx = 0; itemIdx < items.length; itemIdx++){
+        itemsByComp[items[itemIdx].comp_id] = items[itemIdx];
+    }
+
+    // duplicating and removing items shifts indexes, collect them first
+    var renderItems = [];
+    for (var rqIdx = 1; rqIdx <= app.project.renderQueue.numItems; ++rqIdx){
+        renderItems.push(app.project.renderQueue.item(rqIdx));
+    }
+
+    var restoreSpans = [];
+    var renderedWhole = [];
+    for (var renderIdx = 0; renderIdx < renderItems.length; renderIdx++){
+        var render_item = renderItems[renderIdx];
+        var item = itemsByComp[render_item.comp.id];
+        if (item === undefined){
+            if (render_item.status != RQItemStatus.DONE){
+                render_item.render = false;
+            }
+            continue;
+        }
+
+        if (render_item.status == RQItemStatus.DONE){
+            var new_item = render_item.duplicate();
+            render_item.remove();
+            render_item = new_item;
+        }
+
+        var rangeItems = [render_item];
+        var ranges = item.ranges;
+        if (ranges && ranges.length){
+            // duplicates copy output module settings, set it on original
+            var previousCompFrameNumbers = _useCompFrameNumbers(render_item);
+            if (previousCompFrameNumbers === null){
+                ranges = null;
+                renderedWhole.push(item.comp_id);
+            } else {
+                restoreSpans.push({
+                    "items": rangeItems,
+                    "start": render_item.timeSpanStart,
+                    "duration": render_item.timeSpanDuration,
+                    "comp_frame_numbers": previousCompFrameNumbers
+                });
+                for (var dupIdx = 1; dupIdx < ranges.length; dupIdx++){
+                    rangeItems.push(render_item.duplicate());
+                }
+            }
+        }
+
+        for (var rangeIdx = 0; rangeIdx < rangeItems.length; rangeIdx++){
+            var range_item = rangeItems[rangeIdx];
+            range_item.render = true;
+            if (ranges && ranges.length){
+                var comp = range_item.comp;
+                var range = ranges[rangeIdx];
+                range_item.timeSpanStart =
+                    (range[0] - comp.displayStartFrame) / comp.frameRate;
+                range_item.timeSpanDuration =
+                    (range[1] - range[0] + 1) / comp.frameRate;
+            }
+
+            var om1 = range_item.outputModule(1);
+            var file_name = File.decode( om1.file.name ).replace('℗', '');
+            var targetFolder = new Folder(item.folder);
+            if (!targetFolder.exists) {
+                targetFolder.create();
+            }
+            om1.file = new File(targetFolder.fsName + '/' + file_name);
+        }
+    }
+
+    app.beginSuppressDialogs();
+    app.project.renderQueue.render();
+    app.endSuppressDialogs(false);
+
+    for (var spanIdx = 0; spanIdx < restoreSpans.length; spanIdx++){
+        var span = restoreSpans[spanIdx];
+        var original_item = span.items[0];
+        // rendered item cannot be changed, replace it with fresh copy
+        if (original_item.status == RQItemStatus.DONE){
+            var restored_item = original_item.duplicate();
+            original_item.remove();
+            original_item = restored_item;
+        }
+        original_item.timeSpanStart = span.start;
+        original_item.timeSpanDuration = span.duration;
+        _setCompFrameNumbers(original_item, span.comp_frame_numbers);
+        for (var extraIdx = 1; extraIdx < span.items.length; extraIdx++){
+            span.items[extraIdx].remove();
+        }
+    }
+    return _prepareSingleValue({"rendered_whole": renderedWhole});
+}
+
+var COMP_FRAME_NUMBER_SETTING = "Use Comp Frame Number";
+
+function _useCompFrameNumbers(render_item){
+    /**
+     * Enable 'Use Comp Frame Number' on all output modules of render_item.
+     *
+     * Returns:
+     *    (list|null): previous values (boolean) per output module, null
+     *        if setting cannot be read or changed (older AE)
+     */
+    var previousValues = [];
+    try{
+        for (var omIdx = 1; omIdx <= render_item.numOutputModules; ++omIdx){
+            var output_module = render_item.outputModule(omIdx);
+            var previous = _getCompFrameNumber(output_module);
+            if (previous === null){
+                return null;
+            }
+            previousValues.push(previous);
+            if (!previous){
+                var settings = {};
+                settings[COMP_FRAME_NUMBER_SETTING] = true;
+                output_module.setSettings(settings);
+                if (_getCompFrameNumber(output_module) !== true){
+                    return null;
+                }
+            }
+        }
+    } catch (error) {
+        return null;
+    }
+    return previousValues;
+}
+
+function _getCompFrameNumber(output_module){
+    /** Value of 'Use Comp Frame Number' or null if not available. */
+    var value = output_module.getSettings(GetSettingsFormat.STRING)[
+        COMP_FRAME_NUMBER_SETTING];
+    if (value === undefined){
+        return null;
+    }
+    return String(value).toLowerCase() == "true";
+}
+
+function _setCompFrameNumbers(render_item, values){
+    /** Restore values returned by '_useCompFrameNumbers'. */
+    for (var omIdx = 1; omIdx <= render_item.numOutputModules; ++omIdx){
+        if (values.length < omIdx || values[omIdx - 1]){
+            continue;
+        }
+        var settings = {};
+        settings[COMP_FRAME_NUMBER_SETTING] = false;
+        try{
+            render_item.outputModule(omIdx).setSettings(settings);
+        } catch (error) {}
+    }
+}
+
 function close(){
     app.project.close(CloseOptions.DO_NOT_SAVE_CHANGES);
     app.quit();
@@ -1046,6 +1744,7 @@ function addPlaceholder(name, width, height, fps, duration){
      * might potentially allow nice functionality in the future.
      *
      */
+    _bumpGeneration();
     app.beginUndoGroup('change comp properties');
     try{
         item = app.project.importPlaceholder(name, width, height,
@@ -1100,6 +1799,134 @@ function addItemInstead(placeholder_item_id, item_id){
     app.endUndoGroup();
 }
 
+var BATCH_OPERATIONS = {
+    /**
+     * Maps route names (without 'AfterEffects.' prefix) to functions
+     * accepting dictionary of arguments, same as sent to single routes.
+     */
+    "open": function(args){
+        return fileOpen(args.path);
+    },
+    "run_jsx_file": function(args){
+        return runJsxFile(args.path);
+    },
+    "get_metadata": function(args){
+        return getMetadata();
+    },
+    "get_project_generation": function(args){
+        return getProjectGeneration();
+    },
+    "imprint": function(args){
+        return imprint(args.payload);
+    },
+    "imprint_patches": function(args){
+        return imprintPatches(args.patches);
+    },
+    "get_active_document_name": function(args){
+        return getActiveDocumentName();
+    },
+    "get_active_document_full_name": function(args){
+        return getActiveDocumentFullName();
+    },
+    "add_item": function(args){
+        return addItem(args.name, args.item_type);
+    },
+    "get_items": function(args){
+        return getItems(args.comps, args.folders, args.footages,
+                        args.fields, args.ids);
+    },
+    "select_items": function(args){
+        return selectItems(args.items);
+    },
+    "get_selected_items": function(args){
+        return getSelectedItems(args.comps, args.folders, args.footages,
+                                args.fields);
+    },
+    "import_file": function(args){
+        return importFile(args.path, args.item_name,
+                          JSON.stringify(args.import_options || {}));
+    },
+    "replace_item": function(args){
+        return replaceItem(args.item_id, args.path, args.item_name);
+    },
+    "set_proxy": function(args){
+        return setProxy(args.item_id, args.path, args.is_sequence);
+    },
+    "rename_item": function(args){
+        return renameItem(args.item_id, args.item_name);
+    },
+    "delete_item": function(args){
+        return deleteItem(args.item_id);
+    },
+    "set_label_color": function(args){
+        return setLabelColor(args.item_id, args.color_idx);
+    },
+    "get_comp_properties": function(args){
+        return getCompProperties(args.item_id);
+    },
+    "set_comp_properties": function(args){
+        return setCompProperties(args.item_id, args.start, args.duration,
+                                 args.frame_rate, args.width, args.height);
+    },
+    "get_render_info": function(args){
+        return getRenderInfo(args.comp_id);
+    },
+    "get_audio_url": function(args){
+        return getAudioUrlForComp(args.item_id);
+    },
+    "add_item_as_layer": function(args){
+        return addItemAsLayerToComp(args.comp_id, args.item_id, null);
+    },
+    "add_item_instead_placeholder": function(args){
+        return addItemInstead(args.placeholder_item_id, args.item_id);
+    },
+    "add_comp_to_render_queue": function(args){
+        return addCompToRenderQueue(args.comp_id, args.output_path);
+    },
+    "remove_comp_from_render_queue": function(args){
+        return removeCompFromRenderQueue(args.comp_id);
+    },
+    "get_app_version": function(args){
+        return getAppVersion();
+    }
+};
+
+function batch(operations){
+    /**
+     * Runs multiple operations in single ExtendScript evaluation.
+     *
+     * Each operation is processed separately, failure of one operation
+     * doesn't stop processing of following ones.
+     *
+     * Args:
+     *     operations (list): of {"method": "get_items", "args": {...}}
+     * Returns:
+     *     (str): json list of raw results of each operation in same order
+     *          as 'operations', failed operations contain prepared error
+     */
+    var results = [];
+    for (var op_idx = 0; op_idx < operations.length; ++op_idx){
+        var operation = operations[op_idx];
+        var operation_fn = BATCH_OPERATIONS[operation.method];
+        if (!operation_fn){
+            results.push(_prepareError(
+                "Operation '" + operation.method + "' cannot be batched"));
+            continue;
+        }
+        try{
+            var result = operation_fn(operation.args || {});
+            if (result === undefined){
+                result = null;
+            }
+            results.push(result);
+        } catch (error) {
+            results.push(_prepareError(
+                operation.method + " failed: " + error.toString()));
+        }
+    }
+    return JSON.stringify(results);
+}
+
 function _prepareSingleValue(value){
     return JSON.stringify({"result": value})
 }
@@ -0,0 +1,111 @@
+"""Inventory of footage items used in project and state of their files.
+
+Footage is queried from AE once per publish, each unique path is checked
+once (in thread pool, as paths are often on network storage). Folders of
+image sequences are listed once to find missing frames.
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import attr
+
+FOOTAGE_FIELDS = ["name", "path", "containing_comps", "frames_count"]
+
+_FRAME_REGEX = re.compile(r"^(?P<head>.*?)(?P<frame>\d+)(?P<tail>\.[^.]+)$")
+
+
+@attr.s
+class FootageState(object):
+    """State of footage file(s) on disk."""
+    path = attr.ib()
+    exists = attr.ib(default=False)
+    # names of missing frames of image sequence
+    missing_frames = attr.ib(factory=list)
+
+
+class FootageInventory(object):
+    """Footage items and state of their files.
+
+    Args:
+        footage_items (list): of AEItem with fields from 'FOOTAGE_FIELDS'
+        states (dict): {path: FootageState}
+    """
+    def __init__(self, footage_items, states):
+        self.footage_items = footage_items
+        self._states = states
+
+    @classmethod
+    def build(cls, stub, max_workers=16):
+        """Query footage items from AE and check their files.
+
+        Args:
+            stub (AfterEffectsServerStub)
+            max_workers (int): max count of threads checking files
+        """
+        footage_items = stub.get_items(
+            comps=False, folders=False, footages=True, fields=FOOTAGE_FIELDS
+        )
+        frames_count_by_path = {}
+        for footage_item in footage_items:
+            if not footage_item.path:
+                continue
+            frames_count_by_path[footage_item.path] = max(
+                frames_count_by_path.get(footage_item.path, 0),
+                footage_item.frames_count or 0
+            )
+
+        states = {}
+        if frames_count_by_path:
+            max_workers = max(1, min(max_workers, len(frames_count_by_path)))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                states = dict(zip(
+                    frames_count_by_path,
+                    executor.map(
+                        _get_footage_state,
+                        frames_count_by_path,
+                        frames_count_by_path.values()
+                    )
+                ))
+        return cls(footage_items, states)
+
+    def get_comp_footage(self, comp_id):
+        """Footage items used in composition 'comp_id'."""
+        return [
+            footage_item
+            for footage_item in self.footage_items
+            if comp_id in (footage_item.containing_comps or [])
+        ]
+
+    def get_state(self, path):
+        """State of 'path', None for footage without file."""
+        return self._states.get(path)
+
+
+def _get_footage_state(path, frames_count=0):
+    """Check existence of 'path' and frames of sequence starting by it."""
+    if not frames_count:
+        return FootageState(path, os.path.exists(path))
+
+    dirpath, file_name = os.path.split(path)
+    match = _FRAME_REGEX.match(file_name)
+    try:
+        existing_names = set(os.listdir(dirpath))
+    except OSError:
+        return FootageState(path, False)
+
+    if file_name not in existing_names:
+        return FootageState(path, False)
+    if not match:
+        return FootageState(path, True)
+
+    head = match.group("head")
+    tail = match.group("tail")
+    padding = len(match.group("frame"))
+    first_frame = int(match.group("frame"))
+    missing_frames = []
+    for frame in range(first_frame, first_frame + frames_count):
+        frame_name = "{}{}{}".format(head, str(frame).zfill(padding), tail)
+        if frame_name not in existing_names:
+            missing_frames.append(frame_name)
+    return FootageState(path, True, missing_frames)
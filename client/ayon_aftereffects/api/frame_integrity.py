@@ -0,0 +1,194 @@
+"""Integrity checks of rendered frames.
+
+Truncated or empty frames left by crashed render are detected by size and
+by reading only header and trailer of each file (memory mapped, so only
+touched pages are read, even on network storage).
+"""
+import os
+import mmap
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_IEND = b"\x00\x00\x00\x00IEND\xaeB`\x82"
+JPEG_SOI = b"\xff\xd8"
+JPEG_EOI = b"\xff\xd9"
+EXR_MAGIC = b"\x76\x2f\x31\x01"
+
+# OpenEXR version flags
+EXR_TILED_FLAG = 0x200
+EXR_DEEP_FLAG = 0x800
+EXR_MULTIPART_FLAG = 0x1000
+
+# scanlines per chunk for OpenEXR compression types
+EXR_LINES_PER_CHUNK = {
+    0: 1,  # NO_COMPRESSION
+    1: 1,  # RLE
+    2: 1,  # ZIPS
+    3: 16,  # ZIP
+    4: 32,  # PIZ
+    5: 16,  # PXR24
+    6: 32,  # B44
+    7: 32,  # B44A
+    8: 32,  # DWAA
+    9: 256,  # DWAB
+}
+
+
+def check_frame_integrity(path, size=None):
+    """Check that frame on 'path' is complete.
+
+    Args:
+        path (str): path to frame
+        size (int|Callable): known size of file or callable returning it,
+            file is stat-ed if not provided
+
+    Returns:
+        (str|None): description of problem, None if frame is valid
+    """
+    try:
+        if size is None:
+            size = os.path.getsize(path)
+        elif callable(size):
+            size = size()
+        if size == 0:
+            return "empty file"
+
+        ext = os.path.splitext(path)[1].lower()
+        checker = _CHECKERS_BY_EXT.get(ext)
+        if checker is None:
+            return None
+
+        with open(path, "rb") as stream:
+            with mmap.mmap(
+                stream.fileno(), 0, access=mmap.ACCESS_READ
+            ) as data:
+                return checker(data, size)
+    except (OSError, ValueError) as exc:
+        return f"unreadable ({exc})"
+
+
+def check_frames_integrity(paths, sizes=None, max_workers=8):
+    """Check integrity of multiple frames in thread pool.
+
+    Args:
+        paths (list): of str
+        sizes (dict): known sizes of files by path, values could be
+            callables (eg. 'FrameEntry.get_size'), they are called in
+            worker threads
+        max_workers (int): max count of threads
+
+    Returns:
+        (dict): {path: problem} for invalid frames only
+    """
+    sizes = sizes or {}
+    paths = list(paths)
+    if not paths:
+        return {}
+
+    max_workers = max(1, min(max_workers, len(paths)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            lambda path: check_frame_integrity(path, sizes.get(path)),
+            paths
+        )
+        return {
+            path: problem
+            for path, problem in zip(paths, results)
+            if problem
+        }
+
+
+def _check_png(data, size):
+    if data[:len(PNG_SIGNATURE)] != PNG_SIGNATURE:
+        return "missing PNG signature"
+    if size < len(PNG_SIGNATURE) + len(PNG_IEND):
+        return "truncated PNG"
+    if data[size - len(PNG_IEND):size] != PNG_IEND:
+        return "missing PNG IEND chunk (truncated)"
+    return None
+
+
+def _check_jpeg(data, size):
+    if data[:2] != JPEG_SOI:
+        return "missing JPEG SOI marker"
+    # some writers pad file after EOI marker
+    if data.rfind(JPEG_EOI, max(size - 32, 2), size) < 0:
+        return "missing JPEG EOI marker (truncated)"
+    return None
+
+
+def _check_exr(data, size):
+    if data[:4] != EXR_MAGIC:
+        return "missing OpenEXR magic number"
+    if size < 8:
+        return "truncated OpenEXR header"
+    version = struct.unpack_from("<I", data, 4)[0]
+    if version & (EXR_TILED_FLAG | EXR_DEEP_FLAG | EXR_MULTIPART_FLAG):
+        # chunk count requires tile description, only header is checked
+        return None
+
+    attributes, position = _read_exr_header(data, size)
+    if attributes is None:
+        return "truncated OpenEXR header"
+
+    data_window = attributes.get(b"dataWindow")
+    compression = attributes.get(b"compression")
+    if data_window is None or compression is None:
+        return "OpenEXR header without dataWindow or compression"
+
+    _, y_min, _, y_max = struct.unpack("<iiii", data_window)
+    lines_per_chunk = EXR_LINES_PER_CHUNK.get(compression[0])
+    if lines_per_chunk is None:
+        return None
+    chunk_count = -(-(y_max - y_min + 1) // lines_per_chunk)
+    if chunk_count <= 0:
+        return "invalid OpenEXR dataWindow"
+
+    table_end = position + chunk_count * 8
+    if table_end > size:
+        return "truncated OpenEXR chunk table"
+
+    offsets = struct.unpack_from(f"<{chunk_count}Q", data, position)
+    for chunk_idx, offset in enumerate(offsets):
+        if offset < table_end or offset + 8 > size:
+            return f"invalid offset of OpenEXR chunk {chunk_idx} (truncated)"
+
+    last_offset = max(offsets)
+    _, chunk_size = struct.unpack_from("<ii", data, last_offset)
+    if chunk_size < 0 or last_offset + 8 + chunk_size > size:
+        return "truncated OpenEXR pixel data"
+    return None
+
+
+def _read_exr_header(data, size):
+    """Attributes of single part OpenEXR header and end of header."""
+    attributes = {}
+    position = 8
+    while True:
+        name_end = data.find(b"\x00", position, size)
+        if name_end < 0:
+            return None, None
+        name = data[position:name_end]
+        position = name_end + 1
+        if not name:
+            # empty name ends header
+            return attributes, position
+
+        type_end = data.find(b"\x00", position, size)
+        if type_end < 0 or type_end + 5 > size:
+            return None, None
+        attr_size = struct.unpack_from("<i", data, type_end + 1)[0]
+        value_start = type_end + 5
+        position = value_start + attr_size
+        if attr_size < 0 or position > size:
+            return None, None
+        attributes[name] = data[value_start:position]
+
+
+_CHECKERS_BY_EXT = {
+    ".png": _check_png,
+    ".jpg": _check_jpeg,
+    ".jpeg": _check_jpeg,
+    ".exr": _check_exr,
+}
@@ -0,0 +1,188 @@
+"""Inventory of rendered files in output folder of Render Queue.
+
+Folder is listed once with 'os.scandir', so collectors, validators and
+repair actions don't need to list same (possibly network) folder again.
+Size and modification time of file are read only when first accessed and
+kept then, collectors need only names.
+"""
+import os
+import re
+
+import attr
+import clique
+
+
+@attr.s
+class FrameEntry(object):
+    """Single file found in output folder.
+
+    'size' and 'mtime' are read from disk on first access.
+    """
+    name = attr.ib()
+    path = attr.ib()
+    frame = attr.ib(default=None)  # None if name doesn't contain frame
+    # 'os.DirEntry' from listing, its stat is free on Windows
+    _dir_entry = attr.ib(default=None, repr=False, eq=False)
+    _stat = attr.ib(default=None, init=False, repr=False, eq=False)
+
+    @property
+    def size(self):
+        return self.get_size()
+
+    @property
+    def mtime(self):
+        return self._get_stat().st_mtime
+
+    def get_size(self):
+        """Size in bytes, could be passed as callable to read it later."""
+        return self._get_stat().st_size
+
+    def _get_stat(self):
+        if self._stat is None:
+            if self._dir_entry is not None:
+                self._stat = self._dir_entry.stat()
+            else:
+                self._stat = os.stat(self.path)
+        return self._stat
+
+
+class FrameInventory(object):
+    """Files with 'extension' in 'folder', collected in single pass.
+
+    Args:
+        folder (str): output folder
+        extension (str): extension without dot, all files if empty
+        entries (list): of FrameEntry
+    """
+    def __init__(self, folder, extension, entries):
+        self.folder = folder
+        self.extension = extension
+        self._entries_by_name = {entry.name: entry for entry in entries}
+        self._entries_by_frame = None
+        self._collections = None
+
+    @classmethod
+    def scan(cls, folder, extension=None, file_pattern=None):
+        """List 'folder' once and create inventory of its files.
+
+        Args:
+            folder (str): output folder
+            extension (str): extension without dot, other files are skipped
+            file_pattern (str): file name from Render Queue (eg.
+                'name_[#####].png'), frame numbers are parsed by it,
+                trailing digits of name are used if not provided
+
+        Returns:
+            (FrameInventory): empty if 'folder' doesn't exist
+        """
+        frame_regex = _get_frame_regex(file_pattern)
+        suffix = ".{}".format(extension) if extension else None
+        entries = []
+        try:
+            iterator = os.scandir(folder)
+        except (FileNotFoundError, NotADirectoryError):
+            return cls(folder, extension, entries)
+
+        with iterator:
+            for dir_entry in iterator:
+                name = dir_entry.name
+                if suffix and not name.endswith(suffix):
+                    continue
+                if not dir_entry.is_file():
+                    continue
+                frame = None
+                match = frame_regex.match(name)
+                if match:
+                    frame = int(match.group("frame"))
+                entries.append(
+                    FrameEntry(name, dir_entry.path, frame, dir_entry)
+                )
+        return cls(folder, extension, entries)
+
+    @property
+    def file_names(self):
+        """Sorted names of all files in inventory."""
+        return sorted(self._entries_by_name)
+
+    @property
+    def entries(self):
+        return [
+            self._entries_by_name[name]
+            for name in sorted(self._entries_by_name)
+        ]
+
+    @property
+    def entries_by_frame(self):
+        """Entries with parsed frame number, keys are frames."""
+        if self._entries_by_frame is None:
+            self._entries_by_frame = {
+                entry.frame: entry
+                for entry in self._entries_by_name.values()
+                if entry.frame is not None
+            }
+        return self._entries_by_frame
+
+    def get_entry(self, name):
+        return self._entries_by_name.get(name)
+
+    def __contains__(self, name):
+        return name in self._entries_by_name
+
+    def __len__(self):
+        return len(self._entries_by_name)
+
+    def get_collections_and_remainders(self):
+        """Result of 'clique.assemble' of file names, computed once."""
+        if self._collections is None:
+            self._collections = clique.assemble(self.file_names)
+        return self._collections
+
+    def remove(self, name):
+        """Delete file 'name' from disk and from inventory.
+
+        Returns:
+            (str|None): path of removed file
+        """
+        entry = self._entries_by_name.pop(name, None)
+        if entry is None:
+            return None
+        if os.path.exists(entry.path):
+            os.remove(entry.path)
+        self._entries_by_frame = None
+        self._collections = None
+        return entry.path
+
+
+def get_missing_frame_ranges(existing_frames, frame_start, frame_end):
+    """Contiguous ranges of frames not present in 'existing_frames'.
+
+    Returns:
+        (list): of [start, end] (inclusive)
+    """
+    ranges = []
+    range_start = None
+    for frame in range(frame_start, frame_end + 1):
+        if frame in existing_frames:
+            if range_start is not None:
+                ranges.append([range_start, frame - 1])
+                range_start = None
+        elif range_start is None:
+            range_start = frame
+    if range_start is not None:
+        ranges.append([range_start, frame_end])
+    return ranges
+
+
+def _get_frame_regex(file_pattern=None):
+    """Regex with 'frame' group matching file names of sequence."""
+    if file_pattern:
+        file_name = os.path.basename(file_pattern)
+        frames_pattern = re.search(r"\[#+\]", file_name)
+        if frames_pattern:
+            head = re.escape(file_name[:frames_pattern.start()])
+            tail = re.escape(file_name[frames_pattern.end():])
+            padding = frames_pattern.group().count("#")
+            return re.compile(
+                r"^{}(?P<frame>\d{{{},}}){}$".format(head, padding, tail)
+            )
+    return re.compile(r"^.*?(?P<frame>\d+)\.[^.]+$")
@@ -0,0 +1,212 @@
+"""Compact description of expected rendered files.
+
+Long sequences are described by template and frame range instead of list
+with path of each frame. Paths are generated lazily, validators compare
+file names against range arithmetically.
+
+Collectors store 'ExpectedFiles' in 'instance.data["expectedFiles"]', it
+is read-only sequence of paths (indexing, iteration, 'clique.assemble'
+work as with list) expanded from specs only when iterated. Use 'to_list'
+where plain list is required (eg. JSON).
+"""
+import os
+import re
+import functools
+from collections.abc import Sequence
+
+import attr
+
+FRAME_TOKEN = "{frame}"
+# key of instance data with list of 'FrameSequenceSpec'
+EXPECTED_SPECS_KEY = "_expectedFileSpecs"
+
+
+@attr.s(frozen=True)
+class FrameSequenceSpec(object):
+    """Files of single output, frame number replaces 'FRAME_TOKEN'.
+
+    Template without 'FRAME_TOKEN' describes single file (eg. mov).
+    """
+    template = attr.ib()
+    padding = attr.ib(default=0)
+    start = attr.ib(default=0)
+    end = attr.ib(default=0)
+    step = attr.ib(default=1)
+
+    @classmethod
+    def from_render_queue_path(cls, path, start, end, step=1):
+        """Spec from path of Output Module (eg. 'name_[#####].png')."""
+        frames_pattern = re.search(r"\[#+\]", path)
+        if not frames_pattern:
+            return cls(path)
+        template = "{}{}{}".format(
+            path[:frames_pattern.start()],
+            FRAME_TOKEN,
+            path[frames_pattern.end():]
+        )
+        return cls(
+            template, frames_pattern.group().count("#"), start, end, step
+        )
+
+    @property
+    def is_sequence(self):
+        return FRAME_TOKEN in self.template
+
+    @property
+    def directory(self):
+        return os.path.dirname(self.template)
+
+    @property
+    def frames(self):
+        if not self.is_sequence:
+            return range(0)
+        return range(self.start, self.end + 1, self.step)
+
+    def get_path(self, frame=None):
+        if not self.is_sequence:
+            return self.template
+        return self.template.replace(
+            FRAME_TOKEN, str(frame).zfill(self.padding))
+
+    def get_frame(self, file_name):
+        """Frame of 'file_name' (basename) or None if it doesn't match.
+
+        Single file returns 0 if names are same.
+        """
+        basename_template = os.path.basename(self.template)
+        if not self.is_sequence:
+            return 0 if file_name == basename_template else None
+        match = _get_name_regex(basename_template, self.padding).match(
+            file_name)
+        if not match:
+            return None
+        return int(match.group("frame"))
+
+    def contains_name(self, file_name):
+        """File name (basename) belongs to this spec and its range."""
+        frame = self.get_frame(file_name)
+        if frame is None:
+            return False
+        if not self.is_sequence:
+            return True
+        return frame in self.frames
+
+    def get_missing_names(self, file_names):
+        """Names of expected files not present in 'file_names'."""
+        if not self.is_sequence:
+            basename = os.path.basename(self.template)
+            return [] if basename in file_names else [basename]
+
+        present_frames = set()
+        for file_name in file_names:
+            frame = self.get_frame(file_name)
+            if frame is not None:
+                present_frames.add(frame)
+        return [
+            os.path.basename(self.get_path(frame))
+            for frame in self.frames
+            if frame not in present_frames
+        ]
+
+    def __iter__(self):
+        if not self.is_sequence:
+            yield self.template
+            return
+        for frame in self.frames:
+            yield self.get_path(frame)
+
+    def __len__(self):
+        if not self.is_sequence:
+            return 1
+        return len(self.frames)
+
+    def __getitem__(self, idx):
+        if not self.is_sequence:
+            return [self.template][idx]
+        return self.get_path(self.frames[idx])
+
+    def __str__(self):
+        if not self.is_sequence:
+            return self.template
+        return self.template.replace(
+            FRAME_TOKEN,
+            "[{}-{}]".format(
+                str(self.start).zfill(self.padding),
+                str(self.end).zfill(self.padding)
+            )
+        )
+
+
+class ExpectedFiles(Sequence):
+    """Read-only sequence of expected paths from multiple specs.
+
+    Args:
+        specs (list): of FrameSequenceSpec
+    """
+    def __init__(self, specs):
+        self.specs = list(specs)
+
+    def __len__(self):
+        return sum(len(spec) for spec in self.specs)
+
+    def __iter__(self):
+        for spec in self.specs:
+            yield from spec
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return self.to_list()[idx]
+        if idx < 0:
+            idx += len(self)
+        for spec in self.specs:
+            spec_len = len(spec)
+            if idx < spec_len:
+                return spec[idx]
+            idx -= spec_len
+        raise IndexError("ExpectedFiles index out of range")
+
+    def __eq__(self, other):
+        if isinstance(other, ExpectedFiles):
+            return self.specs == other.specs
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(self) == len(other) and all(
+                path == other_path for path, other_path in zip(self, other)
+            )
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "ExpectedFiles({})".format(
+            ", ".join(str(spec) for spec in self.specs))
+
+    def to_list(self):
+        return list(iter(self))
+
+
+def get_expected_specs(instance_data):
+    """Specs of expected files of instance.
+
+    Specs stored under 'EXPECTED_SPECS_KEY' or specs of 'ExpectedFiles'
+    are used, otherwise each path of 'expectedFiles' is single spec.
+
+    Args:
+        instance_data (dict)
+
+    Returns:
+        (list): of FrameSequenceSpec
+    """
+    specs = instance_data.get(EXPECTED_SPECS_KEY)
+    if specs is not None:
+        return specs
+    expected_files = instance_data.get("expectedFiles") or []
+    if isinstance(expected_files, ExpectedFiles):
+        return expected_files.specs
+    return [FrameSequenceSpec(path) for path in expected_files]
+
+
+@functools.lru_cache(maxsize=64)
+def _get_name_regex(basename_template, padding):
+    head, tail = basename_template.split(FRAME_TOKEN, 1)
+    return re.compile(r"^{}(?P<frame>\d{{{},}}){}$".format(
+        re.escape(head), max(padding, 1), re.escape(tail)))
@@ -30,6 +30,8 @@ from ayon_core.pipeline.workfile import save_next_version
 from ayon_aftereffects.api import ae_host_tools
 
 from .webserver import WebServerTool
+from .rpc_stats import STATS_PATH_ENV
+from .render_progress import emit_render_progress
 from .ws_stub import get_stub
 from .lib import raise_window_to_front, set_settings
 
@@ -268,6 +270,14 @@ class ProcessLauncher(QtCore.QObject):
             self._loop_timer.stop()
 
         if self._websocket_server is not None:
+            if os.getenv(STATS_PATH_ENV):
+                try:
+                    path = self._websocket_server.dump_rpc_stats()
+                    self.log.info(f"RPC statistics written to {path}")
+                except OSError:
+                    self.log.warning(
+                        "Failed to write RPC statistics", exc_info=True
+                    )
             self._websocket_server.stop()
 
         if self._process:
@@ -420,17 +430,23 @@ class AfterEffectsRoute(WebSocketRoute):
         # This method might return anything.
         log.debug("someone called AfterEffects route")
         self.instance = self
+        WebServerTool.get_instance().notify_client_connected()
         return kwargs
 
     # server functions
     async def ping(self):
         log.debug("someone called AfterEffects route ping")
+        WebServerTool.get_instance().notify_client_connected()
         if not AfterEffectsRoute._application_launched_emitted:
             AfterEffectsRoute._application_launched_emitted = True
             ProcessLauncher.execute_in_main_thread(
                 lambda: emit_event("application.launched")
             )
 
+    async def render_progress(self, **kwargs):
+        """Progress of running local render pushed by extension."""
+        emit_render_progress(kwargs)
+
     # This method calls function on the client side
     # client functions
     async def set_context(self, project, folder, task):
@@ -495,6 +511,12 @@ class AfterEffectsRoute(WebSocketRoute):
     async def experimental_tools_route(self):
         self._tool_route("experimental_tools")
 
+    async def dump_rpc_stats_route(self):
+        """Writes statistics of calls made to AE, returns path to file."""
+        path = WebServerTool.get_instance().dump_rpc_stats()
+        log.info(f"RPC statistics written to {path}")
+        return path
+
     def _tool_route(self, _tool_name):
         """The address accessed when clicking on the buttons."""
 
@@ -11,6 +11,11 @@ from ayon_core.pipeline.context_tools import get_current_task_entity
 from ayon_core.lib import Logger
 
 from .ws_stub import get_stub
+from .publish_profiler import (
+    stop_publish_profiler,
+    get_publish_profiler,
+    format_summary,
+)
 
 log = Logger.get_logger(__name__)
 
@@ -48,7 +53,9 @@ def raise_window_to_front(window):
 @contextlib.contextmanager
 def maintained_selection():
     """Maintain selection during context."""
-    selection = get_stub().get_selected_items(True, False, False)
+    selection = get_stub().get_selected_items(
+        True, False, False, fields=["id", "name"]
+    )
     try:
         yield selection
     finally:
@@ -120,6 +127,49 @@ def get_background_layers(file_url):
     return layers
 
 
+def get_background_layer_fingerprints(layers, representation_files=None):
+    """Fingerprints of background images to find unchanged ones on update.
+
+    Hash of published file from representation is used when available, it
+    is computed from source file on publish, so it is same for image
+    published unchanged in new version. Other images get size and mtime
+    of file, nothing is read.
+
+    Args:
+        layers (list): of abs paths from 'get_background_layers'
+        representation_files (list): 'files' of representation entity
+
+    Returns:
+        (dict): {layer name (file name without extension): fingerprint},
+            fingerprint is None for missing file
+    """
+    hashes = {}
+    for file_info in representation_files or []:
+        file_hash = file_info.get("hash")
+        file_name = file_info.get("name") or os.path.basename(
+            file_info.get("path") or "")
+        if file_hash and file_name:
+            hashes[file_name] = "hash:{}".format(file_hash)
+
+    fingerprints = {}
+    for path in layers:
+        file_name = os.path.basename(path)
+        fingerprint = hashes.get(file_name)
+        if fingerprint is None:
+            fingerprint = _get_file_fingerprint(path)
+        fingerprints[os.path.splitext(file_name)[0]] = fingerprint
+    return fingerprints
+
+
+def _get_file_fingerprint(path):
+    """'<size>:<mtime>' of file or None if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return "{}:{}".format(stat.st_size, stat.st_mtime_ns)
+
+
 def get_entity_attributes(entity: dict) -> dict[str, Union[float, int]]:
     """Get attributes of folder or task entity.
 
@@ -183,7 +233,7 @@ def set_settings(
 
     stub = get_stub()
     if not comp_ids:
-        comps = stub.get_selected_items(True, False, False)
+        comps = stub.get_selected_items(True, False, False, fields=["id"])
         comp_ids = [comp.id for comp in comps]
     if not comp_ids:
         stub.print_msg("Select at least one composition to apply settings.")
@@ -238,3 +288,11 @@ def publish_in_test(log, close_plugin_name=None):
                 close_plugin().process(context)
             except Exception as exp:
                 log.error(exp)
+
+    # publish with error doesn't reach 'WritePublishProfile'
+    stop_publish_profiler()
+    profiler = get_publish_profiler()
+    if profiler is not None:
+        if profiler.last_report:
+            log.info("Publish profile:\n{}".format(
+                format_summary(profiler.last_report)))
@@ -0,0 +1,105 @@
+"""Encoding of metadata stored in 'xmp:Label' field of project.
+
+Legacy format is pretty printed JSON list. Current format is minified JSON
+list, lists larger than threshold are compressed with zlib and stored as
+base64 text prefixed with format version.
+
+Threshold (in characters of minified JSON) could be changed by
+'AYON_AFTEREFFECTS_METADATA_COMPRESS_THRESHOLD', 0 disables compression.
+"""
+import os
+import json
+import zlib
+import base64
+import logging
+
+log = logging.getLogger(__name__)
+
+COMPRESSED_PREFIX = "ayon-zlib-v1:"
+COMPRESS_THRESHOLD_ENV = "AYON_AFTEREFFECTS_METADATA_COMPRESS_THRESHOLD"
+DEFAULT_COMPRESS_THRESHOLD = 256 * 1024
+
+
+def get_compress_threshold():
+    """Size of minified JSON above which metadata are compressed.
+
+    Returns:
+        (int): 0 if compression is disabled
+    """
+    value = os.getenv(COMPRESS_THRESHOLD_ENV)
+    if not value:
+        return DEFAULT_COMPRESS_THRESHOLD
+    try:
+        threshold = int(value)
+    except ValueError:
+        log.warning(
+            f"Invalid value of {COMPRESS_THRESHOLD_ENV}: '{value}', "
+            f"using {DEFAULT_COMPRESS_THRESHOLD}"
+        )
+        return DEFAULT_COMPRESS_THRESHOLD
+    return max(threshold, 0)
+
+
+def is_compressed(value):
+    return isinstance(value, str) and value.startswith(COMPRESSED_PREFIX)
+
+
+def encode_metadata(metadata, compress_threshold=None):
+    """Encode 'metadata' to text stored in project.
+
+    Args:
+        metadata (list): of dicts
+        compress_threshold (int|None): 0 disables compression, value
+            from environment is used if not provided
+
+    Returns:
+        (str)
+    """
+    if compress_threshold is None:
+        compress_threshold = get_compress_threshold()
+
+    # non ascii characters are kept as they are, same as in AE
+    payload = json.dumps(metadata, separators=(",", ":"), ensure_ascii=False)
+    if compress_threshold <= 0 or len(payload) <= compress_threshold:
+        return payload
+
+    compressed = zlib.compress(payload.encode("utf-8"), 9)
+    return COMPRESSED_PREFIX + base64.b64encode(compressed).decode("ascii")
+
+
+def decode_metadata(value):
+    """Decode text stored in project, accepts all known formats.
+
+    Raises:
+        ValueError: if 'value' couldn't be decoded
+    """
+    if is_compressed(value):
+        try:
+            compressed = base64.b64decode(value[len(COMPRESSED_PREFIX):])
+            value = zlib.decompress(compressed).decode("utf-8")
+        except (ValueError, zlib.error) as exc:
+            raise ValueError(f"Received broken compressed metadata: {exc}")
+
+    try:
+        return json.loads(value)
+    except json.decoder.JSONDecodeError:
+        raise ValueError("Received broken JSON {}".format(value))
+
+
+def needs_migration(value, compress_threshold=None):
+    """Stored 'value' differs from its encoding in current format.
+
+    Legacy pretty printed JSON or lists crossing compression threshold
+    (in any direction) are rewritten.
+    """
+    if not value or not isinstance(value, str) or value == "undefined":
+        return False
+    try:
+        metadata = decode_metadata(value)
+    except ValueError:
+        # broken metadata are not touched
+        return False
+    if not isinstance(metadata, list):
+        # nothing stored yet
+        return False
+    return value != encode_metadata(metadata, compress_threshold)
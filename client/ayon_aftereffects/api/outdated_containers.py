@@ -0,0 +1,238 @@
+"""Check of outdated containers running outside of Qt thread.
+
+Containers are listed from AE once, versions of all loaded representations
+are resolved with few batched server queries. Result is cached per workfile
+for 'OUTDATED_CACHE_TTL' seconds (and only for same set of loaded
+representations), so repeated checks (eg. reopening same workfile) don't
+query server again.
+"""
+import time
+import logging
+import threading
+
+import ayon_api
+
+log = logging.getLogger(__name__)
+
+OUTDATED_CACHE_TTL = 300
+
+_cache_lock = threading.Lock()
+# {workfile path: (timestamp, representation ids, outdated ids)}
+_outdated_cache = {}
+
+
+def get_outdated_representation_ids(project_name, representation_ids):
+    """Ids of representations which are not of last version.
+
+    Hero versions are considered up to date.
+
+    Args:
+        project_name (str)
+        representation_ids (Iterable[str])
+
+    Returns:
+        (set)
+    """
+    representation_ids = set(representation_ids)
+    if not representation_ids:
+        return set()
+
+    version_id_by_repre_id = {
+        repre_entity["id"]: repre_entity["versionId"]
+        for repre_entity in ayon_api.get_representations(
+            project_name,
+            representation_ids=representation_ids,
+            fields={"id", "versionId"}
+        )
+    }
+    version_entities = {
+        version_entity["id"]: version_entity
+        for version_entity in ayon_api.get_versions(
+            project_name,
+            version_ids=set(version_id_by_repre_id.values()),
+            fields={"id", "productId", "version"}
+        )
+    }
+    last_versions = ayon_api.get_last_versions(
+        project_name,
+        {
+            version_entity["productId"]
+            for version_entity in version_entities.values()
+        },
+        fields={"id", "productId", "version"}
+    )
+
+    outdated_ids = set()
+    for repre_id, version_id in version_id_by_repre_id.items():
+        version_entity = version_entities.get(version_id)
+        if version_entity is None or version_entity["version"] < 0:
+            continue
+        last_version = last_versions.get(version_entity["productId"])
+        if (
+            last_version is not None
+            and last_version["version"] > version_entity["version"]
+        ):
+            outdated_ids.add(repre_id)
+    return outdated_ids
+
+
+def get_latest_representation_ids(project_name, representation_ids):
+    """Representations of last versions matched by representation name.
+
+    Hero versions and representations of last version map to themselves,
+    representations without match in last version are missing.
+
+    Args:
+        project_name (str)
+        representation_ids (Iterable[str])
+
+    Returns:
+        (dict): {representation id: representation id of last version}
+    """
+    representation_ids = set(representation_ids)
+    if not representation_ids:
+        return {}
+
+    repre_entities = list(ayon_api.get_representations(
+        project_name,
+        representation_ids=representation_ids,
+        fields={"id", "name", "versionId"}
+    ))
+    version_entities = {
+        version_entity["id"]: version_entity
+        for version_entity in ayon_api.get_versions(
+            project_name,
+            version_ids={
+                repre_entity["versionId"] for repre_entity in repre_entities
+            },
+            fields={"id", "productId", "version"}
+        )
+    }
+    last_versions = ayon_api.get_last_versions(
+        project_name,
+        {
+            version_entity["productId"]
+            for version_entity in version_entities.values()
+        },
+        fields={"id", "productId", "version"}
+    )
+
+    latest_repre_ids = {}
+    last_version_id_by_repre_id = {}
+    for repre_entity in repre_entities:
+        repre_id = repre_entity["id"]
+        version_entity = version_entities.get(repre_entity["versionId"])
+        if version_entity is None:
+            continue
+        last_version = last_versions.get(version_entity["productId"])
+        if (
+            version_entity["version"] < 0
+            or last_version is None
+            or last_version["version"] <= version_entity["version"]
+        ):
+            latest_repre_ids[repre_id] = repre_id
+        else:
+            last_version_id_by_repre_id[repre_id] = last_version["id"]
+
+    if not last_version_id_by_repre_id:
+        return latest_repre_ids
+
+    repre_id_by_version_and_name = {
+        (repre_entity["versionId"], repre_entity["name"]): repre_entity["id"]
+        for repre_entity in ayon_api.get_representations(
+            project_name,
+            version_ids=set(last_version_id_by_repre_id.values()),
+            fields={"id", "name", "versionId"}
+        )
+    }
+    for repre_entity in repre_entities:
+        last_version_id = last_version_id_by_repre_id.get(repre_entity["id"])
+        latest_repre_id = repre_id_by_version_and_name.get(
+            (last_version_id, repre_entity["name"])
+        )
+        if latest_repre_id:
+            latest_repre_ids[repre_entity["id"]] = latest_repre_id
+    return latest_repre_ids
+
+
+def get_outdated_containers(containers, project_name, workfile=None):
+    """Containers loaded from representations which are not of last version.
+
+    Args:
+        containers (list): of dicts from 'ls'
+        project_name (str)
+        workfile (str): path of current workfile, results are cached
+            for it if provided
+
+    Returns:
+        (list): of outdated containers
+    """
+    repre_ids = frozenset(
+        container["representation"] for container in containers
+    )
+    outdated_ids = None
+    if workfile:
+        with _cache_lock:
+            cached = _outdated_cache.get(workfile)
+        if (
+            cached is not None
+            and time.time() - cached[0] < OUTDATED_CACHE_TTL
+            and cached[1] == repre_ids
+        ):
+            outdated_ids = cached[2]
+
+    if outdated_ids is None:
+        outdated_ids = get_outdated_representation_ids(
+            project_name, repre_ids
+        )
+        if workfile:
+            with _cache_lock:
+                _outdated_cache[workfile] = (
+                    time.time(), repre_ids, outdated_ids
+                )
+
+    return [
+        container
+        for container in containers
+        if container["representation"] in outdated_ids
+    ]
+
+
+def invalidate_outdated_cache(workfile=None):
+    """Drop cached result of 'workfile' or of all workfiles."""
+    with _cache_lock:
+        if workfile is None:
+            _outdated_cache.clear()
+        else:
+            _outdated_cache.pop(workfile, None)
+
+
+def start_outdated_check(list_containers, get_workfile, callback,
+                         project_name):
+    """Run check in worker thread, 'callback' gets outdated containers.
+
+    Args:
+        list_containers (Callable): returns containers (eg. 'ls')
+        get_workfile (Callable): returns path of current workfile
+        callback (Callable): called from worker thread with list of
+            outdated containers, not called if check fails
+        project_name (str)
+
+    Returns:
+        (threading.Thread)
+    """
+    def _check():
+        try:
+            containers = list(list_containers())
+            outdated = get_outdated_containers(
+                containers, project_name, get_workfile())
+        except Exception:
+            log.warning("Check of outdated containers failed", exc_info=True)
+            return
+        callback(outdated)
+
+    thread = threading.Thread(
+        target=_check, name="AEOutdatedContainersCheck", daemon=True
+    )
+    thread.start()
+    return thread
@@ -1,4 +1,5 @@
 import os
+import collections
 
 from qtpy import QtWidgets
 
@@ -9,11 +10,17 @@ from ayon_core.pipeline import (
     register_loader_plugin_path,
     register_creator_plugin_path,
     register_workfile_build_plugin_path,
+    register_inventory_action_path,
     AYON_CONTAINER_ID,
     AVALON_INSTANCE_ID,
     AYON_INSTANCE_ID,
+    registered_host,
+    get_current_project_name,
+)
+from ayon_core.pipeline.load import (
+    discover_loader_plugins,
+    get_representation_contexts_by_ids,
 )
-from ayon_core.pipeline.load import any_outdated_containers
 from ayon_core.host import (
     HostBase,
     IWorkfileHost,
@@ -23,9 +30,16 @@ from ayon_core.host import (
 from ayon_core.tools.utils import get_ayon_qt_app
 from ayon_aftereffects import AFTEREFFECTS_ADDON_ROOT
 
-from .launch_logic import get_stub
+from .launch_logic import get_stub, ProcessLauncher
+from .outdated_containers import (
+    get_latest_representation_ids,
+    invalidate_outdated_cache,
+    start_outdated_check,
+)
+from .project_state import MetadataIndex
 from .scripts import run_scripts
 from .ws_stub import ConnectionNotEstablishedYet
+from .ws_stub_async import AsyncAfterEffectsServerStub
 
 log = Logger.get_logger(__name__)
 
@@ -35,6 +49,7 @@ PUBLISH_PATH = os.path.join(PLUGINS_DIR, "publish")
 LOAD_PATH = os.path.join(PLUGINS_DIR, "load")
 CREATE_PATH = os.path.join(PLUGINS_DIR, "create")
 WORKFILE_BUILD_PATH = os.path.join(PLUGINS_DIR, "workfile_build")
+INVENTORY_PATH = os.path.join(PLUGINS_DIR, "inventory")
 
 
 class AfterEffectsHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
@@ -72,6 +87,7 @@ class AfterEffectsHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
         register_loader_plugin_path(LOAD_PATH)
         register_creator_plugin_path(CREATE_PATH)
         register_workfile_build_plugin_path(WORKFILE_BUILD_PATH)
+        register_inventory_action_path(INVENTORY_PATH)
 
         register_event_callback("application.launched", on_application_launch)
         register_event_callback("workfile.opened", on_workfile_opened)
@@ -173,12 +189,25 @@ class AfterEffectsHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
 
 def on_workfile_opened():
     """Run automatic scripts after a workfile was opened."""
+    _migrate_metadata()
     try:
         run_scripts(auto=True)
     except Exception:
         log.exception("Automatic script execution failed.")
 
 
+def _migrate_metadata():
+    """Rewrite metadata of opened workfile stored in legacy format.
+
+    Runs once per opened workfile, following saves keep current format.
+    """
+    try:
+        if get_stub().migrate_metadata():
+            log.info("Metadata migrated to current format.")
+    except (ValueError, ConnectionNotEstablishedYet):
+        log.warning("Metadata couldn't be migrated", exc_info=True)
+
+
 def on_application_launch():
     """Triggered after start of app"""
     check_inventory()
@@ -205,11 +234,18 @@ def ls():
         log.warning("Not connected yet, ignoring")
         return
 
-    layers_meta = stub.get_metadata()
-    for item in stub.get_items(comps=True,
-                               folders=True,
-                               footages=True):
-        data = stub.read(item, layers_meta)
+    metadata_index = stub.get_metadata_index()
+    items = stub.get_items(comps=True,
+                           folders=True,
+                           footages=True,
+                           fields=["id", "name"])
+    yield from _iter_containers(stub, items, metadata_index)
+
+
+def _iter_containers(stub, items, metadata_index):
+    """Containers of 'items' found in 'metadata_index', see 'ls'."""
+    for item in items:
+        data = stub.read(item, metadata_index=metadata_index)
         # Skip non-tagged layers.
         if not data:
             continue
@@ -231,19 +267,136 @@ def ls():
         yield data
 
 
+def ls_concurrently():
+    """Containers as 'ls', metadata and items are pulled concurrently.
+
+    Meant for worker threads (eg. outdated check), both queries are in
+    flight at once and state cache of stub used in main thread is not
+    touched.
+
+    Returns:
+        (list): of dicts, same as 'ls'
+    """
+    stub = get_stub()
+    async_stub = AsyncAfterEffectsServerStub(stub)
+    metadata, items = async_stub.run(async_stub.gather(
+        async_stub.get_metadata(),
+        async_stub.get_items(
+            comps=True, folders=True, footages=True, fields=["id", "name"]
+        ),
+    ))
+    return list(_iter_containers(stub, items, MetadataIndex(metadata)))
+
+
 def check_inventory():
-    """Checks loaded containers if they are of highest version"""
-    if not any_outdated_containers():
-        return
+    """Checks loaded containers if they are of highest version
+
+    Check runs in worker thread, warning is shown in main thread when
+    it finishes.
+    """
+    def _on_checked(outdated_containers):
+        if outdated_containers:
+            ProcessLauncher.execute_in_main_thread(
+                lambda: _show_outdated_warning(outdated_containers)
+            )
+
+    return start_outdated_check(
+        ls_concurrently,
+        lambda: registered_host().get_current_workfile(),
+        _on_checked,
+        get_current_project_name()
+    )
 
-    # Warn about outdated containers.
+
+def update_containers_to_latest(containers):
+    """Update 'containers' to last versions of their products.
+
+    Containers are grouped by loader and each loader updates its group
+    with single 'update_many', so items are replaced and metadata are
+    written once per loader.
+
+    Args:
+        containers (list): of dicts from 'ls'
+
+    Returns:
+        (list): of tuples (container, error message) of failed updates
+    """
+    project_name = get_current_project_name()
+    latest_repre_ids = get_latest_representation_ids(
+        project_name,
+        {container["representation"] for container in containers}
+    )
+    contexts = get_representation_contexts_by_ids(
+        project_name,
+        {
+            latest_repre_id
+            for repre_id, latest_repre_id in latest_repre_ids.items()
+            if latest_repre_id != repre_id
+        }
+    )
+    loaders_by_name = {
+        loader.__name__: loader
+        for loader in discover_loader_plugins(project_name)
+    }
+
+    errors = []
+    containers_by_loader = collections.defaultdict(list)
+    for container in containers:
+        latest_repre_id = latest_repre_ids.get(container["representation"])
+        if latest_repre_id == container["representation"]:
+            continue
+        context = contexts.get(latest_repre_id)
+        if context is None:
+            errors.append((container, "Latest version not found"))
+            continue
+        loader = loaders_by_name.get(container["loader"])
+        if loader is None:
+            errors.append(
+                (container, f"Loader '{container['loader']}' not found")
+            )
+            continue
+        containers_by_loader[loader].append((container, context))
+
+    for loader, containers_contexts in containers_by_loader.items():
+        loader_errors = loader().update_many(containers_contexts)
+        for (container, _), error in zip(containers_contexts, loader_errors):
+            if error:
+                errors.append((container, error))
+    return errors
+
+
+def _show_outdated_warning(outdated_containers):
+    """Warn about outdated containers, offer update of all of them."""
     _app = get_ayon_qt_app()
 
     message_box = QtWidgets.QMessageBox()
     message_box.setIcon(QtWidgets.QMessageBox.Warning)
     msg = "There are outdated containers in the scene."
     message_box.setText(msg)
+    message_box.setDetailedText(
+        f"Outdated containers: {len(outdated_containers)}")
+    update_button = message_box.addButton(
+        "Update all", QtWidgets.QMessageBox.AcceptRole)
+    message_box.addButton(QtWidgets.QMessageBox.Close)
     message_box.exec_()
+    if message_box.clickedButton() is not update_button:
+        return
+
+    errors = update_containers_to_latest(outdated_containers)
+    invalidate_outdated_cache()
+    if not errors:
+        return
+
+    lines = []
+    for container, error in errors:
+        log.error(f"{container['objectName']}: {error}")
+        lines.append(f"{container['objectName']}: {error}")
+    error_box = QtWidgets.QMessageBox()
+    error_box.setIcon(QtWidgets.QMessageBox.Warning)
+    error_box.setWindowTitle("Update to latest")
+    error_box.setText(f"{len(errors)} container(s) couldn't be updated.")
+    error_box.setDetailedText("\n".join(lines))
+    error_box.exec_()
 
 
 def containerise(name,
@@ -271,7 +424,42 @@ def containerise(name,
     Returns:
         container (str): Name of container assembly
     """
-    data = {
+    data = get_container_data(name, namespace, comp, context, loader)
+
+    stub = get_stub()
+    stub.imprint(comp.id, data)
+
+    return comp
+
+
+def containerise_many(containers):
+    """Containerise multiple loaded items with single metadata write.
+
+    Arguments:
+        containers (list): of tuples (name, namespace, comp, context, loader),
+            same as arguments of 'containerise'
+
+    Returns:
+        (list): of AEItem
+    """
+    items_data = []
+    comps = []
+    for name, namespace, comp, context, loader in containers:
+        items_data.append(
+            (comp.id, get_container_data(
+                name, namespace, comp, context, loader))
+        )
+        comps.append(comp)
+
+    stub = get_stub()
+    stub.imprint_many(items_data)
+
+    return comps
+
+
+def get_container_data(name, namespace, comp, context, loader=None):
+    """Metadata of container stored on 'comp'."""
+    return {
         "schema": "ayon:container-3.0",
         "id": AYON_CONTAINER_ID,
         "name": name,
@@ -281,11 +469,6 @@ def containerise(name,
         "members": comp.members or [comp.id]
     }
 
-    stub = get_stub()
-    stub.imprint(comp.id, data)
-
-    return comp
-
 
 def cache_and_get_instances(creator):
     """Cache instances in shared data.
@@ -20,6 +20,51 @@ class AfterEffectsLoader(LoaderPlugin):
         stub.imprint(item.id, {})
         stub.delete_item(item.id)
 
+    def load_many(self, contexts, options=None):
+        """Load multiple representations.
+
+        Loaders supporting bulk load override this to reuse queries and
+        round trips to AE, default implementation loads one by one.
+
+        Args:
+            contexts (list): of representation contexts, same as 'context'
+                of 'load'
+            options (dict): same for all 'contexts'
+
+        Returns:
+            (list): of containers (None for failed load) in order of
+                'contexts'
+        """
+        return [
+            self.load(context, context["product"]["name"], None, options)
+            for context in contexts
+        ]
+
+    def update_many(self, containers_contexts):
+        """Update multiple containers.
+
+        Loaders supporting bulk update override this to reuse queries and
+        round trips to AE, default implementation updates one by one.
+
+        Args:
+            containers_contexts (list): of tuples (container, context), same
+                as arguments of 'update'
+
+        Returns:
+            (list): of error messages (None if updated) in order of
+                'containers_contexts'
+        """
+        errors = []
+        for container, context in containers_contexts:
+            try:
+                self.update(container, context)
+            except Exception as exc:
+                self.log.warning("Update failed", exc_info=True)
+                errors.append(str(exc))
+            else:
+                errors.append(None)
+        return errors
+
     def switch(self, container, context):
         self.update(container, context)
 
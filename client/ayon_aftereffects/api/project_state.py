@@ -0,0 +1,297 @@
+"""Cache of project state pulled from After Effects.
+
+Metadata stored in project (containers, instances, placeholders) and list of
+project items are pulled many times during single publish or Scene Inventory
+refresh. Both could be large for bigger projects, so they are held here and
+reused until project in AE changes.
+"""
+import collections
+import contextlib
+import copy
+
+
+class ProjectStateCache(object):
+    """Holds parsed project metadata and items between stub calls.
+
+    Validity is driven by project 'generation' stamp provided by AE side.
+    Stamp changes on every mutating call made through extension, when
+    project items are added or removed or when different project is opened.
+
+    Metadata are changed only through extension, so they are reused while
+    generation is unchanged.
+
+    Items might be changed directly by artist in AE (eg. renamed) without
+    change of generation, so they are reused only inside of 'hold' block.
+    Generation is not checked inside of 'hold' block at all, only mutations
+    made through stub invalidate cache there.
+
+    Cache could be disabled for rest of session (eg. when generation
+    cannot be pulled), values are always pulled from AE then.
+    """
+    def __init__(self):
+        self._generation = None
+        self._metadata = None
+        self._metadata_index = None
+        self._items = {}
+        self._hold_depth = 0
+        self._disabled = False
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @property
+    def is_held(self):
+        return self._hold_depth > 0
+
+    @property
+    def is_disabled(self):
+        return self._disabled
+
+    def disable(self):
+        """Stop caching, nothing is stored anymore."""
+        self._disabled = True
+        self.invalidate()
+
+    def needs_validation(self):
+        """Generation must be checked before cached values are used."""
+        if self._disabled:
+            return False
+        return not self.is_held or self._generation is None
+
+    def validate(self, generation):
+        """Drop cached values if 'generation' differs from cached one.
+
+        Args:
+            generation (str|None): current generation stamp from AE, None
+                if AE doesn't provide it (old extension), nothing is cached
+                then
+        """
+        if self._disabled:
+            return
+        if generation is None or generation != self._generation:
+            self._metadata = None
+            self._metadata_index = None
+            self._items = {}
+        self._generation = generation
+
+    def invalidate(self):
+        """Drop all cached values, called after mutation through stub."""
+        self._generation = None
+        self._metadata = None
+        self._metadata_index = None
+        self._items = {}
+
+    def get_metadata(self):
+        return self._metadata
+
+    def set_metadata(self, metadata):
+        if self._generation is not None:
+            self._metadata = metadata
+            self._metadata_index = None
+
+    def update_metadata(self, generation, metadata):
+        """Store 'metadata' written to AE by stub under new 'generation'.
+
+        Cached items are kept, writing of metadata doesn't change them.
+        """
+        if generation is None or self._disabled:
+            self.invalidate()
+            return
+        self._generation = generation
+        self._metadata = metadata
+        self._metadata_index = None
+
+    def get_metadata_index(self):
+        """Index of cached metadata, created on first access."""
+        if self._metadata is None:
+            return None
+        if self._metadata_index is None:
+            self._metadata_index = MetadataIndex(self._metadata)
+        return self._metadata_index
+
+    def get_items(self, key):
+        if not self.is_held:
+            return None
+        return self._items.get(key)
+
+    def set_items(self, key, items):
+        if self.is_held and self._generation is not None:
+            self._items[key] = items
+
+    @contextlib.contextmanager
+    def hold(self):
+        """Trust cached values without asking AE for generation.
+
+        Use for blocks of code which read project state multiple times, only
+        mutations made via stub invalidate cached values inside of block.
+        """
+        self._hold_depth += 1
+        try:
+            yield self
+        finally:
+            self._hold_depth -= 1
+
+
+class MetadataIndex(object):
+    """Lookup of project metadata entries by their identifiers.
+
+    Built once per metadata snapshot, replaces linear scans of whole
+    metadata list for each queried item.
+
+    Entries in 'metadata' might be shared with cache, returned entries are
+    copies, so callers could modify them.
+
+    Args:
+        metadata (list): of dicts stored in project
+    """
+    def __init__(self, metadata):
+        self._metadata = metadata
+        self._containers_by_member_id = {}
+        self._instances_by_id = {}
+        self._placeholders_by_uuid = {}
+        self._positions_by_member_id = collections.defaultdict(list)
+        self._positions_by_instance_id = collections.defaultdict(list)
+        # 'uuid' is legacy identifier of instances
+        self._positions_by_instance_key = collections.defaultdict(list)
+
+        for position, item_meta in enumerate(metadata):
+            members = item_meta.get("members")
+            if members:
+                member_id = str(members[0])
+                self._positions_by_member_id[member_id].append(position)
+                if "container" in (item_meta.get("id") or ""):
+                    self._containers_by_member_id.setdefault(
+                        member_id, item_meta)
+
+            instance_id = item_meta.get("instance_id")
+            if instance_id:
+                self._positions_by_instance_id[instance_id].append(position)
+                self._instances_by_id.setdefault(instance_id, item_meta)
+
+            instance_key = instance_id or item_meta.get("uuid")
+            if instance_key:
+                self._positions_by_instance_key[instance_key].append(position)
+
+            if item_meta.get("is_placeholder") and item_meta.get("uuid"):
+                self._placeholders_by_uuid.setdefault(
+                    item_meta["uuid"], item_meta)
+
+    @property
+    def metadata(self):
+        """Indexed metadata, must not be modified."""
+        return self._metadata
+
+    def get_container(self, member_id):
+        """Container metadata for item with 'member_id' as first member."""
+        return self._copy(self._containers_by_member_id.get(str(member_id)))
+
+    def get_instance(self, instance_id):
+        return self._copy(self._instances_by_id.get(instance_id))
+
+    def get_placeholder(self, placeholder_uuid):
+        return self._copy(self._placeholders_by_uuid.get(placeholder_uuid))
+
+    def get_item_positions(self, item_id):
+        """Positions of entries for 'item_id'.
+
+        Args:
+            item_id (int|str): id of item (first member) or 'instance_id'
+
+        Returns:
+            (list) of int: sorted indexes to 'metadata'
+        """
+        positions = set(self._positions_by_member_id.get(str(item_id), []))
+        positions.update(self._positions_by_instance_id.get(item_id, []))
+        return sorted(positions)
+
+    def get_instance_positions(self, instance_id):
+        """Positions of entries with 'instance_id' (or legacy 'uuid')."""
+        return list(self._positions_by_instance_key.get(instance_id, []))
+
+    @staticmethod
+    def _copy(item_meta):
+        if item_meta is None:
+            return None
+        return copy.deepcopy(item_meta)
+
+
+def get_imprint_patch(item_id, data):
+    """Patch updating (or removing if 'data' are empty) entries of item.
+
+    Args:
+        item_id (int|str): id of item (first member) or 'instance_id'
+        data (dict): values to be merged into entries, new entry is added
+            if no entry matches
+
+    Returns:
+        (dict)
+    """
+    if not data:
+        return {"op": "delete", "match": "item", "key": item_id}
+    return {"op": "upsert", "match": "item", "key": item_id, "data": data}
+
+
+def get_remove_instance_patch(instance_id):
+    """Patch removing entries of instance with 'instance_id'."""
+    return {"op": "delete", "match": "instance", "key": instance_id}
+
+
+def apply_metadata_patches(metadata, patches):
+    """Apply 'patches' to 'metadata' same way as 'imprintPatches' in AE.
+
+    Entries referencing removed items are not pruned here, it requires
+    knowledge of project items.
+
+    Args:
+        metadata (list): stored entries, not modified
+        patches (list): of dicts created by 'get_imprint_patch' or
+            'get_remove_instance_patch'
+
+    Returns:
+        (list): new list of entries, unchanged entries are shared
+    """
+    entries = list(metadata)
+    positions = collections.defaultdict(list)
+
+    def register(position):
+        entry = entries[position]
+        members = entry.get("members")
+        if members:
+            positions[("m", str(members[0]))].append(position)
+        instance_id = entry.get("instance_id")
+        if instance_id:
+            positions[("i", instance_id)].append(position)
+        instance_key = instance_id or entry.get("uuid")
+        if instance_key:
+            positions[("k", instance_key)].append(position)
+
+    for position in range(len(entries)):
+        register(position)
+
+    for patch in patches:
+        key = patch["key"]
+        if patch["match"] == "instance":
+            matched = positions.get(("k", key), [])
+        else:
+            matched = list(positions.get(("m", str(key)), []))
+            if isinstance(key, str):
+                matched.extend(positions.get(("i", key), []))
+
+        found = False
+        for position in matched:
+            if entries[position] is None:  # already deleted
+                continue
+            found = True
+            if patch["op"] == "delete":
+                entries[position] = None
+            else:
+                entry = dict(entries[position])
+                entry.update(patch["data"])
+                entries[position] = entry
+
+        if not found and patch["op"] == "upsert":
+            entries.append(patch["data"])
+            register(len(entries) - 1)
+
+    return [entry for entry in entries if entry is not None]
@@ -0,0 +1,322 @@
+"""Low resolution proxies of heavy footage (EXR, DPX...) for playback in AE.
+
+Frames are converted by ffmpeg, sequence is split into contiguous chunks
+(one per worker), each chunk is converted by single ffmpeg process reading
+'image2' pattern, so ffmpeg doesn't start for each frame.
+Proxies of representation are stored in '<root>/<representation id>/<variant>'
+(local cache) or in 'proxy/<variant>' folder next to published files,
+variant is '<scale>_<format>' so different settings don't collide.
+
+Entry is complete only when its manifest exists, proxies are created in
+temporary folder and renamed, so partially generated proxy is never used.
+
+Generation runs in background thread, proxy is attached to footage item
+(AE 'useProxy') when it is done, so artist doesn't need to wait for it.
+
+Environment:
+    AYON_AFTEREFFECTS_PROXY_CACHE_DIR: root of local cache, folder in temp
+        dir if not set
+"""
+import os
+import json
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import attr
+import clique
+
+from ayon_core.lib import Logger, get_ffmpeg_tool_args, run_subprocess
+
+log = Logger.get_logger(__name__)
+
+PROXY_CACHE_DIR_ENV = "AYON_AFTEREFFECTS_PROXY_CACHE_DIR"
+PROXY_FORMATS = ("jpg", "png")
+PROXY_LOCATIONS = ("local", "publish")
+MANIFEST_NAME = "manifest.json"
+
+
+@attr.s
+class ProxyJob(object):
+    """Proxy requested for single loaded representation."""
+    representation_id = attr.ib()
+    # abs paths of source frames, single path for still image
+    source_files = attr.ib()
+    # FootageItem proxy is attached to, None to only generate it
+    item_id = attr.ib(default=None)
+
+    @property
+    def is_sequence(self):
+        return len(self.source_files) > 1
+
+
+def get_proxy_cache_dir():
+    return os.getenv(PROXY_CACHE_DIR_ENV) or os.path.join(
+        tempfile.gettempdir(), "ayon_aftereffects_proxies"
+    )
+
+
+def get_source_files(path, is_sequence):
+    """Paths of all frames of sequence which 'path' belongs to.
+
+    Args:
+        path (str): path of loaded file (first frame of sequence)
+        is_sequence (bool)
+
+    Returns:
+        (list): sorted abs paths, only 'path' for single file
+    """
+    if not is_sequence:
+        return [path]
+    dirpath, file_name = os.path.split(path)
+    try:
+        file_names = os.listdir(dirpath)
+    except OSError:
+        return [path]
+    collections, _ = clique.assemble(file_names)
+    for collection in collections:
+        if file_name in collection:
+            return [os.path.join(dirpath, name) for name in collection]
+    return [path]
+
+
+def get_proxy_dir(job, scale, proxy_format, location="local"):
+    """Folder of proxies of 'job' for these settings."""
+    variant = "{}_{}".format(scale, proxy_format)
+    if location == "publish":
+        return os.path.join(
+            os.path.dirname(job.source_files[0]), "proxy", variant
+        )
+    return os.path.join(get_proxy_cache_dir(), job.representation_id, variant)
+
+
+def get_proxy_file_name(source_path, proxy_format):
+    base_name = os.path.splitext(os.path.basename(source_path))[0]
+    return "{}.{}".format(base_name, proxy_format)
+
+
+def generate_proxy(
+    job, scale=0.5, proxy_format="jpg", location="local", max_workers=4
+):
+    """Convert source files of 'job', reuse already generated proxies.
+
+    Falls back to local cache if publish folder is not writable.
+
+    Returns:
+        (str|None): path of first proxy file, None if conversion failed
+    """
+    proxy_dir = get_proxy_dir(job, scale, proxy_format, location)
+    first_name = get_proxy_file_name(job.source_files[0], proxy_format)
+    if os.path.exists(os.path.join(proxy_dir, MANIFEST_NAME)):
+        log.debug(f"Reusing proxy in {proxy_dir}")
+        return os.path.join(proxy_dir, first_name)
+
+    tmp_dir = "{}.tmp{}".format(proxy_dir, os.getpid())
+    try:
+        os.makedirs(tmp_dir, exist_ok=True)
+    except OSError:
+        if location == "local":
+            raise
+        log.warning(
+            f"Cannot write proxy to {proxy_dir}, using local cache",
+            exc_info=True
+        )
+        return generate_proxy(job, scale, proxy_format, "local", max_workers)
+
+    try:
+        chunks = get_frame_chunks(job.source_files, max_workers)
+        max_workers = max(1, min(max_workers, len(chunks)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # each thread waits for its own ffmpeg process
+            file_names = [
+                file_name
+                for chunk_file_names in executor.map(
+                    lambda chunk: _convert_chunk(
+                        chunk, tmp_dir, scale, proxy_format
+                    ),
+                    chunks
+                )
+                for file_name in chunk_file_names
+            ]
+        with open(os.path.join(tmp_dir, MANIFEST_NAME), "w") as stream:
+            json.dump(
+                {
+                    "representation_id": job.representation_id,
+                    "files": file_names,
+                },
+                stream
+            )
+        os.rename(tmp_dir, proxy_dir)
+    except (OSError, RuntimeError):
+        log.warning(f"Proxy generation of {proxy_dir} failed",
+                    exc_info=True)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if os.path.exists(os.path.join(proxy_dir, MANIFEST_NAME)):
+            # created concurrently by other process
+            return os.path.join(proxy_dir, first_name)
+        return None
+    return os.path.join(proxy_dir, first_name)
+
+
+def start_proxy_generation(
+    jobs, stub=None, scale=0.5, proxy_format="jpg", location="local",
+    max_workers=4
+):
+    """Generate proxies of 'jobs' in background thread.
+
+    Args:
+        jobs (list): of ProxyJob
+        stub (AfterEffectsServerStub): attaches proxies to items of jobs
+            with 'item_id', if provided
+
+    Returns:
+        (threading.Thread)
+    """
+    thread = threading.Thread(
+        target=_generate_proxies,
+        args=(jobs, stub, scale, proxy_format, location, max_workers),
+        name="AEProxyGeneration",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def _generate_proxies(jobs, stub, scale, proxy_format, location,
+                      max_workers):
+    for job in jobs:
+        try:
+            proxy_path = generate_proxy(
+                job, scale, proxy_format, location, max_workers
+            )
+        except Exception:
+            log.warning("Proxy generation failed", exc_info=True)
+            continue
+        if not proxy_path or stub is None or job.item_id is None:
+            continue
+        try:
+            stub.set_proxy(
+                job.item_id, proxy_path.replace("\\", "/"), job.is_sequence
+            )
+        except Exception:
+            log.warning(
+                f"Proxy {proxy_path} couldn't be attached to {job.item_id}",
+                exc_info=True
+            )
+        else:
+            log.info(f"Proxy {proxy_path} attached to {job.item_id}")
+
+
+@attr.s
+class FrameChunk(object):
+    """Contiguous frames converted by single ffmpeg process.
+
+    Chunk of single file has no 'collection'.
+    """
+    source_files = attr.ib()
+    collection = attr.ib(default=None)
+    start = attr.ib(default=None)
+
+
+def get_frame_chunks(source_files, max_workers=4):
+    """Split 'source_files' into contiguous chunks, about one per worker.
+
+    Args:
+        source_files (list): abs paths of frames (or single file)
+        max_workers (int)
+
+    Returns:
+        (list): of FrameChunk
+    """
+    if len(source_files) < 2:
+        return [FrameChunk(list(source_files))]
+
+    dirpath = os.path.dirname(source_files[0])
+    collections, remainders = clique.assemble(
+        [os.path.basename(path) for path in source_files]
+    )
+    chunks = [
+        FrameChunk([os.path.join(dirpath, file_name)])
+        for file_name in remainders
+    ]
+    chunk_size = -(-len(source_files) // max(1, max_workers))
+    for collection in collections:
+        for frame_range in collection.separate():
+            frames = sorted(frame_range.indexes)
+            for idx in range(0, len(frames), chunk_size):
+                chunk_frames = frames[idx:idx + chunk_size]
+                chunks.append(FrameChunk(
+                    [
+                        os.path.join(dirpath, _get_frame_name(
+                            collection, frame))
+                        for frame in chunk_frames
+                    ],
+                    collection,
+                    chunk_frames[0]
+                ))
+    return chunks
+
+
+def _get_frame_name(collection, frame):
+    return "{}{}{}".format(
+        collection.head, str(frame).zfill(collection.padding), collection.tail
+    )
+
+
+def _get_image2_pattern(collection, dirpath, proxy_format=None):
+    """ffmpeg 'image2' pattern of 'collection', output if 'proxy_format'."""
+    frame_token = "%d"
+    if collection.padding:
+        frame_token = "%0{}d".format(collection.padding)
+    file_name = "{}{}{}".format(
+        collection.head.replace("%", "%%"),
+        frame_token,
+        collection.tail.replace("%", "%%")
+    )
+    if proxy_format:
+        file_name = "{}.{}".format(
+            os.path.splitext(file_name)[0], proxy_format)
+    return os.path.join(dirpath, file_name)
+
+
+def _convert_chunk(chunk, output_dir, scale, proxy_format):
+    """Downscale frames of 'chunk', returns names of created files."""
+    source_path = chunk.source_files[0]
+    input_args = []
+    if source_path.lower().endswith(".exr"):
+        # linear values would look dark in 8bit output
+        input_args.extend(["-apply_trc", "iec61966_2_1"])
+    output_args = ["-vf", "scale=trunc(iw*{0}):trunc(ih*{0})".format(scale)]
+    if proxy_format == "jpg":
+        output_args.extend(["-q:v", "2"])
+
+    if chunk.collection is None:
+        input_args.extend(["-i", source_path])
+        output_path = os.path.join(
+            output_dir, get_proxy_file_name(source_path, proxy_format))
+    else:
+        input_args.extend([
+            "-f", "image2",
+            "-start_number", str(chunk.start),
+            "-i", _get_image2_pattern(
+                chunk.collection, os.path.dirname(source_path))
+        ])
+        output_args.extend(["-start_number", str(chunk.start)])
+        output_path = _get_image2_pattern(
+            chunk.collection, output_dir, proxy_format)
+
+    args = get_ffmpeg_tool_args(
+        "ffmpeg",
+        "-y",
+        "-loglevel", "error",
+        *input_args,
+        *output_args,
+        "-frames:v", str(len(chunk.source_files)),
+        output_path
+    )
+    run_subprocess(args, logger=log)
+    return [
+        get_proxy_file_name(path, proxy_format)
+        for path in chunk.source_files
+    ]
@@ -0,0 +1,321 @@
+"""Opt-in profiler of publish plugins.
+
+Profiler is active only during publish, it is started by
+'CollectPublishProfiler' and stopped by 'WritePublishProfile' (or by start
+of next publish if previous one failed).
+
+Each processed pyblish plugin (per instance) records wall time, count and
+payload sizes of RPC calls to AE (from 'rpc_stats') and count of filesystem
+calls made by publishing thread (from audit hook). Plugins are processed one
+after another, so difference of counters between two 'pluginProcessed'
+events belongs to the latter plugin.
+
+Report is written next to workfile when publish finishes:
+    <workfile>_publish_profile.json - all entries and totals
+    <workfile>_publish_profile.folded - folded stacks of wall time in
+        microseconds ('publish;plugin;instance value'), input for
+        flamegraph.pl, speedscope or similar tools
+
+Environment:
+    AYON_AFTEREFFECTS_PUBLISH_PROFILE: enables profiler if truthy, could be
+        enabled by 'publish_profiler' project setting too
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import collections
+
+import pyblish.api
+
+from ayon_core.lib import Logger, env_value_to_bool
+
+from .webserver import WebServerTool
+
+log = Logger.get_logger(__name__)
+
+PUBLISH_PROFILE_ENV = "AYON_AFTEREFFECTS_PUBLISH_PROFILE"
+
+# audit events counted as filesystem calls
+FS_AUDIT_EVENTS = {
+    "open",
+    "os.listdir",
+    "os.scandir",
+    "os.remove",
+    "os.rename",
+    "os.mkdir",
+    "os.link",
+    "os.symlink",
+    "os.chmod",
+    "os.utime",
+    "os.truncate",
+    "shutil.copyfile",
+    "shutil.copytree",
+    "shutil.rmtree",
+    "shutil.move",
+    "glob.glob",
+}
+
+_profiler = None
+_audit_hook_added = False
+
+
+def is_publish_profiler_enabled(project_settings=None):
+    """Profiler is enabled by env var or by project settings."""
+    if env_value_to_bool(PUBLISH_PROFILE_ENV, default=False):
+        return True
+    if project_settings is None:
+        return False
+    return bool(project_settings["aftereffects"].get("publish_profiler"))
+
+
+def start_publish_profiler(context):
+    """Start profiling of publish of 'context' in current thread.
+
+    Profile of previous publish is written if it wasn't stopped (failed).
+
+    Returns:
+        (PublishProfiler)
+    """
+    global _profiler, _audit_hook_added
+    if _profiler is None:
+        _profiler = PublishProfiler()
+    if not _audit_hook_added:
+        # audit hooks cannot be removed, hook is added once and counts
+        #   only while profiler is active
+        sys.addaudithook(_audit_hook)
+        _audit_hook_added = True
+    _profiler.stop()
+    _profiler.start(context)
+    return _profiler
+
+
+def stop_publish_profiler():
+    """Stop profiling and write report, returns its path (or None)."""
+    if _profiler is None:
+        return None
+    return _profiler.stop()
+
+
+def get_publish_profiler():
+    """Profiler of current or last publish, None if never started."""
+    return _profiler
+
+
+def _audit_hook(event, args):
+    if event in FS_AUDIT_EVENTS and _profiler is not None:
+        _profiler.count_fs_call(event)
+
+
+class PublishProfiler(object):
+    """Collects profile entries of processed publish plugins."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fs_calls = collections.Counter()
+        self._context = None
+        self._thread_id = None
+        self._entries = []
+        self._started = None
+        self._last_rpc_stats = {}
+        self._last_fs_calls = collections.Counter()
+        self._measured_payloads = False
+        self.last_report = None
+        self.last_report_path = None
+
+    @property
+    def is_active(self):
+        return self._thread_id is not None
+
+    def start(self, context):
+        """Profile plugins processed from now on in current thread."""
+        rpc_stats = WebServerTool.get_instance().rpc_stats
+        with self._lock:
+            self._context = context
+            self._entries = []
+            self._started = time.time()
+            self._measured_payloads = rpc_stats.measure_payloads
+            rpc_stats.measure_payloads = True
+            self._take_snapshot()
+            self._thread_id = threading.get_ident()
+        pyblish.api.register_callback("pluginProcessed", self._on_processed)
+
+    def stop(self):
+        """Stop profiling and write report, returns its path (or None)."""
+        with self._lock:
+            if not self.is_active:
+                return None
+            self._thread_id = None
+            pyblish.api.deregister_callback(
+                "pluginProcessed", self._on_processed)
+            WebServerTool.get_instance().rpc_stats.measure_payloads = (
+                self._measured_payloads)
+            if not self._entries:
+                return None
+            self._write_report()
+            self._entries = []
+            return self.last_report_path
+
+    def count_fs_call(self, event):
+        # filesystem calls of other threads (eg. webserver) are ignored
+        if self._thread_id == threading.get_ident():
+            self._fs_calls[event] += 1
+
+    def _get_rpc_counters(self):
+        # payloads are measured while profiling, sizes are None only for
+        #   methods not called since then
+        stats = WebServerTool.get_instance().rpc_stats.get_stats()
+        return {
+            method_name: (
+                method_stats["count"],
+                method_stats["request_bytes"] or 0,
+                method_stats["response_bytes"] or 0,
+            )
+            for method_name, method_stats in stats["methods"].items()
+        }
+
+    def _take_snapshot(self):
+        """Counters are compared with this snapshot by next entry."""
+        self._last_rpc_stats = self._get_rpc_counters()
+        self._last_fs_calls = collections.Counter(self._fs_calls)
+
+    def _on_processed(self, result):
+        plugin = result["plugin"]
+        instance = result.get("instance")
+        with self._lock:
+            if not self.is_active:
+                return
+            rpc_counters = self._get_rpc_counters()
+            rpc_by_method = {}
+            for method_name, counters in rpc_counters.items():
+                previous = self._last_rpc_stats.get(method_name, (0, 0, 0))
+                delta = [now - prev for now, prev in zip(counters, previous)]
+                if delta[0]:
+                    rpc_by_method[method_name] = {
+                        "calls": delta[0],
+                        "request_bytes": delta[1],
+                        "response_bytes": delta[2],
+                    }
+            self._last_rpc_stats = rpc_counters
+
+            fs_calls = collections.Counter(self._fs_calls)
+            fs_delta = fs_calls - self._last_fs_calls
+            self._last_fs_calls = fs_calls
+
+            self._entries.append({
+                "plugin": plugin.__name__,
+                "label": getattr(plugin, "label", None) or plugin.__name__,
+                "order": plugin.order,
+                "instance": instance.data.get("name") if instance else None,
+                "duration_ms": round(result.get("duration") or 0.0, 3),
+                "rpc_calls": sum(
+                    item["calls"] for item in rpc_by_method.values()),
+                "rpc_request_bytes": sum(
+                    item["request_bytes"] for item in rpc_by_method.values()),
+                "rpc_response_bytes": sum(
+                    item["response_bytes"]
+                    for item in rpc_by_method.values()
+                ),
+                "rpc_by_method": rpc_by_method,
+                "fs_calls": sum(fs_delta.values()),
+                "fs_by_event": dict(fs_delta),
+                "error": str(result["error"]) if result.get("error") else None,
+            })
+
+    def _write_report(self):
+        report = {
+            "started": self._started,
+            "totals": {
+                key: round(sum(entry[key] for entry in self._entries), 3)
+                for key in (
+                    "duration_ms",
+                    "rpc_calls",
+                    "rpc_request_bytes",
+                    "rpc_response_bytes",
+                    "fs_calls",
+                )
+            },
+            "entries": self._entries,
+        }
+        base_path = _get_report_base_path(self._context)
+        try:
+            with open(base_path + ".json", "w") as stream:
+                json.dump(report, stream, indent=4)
+            with open(base_path + ".folded", "w") as stream:
+                stream.write(to_folded_stacks(report))
+        except OSError:
+            log.warning("Publish profile couldn't be written", exc_info=True)
+        else:
+            log.info(f"Publish profile written to {base_path}.json")
+            self.last_report_path = base_path + ".json"
+        self.last_report = report
+
+
+def to_folded_stacks(report):
+    """Folded stacks of wall time in microseconds, one line per entry."""
+    lines = []
+    for entry in report["entries"]:
+        frames = ["publish", entry["label"].replace(";", ",")]
+        if entry["instance"]:
+            frames.append(entry["instance"].replace(";", ","))
+        value = int(entry["duration_ms"] * 1000)
+        if value:
+            lines.append("{} {}".format(";".join(frames), value))
+    return "\n".join(lines) + "\n"
+
+
+def format_summary(report, limit=20):
+    """Table of slowest plugins aggregated over instances.
+
+    Args:
+        report (dict): from 'PublishProfiler.last_report'
+        limit (int): max count of rows
+
+    Returns:
+        (str)
+    """
+    by_plugin = collections.OrderedDict()
+    for entry in report["entries"]:
+        row = by_plugin.setdefault(
+            entry["label"], {"runs": 0, "ms": 0.0, "rpc": 0, "kb": 0, "fs": 0}
+        )
+        row["runs"] += 1
+        row["ms"] += entry["duration_ms"]
+        row["rpc"] += entry["rpc_calls"]
+        row["kb"] += (
+            entry["rpc_request_bytes"] + entry["rpc_response_bytes"]) / 1024.0
+        row["fs"] += entry["fs_calls"]
+
+    lines = ["{:<45} {:>5} {:>10} {:>6} {:>10} {:>7}".format(
+        "Plugin", "Runs", "Time (ms)", "RPC", "RPC (kB)", "FS")]
+    rows = sorted(by_plugin.items(), key=lambda item: -item[1]["ms"])
+    for label, row in rows[:limit]:
+        lines.append("{:<45} {:>5} {:>10.1f} {:>6} {:>10.1f} {:>7}".format(
+            label[:45], row["runs"], row["ms"], row["rpc"], row["kb"],
+            row["fs"]
+        ))
+    totals = report["totals"]
+    lines.append("{:<45} {:>5} {:>10.1f} {:>6} {:>10.1f} {:>7}".format(
+        "Total",
+        len(report["entries"]),
+        totals["duration_ms"],
+        totals["rpc_calls"],
+        (totals["rpc_request_bytes"] + totals["rpc_response_bytes"]) / 1024.0,
+        totals["fs_calls"],
+    ))
+    return "\n".join(lines)
+
+
+def _get_report_base_path(context=None):
+    """Path next to workfile without extension, temp dir if not saved."""
+    current_file = None
+    if context is not None:
+        current_file = context.data.get("currentFile")
+    if current_file:
+        base_path, _ = os.path.splitext(current_file)
+        return base_path + "_publish_profile"
+    return os.path.join(
+        tempfile.gettempdir(),
+        "ayon_aftereffects_publish_profile_{}".format(os.getpid())
+    )
@@ -0,0 +1,321 @@
+"""Cache of locally rendered frames keyed by state of composition.
+
+Key is hash of composition fingerprint (layers, properties, render queue
+and output module settings - see 'getRenderFingerprints' in JSX), paths of
+used footage with their modification times and rendered frame range.
+
+Unchanged composition reuses frames from cache, they are hard linked (or
+copied if linking is not possible) into staging dir.
+
+Cache is pruned after each stored entry, entries not used for longer than
+max age are removed, then least recently used entries until cache fits
+into max size.
+
+Environment:
+    AYON_AFTEREFFECTS_RENDER_CACHE_DIR: root of cache, folder in temp dir
+        if not set
+    AYON_AFTEREFFECTS_RENDER_CACHE_MAX_SIZE: max size of cache in GB,
+        50 if not set
+    AYON_AFTEREFFECTS_RENDER_CACHE_MAX_AGE: max age of unused entry in
+        days, 14 if not set
+"""
+import os
+import json
+import time
+import shutil
+import logging
+import hashlib
+import tempfile
+
+log = logging.getLogger(__name__)
+
+RENDER_CACHE_DIR_ENV = "AYON_AFTEREFFECTS_RENDER_CACHE_DIR"
+RENDER_CACHE_MAX_SIZE_ENV = "AYON_AFTEREFFECTS_RENDER_CACHE_MAX_SIZE"
+RENDER_CACHE_MAX_AGE_ENV = "AYON_AFTEREFFECTS_RENDER_CACHE_MAX_AGE"
+DEFAULT_MAX_SIZE_GB = 50
+DEFAULT_MAX_AGE_DAYS = 14
+MANIFEST_NAME = "manifest.json"
+
+
+def get_render_cache_dir():
+    return os.getenv(RENDER_CACHE_DIR_ENV) or os.path.join(
+        tempfile.gettempdir(), "ayon_aftereffects_render_cache"
+    )
+
+
+def _get_env_float(env_name, default):
+    value = os.getenv(env_name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        log.warning(f"Invalid value of {env_name}: '{value}'")
+        return default
+
+
+def get_render_cache_max_size():
+    """Max size of cache in bytes."""
+    return int(
+        _get_env_float(RENDER_CACHE_MAX_SIZE_ENV, DEFAULT_MAX_SIZE_GB)
+        * 1024 ** 3
+    )
+
+
+def get_render_cache_max_age():
+    """Max age of unused cache entry in seconds."""
+    return _get_env_float(
+        RENDER_CACHE_MAX_AGE_ENV, DEFAULT_MAX_AGE_DAYS
+    ) * 24 * 3600
+
+
+def get_footage_state(footage):
+    """State of footage file(s) on disk.
+
+    Sequences are represented by count, total size and latest modification
+    time of files with same extension in its folder.
+
+    Args:
+        footage (dict): with 'path' and 'is_sequence'
+
+    Returns:
+        (list|None): None if footage is missing
+    """
+    path = footage.get("path")
+    if not path:
+        return None
+    try:
+        if not footage.get("is_sequence"):
+            stat = os.stat(path)
+            return [stat.st_size, stat.st_mtime_ns]
+
+        ext = os.path.splitext(path)[1].lower()
+        count = size = mtime = 0
+        with os.scandir(os.path.dirname(path)) as iterator:
+            for dir_entry in iterator:
+                if not dir_entry.name.lower().endswith(ext):
+                    continue
+                stat = dir_entry.stat()
+                count += 1
+                size += stat.st_size
+                mtime = max(mtime, stat.st_mtime_ns)
+        return [count, size, mtime]
+    except OSError:
+        return None
+
+
+def get_render_cache_key(
+    fingerprint, frame_start, frame_end, output_file_names=None
+):
+    """Hash of everything which affects rendered frames and their names.
+
+    Fingerprint doesn't contain output paths of output modules ("Output
+    File Info" differs for each staging dir), so names of rendered files
+    are part of key separately.
+
+    Args:
+        fingerprint (dict): from 'stub.get_render_fingerprints'
+        frame_start (int)
+        frame_end (int)
+        output_file_names (list): of file name templates (with frame
+            pattern and extension, eg. 'sh010_[#####].png') of output
+            modules
+
+    Returns:
+        (str|None): None if composition cannot be cached (some footage is
+            missing or some property value is not accessible)
+    """
+    if fingerprint.get("uncacheable") or "layers" not in fingerprint:
+        return None
+
+    footage_states = []
+    for footage in sorted(
+        fingerprint["footage"], key=lambda item: item["path"] or ""
+    ):
+        state = get_footage_state(footage)
+        if state is None:
+            return None
+        footage_states.append([footage["path"], state])
+
+    data = {
+        "layers_hash": hashlib.sha256(
+            fingerprint["layers"].encode("utf-8")
+        ).hexdigest(),
+        "render_settings": fingerprint["render_settings"],
+        "output_modules": fingerprint["output_modules"],
+        "footage": footage_states,
+        "frame_range": [frame_start, frame_end],
+        "output_file_names": list(output_file_names or []),
+    }
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+class RenderCache(object):
+    """Rendered frames stored in '<root>/<key[:2]>/<key>'.
+
+    Entry is complete only when its manifest exists, entries are created in
+    temporary folder and renamed, so partially stored entry is never used.
+    Modification time of manifest is last use of entry.
+
+    Args:
+        root (str): root of cache, from env or temp dir if not provided
+        max_size (int): in bytes, from env if not provided
+        max_age (float): in seconds, from env if not provided
+    """
+    def __init__(self, root=None, max_size=None, max_age=None):
+        self.root = root or get_render_cache_dir()
+        if max_size is None:
+            max_size = get_render_cache_max_size()
+        if max_age is None:
+            max_age = get_render_cache_max_age()
+        self.max_size = max_size
+        self.max_age = max_age
+
+    def get_entry_dir(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def get_file_names(self, key):
+        """Names of cached files, None if 'key' is not cached."""
+        manifest_path = os.path.join(self.get_entry_dir(key), MANIFEST_NAME)
+        try:
+            with open(manifest_path, "r") as stream:
+                return json.load(stream)["files"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def restore(self, key, staging_dir):
+        """Link cached files into 'staging_dir'.
+
+        Returns:
+            (list|None): names of restored files, None if not cached
+        """
+        file_names = self.get_file_names(key)
+        if not file_names:
+            return None
+
+        entry_dir = self.get_entry_dir(key)
+        os.makedirs(staging_dir, exist_ok=True)
+        try:
+            for file_name in file_names:
+                _link_or_copy(
+                    os.path.join(entry_dir, file_name),
+                    os.path.join(staging_dir, file_name)
+                )
+        except OSError:
+            log.warning(f"Cannot restore {entry_dir}", exc_info=True)
+            return None
+        _touch(os.path.join(entry_dir, MANIFEST_NAME))
+        return file_names
+
+    def store(self, key, staging_dir, file_names):
+        """Store 'file_names' from 'staging_dir' under 'key'."""
+        entry_dir = self.get_entry_dir(key)
+        if os.path.exists(entry_dir):
+            return entry_dir
+
+        tmp_dir = "{}.tmp{}".format(entry_dir, os.getpid())
+        try:
+            os.makedirs(tmp_dir, exist_ok=True)
+            for file_name in file_names:
+                _link_or_copy(
+                    os.path.join(staging_dir, file_name),
+                    os.path.join(tmp_dir, file_name)
+                )
+            with open(os.path.join(tmp_dir, MANIFEST_NAME), "w") as stream:
+                json.dump({"files": sorted(file_names)}, stream)
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            log.warning(f"Cannot store render cache {entry_dir}",
+                        exc_info=True)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return None
+        self.prune(keep_keys={key})
+        return entry_dir
+
+    def prune(self, keep_keys=None):
+        """Remove expired and least recently used entries.
+
+        Args:
+            keep_keys (set): keys which are never removed (eg. just stored)
+
+        Returns:
+            (list): removed keys
+        """
+        keep_keys = keep_keys or set()
+        now = time.time()
+        entries = []
+        total_size = 0
+        for key, entry_dir, last_used, size in self._list_entries():
+            if key not in keep_keys and now - last_used > self.max_age:
+                self._remove_entry(key, entry_dir)
+                continue
+            entries.append((last_used, key, entry_dir, size))
+            total_size += size
+
+        removed = []
+        for _, key, entry_dir, size in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            if key in keep_keys:
+                continue
+            if self._remove_entry(key, entry_dir):
+                removed.append(key)
+                total_size -= size
+        return removed
+
+    def _list_entries(self):
+        """Yield complete entries as (key, dir, last used, size)."""
+        try:
+            prefix_entries = list(os.scandir(self.root))
+        except OSError:
+            return
+        for prefix_entry in prefix_entries:
+            if not prefix_entry.is_dir():
+                continue
+            try:
+                dir_entries = list(os.scandir(prefix_entry.path))
+            except OSError:
+                continue
+            for dir_entry in dir_entries:
+                if ".tmp" in dir_entry.name or not dir_entry.is_dir():
+                    continue
+                try:
+                    last_used = os.stat(
+                        os.path.join(dir_entry.path, MANIFEST_NAME)
+                    ).st_mtime
+                    size = sum(
+                        file_entry.stat().st_size
+                        for file_entry in os.scandir(dir_entry.path)
+                        if file_entry.is_file()
+                    )
+                except OSError:
+                    continue
+                yield dir_entry.name, dir_entry.path, last_used, size
+
+    def _remove_entry(self, key, entry_dir):
+        # manifest first, so entry is incomplete even if removal fails
+        try:
+            os.remove(os.path.join(entry_dir, MANIFEST_NAME))
+        except OSError:
+            return False
+        log.debug(f"Removing render cache entry {key}")
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        return True
+
+
+def _touch(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _link_or_copy(src, dst):
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
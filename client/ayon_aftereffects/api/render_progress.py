@@ -0,0 +1,147 @@
+"""Progress of local render pushed by the extension.
+
+Render in AE blocks until whole Render Queue is done. Panel polls output
+folder meanwhile and pushes progress to 'AfterEffectsRoute.render_progress'
+which forwards it to registered callbacks.
+
+Callbacks are triggered from websocket server thread.
+"""
+import threading
+
+import attr
+
+from ayon_core.lib import Logger
+
+log = Logger.get_logger(__name__)
+
+_callbacks = []
+_callbacks_lock = threading.Lock()
+
+
+@attr.s
+class RenderProgress(object):
+    """Single progress event of rendered composition."""
+    comp_id = attr.ib()
+    frames_done = attr.ib(default=0)
+    frames_total = attr.ib(default=None)
+    current_frame = attr.ib(default=None)
+    elapsed = attr.ib(default=0.0)  # seconds
+    remaining = attr.ib(default=None)  # seconds, None if not known yet
+    # [(frame, seconds since render start)] of newly finished frames
+    finished_frames = attr.ib(factory=list)
+    finished = attr.ib(default=False)
+
+    @classmethod
+    def from_data(cls, data):
+        """Create from payload sent by extension (times in milliseconds)."""
+        remaining = data.get("remaining_ms")
+        if remaining is not None:
+            remaining = remaining / 1000.0
+        return cls(
+            comp_id=data.get("comp_id"),
+            frames_done=data.get("frames_done", 0),
+            frames_total=data.get("frames_total"),
+            current_frame=data.get("current_frame"),
+            elapsed=data.get("elapsed_ms", 0) / 1000.0,
+            remaining=remaining,
+            finished_frames=[
+                (item["frame"], item["time_ms"] / 1000.0)
+                for item in data.get("finished_frames", [])
+            ],
+            finished=data.get("finished", False),
+        )
+
+
+def register_render_progress_callback(callback):
+    """Register 'callback' receiving 'RenderProgress' of every event."""
+    with _callbacks_lock:
+        if callback not in _callbacks:
+            _callbacks.append(callback)
+
+
+def unregister_render_progress_callback(callback):
+    with _callbacks_lock:
+        if callback in _callbacks:
+            _callbacks.remove(callback)
+
+
+def emit_render_progress(data):
+    """Distribute progress payload from extension to callbacks."""
+    progress = RenderProgress.from_data(data)
+    with _callbacks_lock:
+        callbacks = list(_callbacks)
+    for callback in callbacks:
+        try:
+            callback(progress)
+        except Exception:
+            log.warning("Render progress callback failed", exc_info=True)
+    return progress
+
+
+class RenderProgressTracker(object):
+    """Collects progress of rendered compositions while used as context.
+
+    Logs each event and computes duration of each rendered frame. AE renders
+    Render Queue items one after another, so frame is timed from finish of
+    previously rendered frame of any tracked composition.
+
+    Args:
+        comp_ids (int|list): events of other compositions are ignored
+        logger (logging.Logger): where progress is logged
+        callback (callable): optional, receives each 'RenderProgress'
+    """
+    def __init__(self, comp_ids, logger=None, callback=None):
+        if not isinstance(comp_ids, (list, tuple, set)):
+            comp_ids = [comp_ids]
+        self.comp_ids = {str(comp_id) for comp_id in comp_ids}
+        self.log = logger or log
+        self._callback = callback
+        self._lock = threading.Lock()
+        # {(comp_id, frame): seconds since render start}
+        self._finish_times = {}
+
+    def __enter__(self):
+        register_render_progress_callback(self._on_progress)
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        unregister_render_progress_callback(self._on_progress)
+
+    def _on_progress(self, progress):
+        comp_id = str(progress.comp_id)
+        if comp_id not in self.comp_ids:
+            return
+        with self._lock:
+            for frame, finish_time in progress.finished_frames:
+                self._finish_times[(comp_id, frame)] = finish_time
+
+        total = progress.frames_total or "?"
+        msg = "Rendered {}/{} frames of comp {}, elapsed {:.1f}s".format(
+            progress.frames_done, total, comp_id, progress.elapsed)
+        if progress.remaining is not None:
+            msg += ", remaining ~{:.1f}s".format(progress.remaining)
+        self.log.info(msg)
+
+        if self._callback is not None:
+            self._callback(progress)
+
+    def get_frame_times(self, comp_id):
+        """Render duration of each frame of 'comp_id' in seconds.
+
+        First rendered frame includes start up of render engine.
+
+        Returns:
+            (dict): {frame (int): seconds (float)}
+        """
+        with self._lock:
+            finish_times = sorted(
+                self._finish_times.items(), key=lambda item: item[1]
+            )
+        comp_id = str(comp_id)
+        frame_times = {}
+        previous_time = 0.0
+        for (frame_comp_id, frame), finish_time in finish_times:
+            if frame_comp_id == comp_id:
+                frame_times[frame] = round(finish_time - previous_time, 3)
+            previous_time = finish_time
+        return frame_times
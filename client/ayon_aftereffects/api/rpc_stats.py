@@ -0,0 +1,219 @@
+"""Statistics of RPC calls made from Python to AE.
+
+Each call made through 'WebServerTool.call_on_client' is recorded per route
+name - count, failures, retries, latency histogram and sizes of request and
+response payloads.
+
+Payloads are serialized again to be measured, so their sizes are recorded
+only if statistics are dumped (or 'RPCStats.measure_payloads' is enabled,
+eg. by publish profiler) and for logged slow calls. Count of measured calls
+is reported as 'measured_calls', sizes are null if no call was measured.
+
+Environment:
+    AYON_AFTEREFFECTS_RPC_SLOW_CALL_MS: calls slower than this are logged,
+        0 disables logging, 2000 by default
+    AYON_AFTEREFFECTS_RPC_STATS_PATH: path to JSON file where statistics are
+        dumped when host exits, nothing is dumped if not set
+"""
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+
+log = logging.getLogger(__name__)
+
+SLOW_CALL_ENV = "AYON_AFTEREFFECTS_RPC_SLOW_CALL_MS"
+STATS_PATH_ENV = "AYON_AFTEREFFECTS_RPC_STATS_PATH"
+DEFAULT_SLOW_CALL_MS = 2000
+
+# upper bounds of latency histogram buckets in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def get_slow_call_threshold():
+    """Latency in milliseconds above which call is logged, 0 disables it."""
+    value = os.getenv(SLOW_CALL_ENV)
+    if not value:
+        return DEFAULT_SLOW_CALL_MS
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        log.warning(
+            f"Invalid value of {SLOW_CALL_ENV}: '{value}', "
+            f"using {DEFAULT_SLOW_CALL_MS}"
+        )
+    return DEFAULT_SLOW_CALL_MS
+
+
+def get_payload_size(payload):
+    """Approximate size of 'payload' sent over websocket in bytes."""
+    if payload is None:
+        return 0
+    if not isinstance(payload, str):
+        try:
+            payload = json.dumps(payload)
+        except (TypeError, ValueError):
+            payload = str(payload)
+    return len(payload.encode("utf-8"))
+
+
+class MethodStats(object):
+    """Aggregated statistics of single RPC method."""
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = 0.0
+        # sizes are sums over 'measured' calls only
+        self.measured = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        # last bucket is for calls slower than last bound
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, latency_ms, retries, request_bytes, response_bytes, failed):
+        """Add call, 'request_bytes' and 'response_bytes' are None if
+        payloads were not measured.
+        """
+        self.count += 1
+        if failed:
+            self.errors += 1
+        self.retries += retries
+        self.total_ms += latency_ms
+        if self.min_ms is None or latency_ms < self.min_ms:
+            self.min_ms = latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+        if request_bytes is not None:
+            self.measured += 1
+            self.request_bytes += request_bytes
+            self.response_bytes += response_bytes
+
+        bucket_idx = len(LATENCY_BUCKETS_MS)
+        for idx, bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= bound:
+                bucket_idx = idx
+                break
+        self.histogram[bucket_idx] += 1
+
+    def to_data(self):
+        histogram = {
+            "<={}ms".format(bound): self.histogram[idx]
+            for idx, bound in enumerate(LATENCY_BUCKETS_MS)
+        }
+        histogram[">{}ms".format(LATENCY_BUCKETS_MS[-1])] = (
+            self.histogram[-1]
+        )
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3)
+            if self.count else 0.0,
+            "min_ms": round(self.min_ms or 0.0, 3),
+            "max_ms": round(self.max_ms, 3),
+            "measured_calls": self.measured,
+            "request_bytes": self.request_bytes if self.measured else None,
+            "response_bytes": self.response_bytes if self.measured else None,
+            "histogram": histogram,
+        }
+
+
+class RPCStats(object):
+    """Statistics of all RPC methods, safe to use from multiple threads."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats_by_method = {}
+        self._started = time.time()
+        self._slow_call_ms = get_slow_call_threshold()
+        # sizes of payloads are recorded only if enabled
+        self.measure_payloads = bool(os.getenv(STATS_PATH_ENV))
+
+    def record(
+        self,
+        method_name,
+        latency_ms,
+        retries=0,
+        request=None,
+        response=None,
+        failed=False,
+    ):
+        """Record finished call.
+
+        Args:
+            method_name (str): route name
+            latency_ms (float): duration including retries
+            retries (int): count of retries
+            request (dict): arguments of call
+            response (Any): raw response from AE
+            failed (bool): call raised exception
+        """
+        is_slow = bool(self._slow_call_ms) and latency_ms > self._slow_call_ms
+        request_bytes = response_bytes = None
+        if self.measure_payloads or is_slow:
+            request_bytes = get_payload_size(request)
+            response_bytes = get_payload_size(response)
+
+        with self._lock:
+            method_stats = self._stats_by_method.get(method_name)
+            if method_stats is None:
+                method_stats = MethodStats()
+                self._stats_by_method[method_name] = method_stats
+            method_stats.add(
+                latency_ms, retries, request_bytes, response_bytes, failed
+            )
+
+        if is_slow:
+            log.warning(
+                f"Slow call of '{method_name}' took {latency_ms:.0f}ms "
+                f"(retries: {retries}, request: {request_bytes}B, "
+                f"response: {response_bytes}B)"
+            )
+
+    def get_stats(self):
+        """Snapshot of statistics.
+
+        Returns:
+            (dict): {"started": float, "methods": {method_name: dict}}
+        """
+        with self._lock:
+            methods = {
+                method_name: method_stats.to_data()
+                for method_name, method_stats in sorted(
+                    self._stats_by_method.items()
+                )
+            }
+        return {"started": self._started, "methods": methods}
+
+    def reset(self):
+        with self._lock:
+            self._stats_by_method = {}
+            self._started = time.time()
+
+    def dump(self, path=None):
+        """Write statistics as JSON file.
+
+        Args:
+            path (str): target file, 'AYON_AFTEREFFECTS_RPC_STATS_PATH' or
+                file in temp dir if not provided
+
+        Returns:
+            (str): path of written file
+        """
+        if not path:
+            path = os.getenv(STATS_PATH_ENV)
+        if not path:
+            path = os.path.join(
+                tempfile.gettempdir(),
+                "ayon_aftereffects_rpc_stats_{}.json".format(os.getpid())
+            )
+        dirpath = os.path.dirname(path)
+        if dirpath:
+            os.makedirs(dirpath, exist_ok=True)
+        with open(path, "w") as stream:
+            json.dump(self.get_stats(), stream, indent=4)
+        return path
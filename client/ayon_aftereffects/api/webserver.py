@@ -11,6 +11,7 @@ forward. Server is closed before Python process is killed.
 import os
 import urllib
 import time
+import random
 import threading
 import asyncio
 import socket
@@ -22,6 +23,8 @@ from wsrpc_aiohttp import WSRPCClient, WebSocketAsync
 from ayon_core.pipeline import get_global_context
 from ayon_core.lib import Logger
 
+from .rpc_stats import RPCStats
+
 log = Logger.get_logger(__name__)
 
 
@@ -35,6 +38,23 @@ class WebServerTool:
         self.client = None
         self.handlers = {}
         self.on_stop_callbacks = []
+        self.rpc_stats = RPCStats()
+        # set on webserver loop when client (re)connects
+        self._client_connected_event = None
+
+        self._call_max_retries = _get_env_number(
+            "AYON_AFTEREFFECTS_RPC_MAX_RETRIES", self._CALL_MAX_RETRIES, int
+        )
+        self._call_retry_delay = _get_env_number(
+            "AYON_AFTEREFFECTS_RPC_RETRY_DELAY", self._CALL_RETRY_DELAY
+        )
+        self._call_retry_max_delay = _get_env_number(
+            "AYON_AFTEREFFECTS_RPC_RETRY_MAX_DELAY",
+            self._CALL_RETRY_MAX_DELAY
+        )
+        self._call_retry_jitter = _get_env_number(
+            "AYON_AFTEREFFECTS_RPC_RETRY_JITTER", self._CALL_RETRY_JITTER
+        )
 
         port = None
         host_name = "localhost"
@@ -115,11 +135,39 @@ class WebServerTool:
         return result
 
     def call_on_client(self, stub, method_name, **kwargs):
+        """Run a single RPC on the current WebSocket client and wait for it.
+
+        Blocking facade of 'call_on_client_async' for code running outside
+        of webserver loop (Qt thread, publish plugins).
+
+        Args:
+            stub: Object with a .client property.
+            method_name: RPC method name.
+            **kwargs: Keyword arguments passed to client.call().
+
+        Returns:
+            Result of the RPC.
+
+        Raises:
+            ConnectionResetError, ConnectionError, OSError: After all retries failed.
+        """
+        return self.run_coroutine(
+            self.call_on_client_async(stub, method_name, **kwargs)
+        )
+
+    async def call_on_client_async(self, stub, method_name, **kwargs):
         """Run a single RPC on the current WebSocket client, with retry on connection errors.
 
         When the CEP extension is blocked by a long JSX operation (e.g. get_layers
         on a large PSD or save()), the WebSocket transport can close. This method
-        retries after a delay so the extension can reconnect.
+        waits until the extension reconnects (up to exponentially growing
+        delay with jitter) and retries.
+
+        Calls of 'stub.NON_IDEMPOTENT_ROUTES' are not replayed once they
+        were sent, AE might have already executed them.
+
+        Must be awaited on 'webserver_thread.loop', multiple calls could be
+        in flight at once. Each call is recorded to 'rpc_stats'.
 
         Args:
             stub: Object with a .client property.
@@ -132,38 +180,86 @@ class WebServerTool:
         Raises:
             ConnectionResetError, ConnectionError, OSError: After all retries failed.
         """
+        non_idempotent_routes = getattr(stub, "NON_IDEMPOTENT_ROUTES", ())
+        max_retries = max(self._call_max_retries, 1)
+        start = time.perf_counter()
+        attempt = 0
+        response = None
+        failed = True
         last_exception = None
-        for attempt in range(self._CALL_MAX_RETRIES):
-            try:
-                client = stub.client
-                if client is None:
-                    raise ConnectionError("No WebSocket client connected")
-                log.debug(
-                    f"websocket.call_on_client attempt {attempt + 1}/{self._CALL_MAX_RETRIES}",
-                )
-
-                if self.webserver_thread.loop:
-                    future = asyncio.run_coroutine_threadsafe(
-                        coro=client.call(method_name, **kwargs),
-                        loop=self.webserver_thread.loop,
+        try:
+            for attempt in range(max_retries):
+                client = None
+                sent = False
+                try:
+                    client = stub.client
+                    if client is None:
+                        raise ConnectionError("No WebSocket client connected")
+                    log.debug(
+                        f"websocket.call_on_client attempt {attempt + 1}/{max_retries}",
                     )
-                    return future.result()
-            except (ConnectionResetError, ConnectionError, OSError) as e:
-                last_exception = e
-                if attempt >= self._CALL_MAX_RETRIES - 1:
+
+                    try:
+                        response = await client.call(method_name, **kwargs)
+                    except asyncio.TimeoutError:
+                        # 'call' waits for response only after request was
+                        #   written, connection errors come from writing
+                        sent = True
+                        raise
+                    failed = False
+                    return response
+                except (ConnectionResetError, ConnectionError, OSError) as e:
+                    last_exception = e
+                    if sent and method_name in non_idempotent_routes:
+                        log.warning(
+                            f"WebSocket call of non idempotent '{method_name}' "
+                            f"failed, not retrying: {e}",
+                            exc_info=True,
+                        )
+                        raise e
+                    if attempt >= max_retries - 1:
+                        log.warning(
+                            f"WebSocket call failed after {attempt + 1} attempt(s): {e}",
+                            exc_info=True,
+                        )
+                        raise e
+                    delay = self._get_retry_delay(attempt)
                     log.warning(
-                        f"WebSocket call failed after {attempt + 1} attempt(s): {e}",
-                        exc_info=True,
+                        f"WebSocket connection error (attempt {attempt + 1}/{max_retries}), waiting for "
+                        f"healthy client (up to {delay:.1f}s): {e}",
+                    )
+                    await self._wait_for_healthy_client(
+                        delay, stale_client=client
                     )
-                    raise e
-                log.warning(
-                    f"WebSocket connection error (attempt {attempt + 1}/{self._CALL_MAX_RETRIES}), waiting for "
-                    f"healthy client (up to {self._CALL_RETRY_DELAY}s): {e}",
-                )
-                self._wait_for_healthy_client(self._CALL_RETRY_DELAY)
 
-        if last_exception is not None:
-            raise last_exception
+            if last_exception is not None:
+                raise last_exception
+        finally:
+            self.rpc_stats.record(
+                method_name,
+                (time.perf_counter() - start) * 1000.0,
+                retries=attempt,
+                request=kwargs,
+                response=response,
+                failed=failed,
+            )
+
+    def run_coroutine(self, coro):
+        """Run 'coro' on webserver loop and wait for its result.
+
+        Must not be called from webserver loop itself.
+
+        Returns:
+            Result of 'coro', None if webserver loop is not running.
+        """
+        if not self.webserver_thread.loop:
+            coro.close()
+            return None
+        future = asyncio.run_coroutine_threadsafe(
+            coro=coro,
+            loop=self.webserver_thread.loop,
+        )
+        return future.result()
 
     @staticmethod
     def get_instance():
@@ -171,6 +267,14 @@ class WebServerTool:
             WebServerTool()
         return WebServerTool._instance
 
+    def get_rpc_stats(self):
+        """Statistics of RPC calls made to AE, see 'RPCStats.get_stats'."""
+        return self.rpc_stats.get_stats()
+
+    def dump_rpc_stats(self, path=None):
+        """Write RPC statistics as JSON file, returns its path."""
+        return self.rpc_stats.dump(path)
+
     @property
     def is_running(self):
         if not self.webserver_thread:
@@ -194,24 +298,82 @@ class WebServerTool:
         for callback in self.on_stop_callbacks:
             callback()
 
-    # Retry policy for WebSocket calls (internal; CEP reconnect is ~5s)
+    def notify_client_connected(self):
+        """Wake up calls waiting for client, called on webserver loop.
+
+        Triggered by 'AfterEffectsRoute' when extension (re)connects.
+        """
+        self._get_client_connected_event().set()
+
+    # Retry policy for WebSocket calls (CEP reconnect is ~5s), could be
+    # overridden by 'AYON_AFTEREFFECTS_RPC_*' environment variables
     _CALL_MAX_RETRIES = 3
     _CALL_RETRY_DELAY = 6.0
+    _CALL_RETRY_MAX_DELAY = 12.0
+    _CALL_RETRY_JITTER = 0.1
+
+    def _get_retry_delay(self, attempt):
+        """Exponential backoff with jitter for 'attempt' (from 0)."""
+        delay = min(
+            self._call_retry_delay * (2 ** attempt),
+            self._call_retry_max_delay
+        )
+        jitter = delay * self._call_retry_jitter
+        return max(delay + random.uniform(-jitter, jitter), 0.0)
+
+    def _get_client_connected_event(self):
+        # event must be created on loop it is used on
+        if self._client_connected_event is None:
+            self._client_connected_event = asyncio.Event()
+        return self._client_connected_event
 
-    def _wait_for_healthy_client(self, timeout: float):
-        """Poll for a WebSocket client whose transport is not closed.
+    @staticmethod
+    def _has_healthy_client(stale_client=None):
+        clients = WebSocketAsync.get_clients()
+        for client in clients.values():
+            if client is stale_client:
+                continue
+            sock = getattr(client, "socket", None)
+            if sock is not None and getattr(sock, "closed", False):
+                continue
+            return True
+        return False
+
+    async def _wait_for_healthy_client(
+        self, timeout: float, stale_client=None
+    ):
+        """Wait for a WebSocket client whose transport is not closed.
+
+        Return as soon as one connects or timeout (seconds) is reached.
 
-        Return when one is found or timeout (seconds) is reached.
+        Args:
+            timeout (float): max waiting time in seconds
+            stale_client: client which failed, not considered healthy
         """
         deadline = time.monotonic() + timeout
-        while time.monotonic() < deadline:
-            clients = WebSocketAsync.get_clients()
-            for client in clients.values():
-                sock = getattr(client, "socket", None)
-                if sock is not None and getattr(sock, "closed", False):
-                    continue
+        event = self._get_client_connected_event()
+        while not self._has_healthy_client(stale_client):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            event.clear()
+            try:
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
                 return
-            time.sleep(0.25)
+
+
+def _get_env_number(env_name, default, cast=float):
+    value = os.getenv(env_name)
+    if not value:
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        log.warning(
+            f"Invalid value of {env_name}: '{value}', using {default}"
+        )
+    return default
 
 
 class WebServerThread(threading.Thread):
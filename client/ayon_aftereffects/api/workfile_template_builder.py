@@ -84,10 +84,16 @@ class AEPlaceholderPlugin(PlaceholderPlugin):
         """Returns item id and item metadata for placeholder from file meta"""
         stub = get_stub()
         placeholder_uuid = placeholder_item.scene_identifier
+        metadata_item = stub.get_metadata_index().get_placeholder(
+            placeholder_uuid)
+        if metadata_item:
+            return metadata_item["members"][0], metadata_item
+
+        # 'scene_identifier' might be only part of stored 'uuid'
         for metadata_item in stub.get_metadata():
             if not metadata_item.get("is_placeholder"):
                 continue
-            if placeholder_uuid in metadata_item.get("uuid"):
+            if placeholder_uuid in (metadata_item.get("uuid") or ""):
                 return metadata_item["members"][0], metadata_item
         return None, None
 
@@ -150,7 +156,9 @@ def update_placeholder(*args):
     builder = AETemplateBuilder(host)
 
     stub = get_stub()
-    selected_items = stub.get_selected_items(True, True, True)
+    selected_items = stub.get_selected_items(
+        True, True, True, fields=["id"]
+    )
 
     if len(selected_items) != 1:
         stub.print_msg("Please select just 1 placeholder")
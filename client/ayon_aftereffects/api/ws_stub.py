@@ -2,19 +2,45 @@
     Stub handling connection from server to client.
     Used anywhere solution is calling client methods.
 """
+import re
+import copy
 import json
+import asyncio
 import logging
+import contextlib
 
 import attr
 from wsrpc_aiohttp import WebSocketAsync
 
 from .webserver import WebServerTool
+from .project_state import (
+    ProjectStateCache,
+    MetadataIndex,
+    apply_metadata_patches,
+    get_imprint_patch,
+    get_remove_instance_patch,
+)
+from .metadata_format import (
+    decode_metadata,
+    encode_metadata,
+    is_compressed,
+    needs_migration,
+)
 
 
 class ConnectionNotEstablishedYet(Exception):
     pass
 
 
+def parse_extension_version(version):
+    """Converts version string of extension ('1.2.0') to comparable tuple.
+
+    Returns:
+        (tuple): of int, empty if version is unknown
+    """
+    return tuple(int(part) for part in re.findall(r"\d+", version or ""))
+
+
 @attr.s
 class AEItem(object):
     """
@@ -41,6 +67,54 @@ class AEItem(object):
     path = attr.ib(default=False)  # path to FootageItem to validate
     # list of composition Footage is in
     containing_comps = attr.ib(factory=list)
+    # count of frames of image sequence footage, 0 for single file
+    frames_count = attr.ib(default=None)
+
+
+@attr.s
+class BatchResult(object):
+    """Result of single operation sent via 'call_many'.
+
+    Only one of 'result' or 'error' is filled.
+    """
+    method = attr.ib()  # route name without 'AfterEffects.' prefix
+    result = attr.ib(default=None)
+    error = attr.ib(default=None)  # message returned from AE
+
+    @property
+    def success(self):
+        return self.error is None
+
+
+class StubBatch(object):
+    """Collects operations to be sent to AE in single round trip.
+
+    Operations are sent when context of 'AfterEffectsServerStub.batch' ends,
+    results are available in 'results' afterwards.
+    """
+    def __init__(self, stub):
+        self._stub = stub
+        self.operations = []
+        self.results = []
+
+    def add(self, method_name, **kwargs):
+        """Queue operation.
+
+        Args:
+            method_name (str): route name without 'AfterEffects.' prefix,
+                eg. 'rename_item'
+            **kwargs: same arguments as for single route call
+
+        Returns:
+            (int): index of operation result in 'results'
+        """
+        self.operations.append((method_name, kwargs))
+        return len(self.operations) - 1
+
+    def send(self):
+        if self.operations:
+            self.results = self._stub.call_many(self.operations)
+        return self.results
 
 
 class AfterEffectsServerStub():
@@ -53,6 +127,67 @@ class AfterEffectsServerStub():
     PUBLISH_ICON = '\u2117 '
     LOADED_ICON = '\u25bc'
 
+    # batched operations whose results are converted to AEItems
+    _RECORDS_METHODS = {
+        "get_items",
+        "get_selected_items",
+        "get_comp_properties",
+        "get_render_info",
+        "import_file",
+    }
+    # routes changing project items or metadata
+    _MUTATING_METHODS = {
+        "open",
+        "run_jsx_file",
+        "imprint",
+        "imprint_patches",
+        "add_item",
+        "import_file",
+        "replace_item",
+        "set_proxy",
+        "rename_item",
+        "delete_item",
+    }
+
+    # routes which must not be replayed after connection error, AE might
+    # have executed them already (see 'WebServerTool.call_on_client_async')
+    NON_IDEMPOTENT_ROUTES = {
+        "AfterEffects.add_item",
+        "AfterEffects.import_file",
+        "AfterEffects.import_background",
+        "AfterEffects.add_placeholder",
+        "AfterEffects.add_item_as_layer",
+        "AfterEffects.add_item_instead_placeholder",
+        "AfterEffects.add_comp_to_render_queue",
+        "AfterEffects.render",
+        "AfterEffects.render_many",
+        "AfterEffects.batch",
+    }
+
+    # routes added in later versions of extension, older extension doesn't
+    # answer unknown route at all (call would wait until timeout), legacy
+    # routes are used instead (see 'supports_route')
+    ROUTES_MIN_EXTENSION_VERSION = {
+        "AfterEffects.batch": "1.2.0",
+        "AfterEffects.get_project_generation": "1.2.0",
+        "AfterEffects.imprint_patches": "1.2.0",
+        "AfterEffects.get_render_instances_info": "1.2.0",
+        # fingerprint is hashed in Python since 1.2.2
+        "AfterEffects.get_render_fingerprints": "1.2.2",
+        # ranges are rendered with composition frame numbers since 1.2.1
+        "AfterEffects.render_many": "1.2.1",
+        "AfterEffects.set_proxy": "1.2.0",
+        # 'ids' filter and 'unchanged_files' are ignored by older extension
+        "AfterEffects.get_items": "1.2.0",
+        "AfterEffects.reload_background": "1.2.0",
+    }
+
+    # shared by all stub instances, validated by project generation
+    _state_cache = ProjectStateCache()
+    # installed extension version of connected client, pulled once per
+    #   client and shared by all stub instances
+    _extension_version_by_client = {"client": None, "version": None}
+
     def __init__(self):
         self.websocketserver = WebServerTool.get_instance()
         self.log = logging.getLogger(self.__class__.__name__)
@@ -82,6 +217,51 @@ class AfterEffectsServerStub():
             return client
         return None
 
+    def get_installed_extension_version(self):
+        """Version of extension of connected client.
+
+        Version is pulled from AE only once per connected client.
+
+        Returns:
+            (tuple): of int, empty if version couldn't be resolved
+        """
+        client = self.client
+        cached = self._extension_version_by_client
+        if client is None or cached["client"] is not client:
+            try:
+                version = self.get_extension_version()
+            except ValueError:
+                version = None
+            self.set_installed_extension_version(client, version)
+        return cached["version"]
+
+    @classmethod
+    def set_installed_extension_version(cls, client, version):
+        """Store version of extension of 'client' for 'supports_route'."""
+        cls._extension_version_by_client.update({
+            "client": client,
+            "version": parse_extension_version(version),
+        })
+
+    def is_route_supported_by(self, route_name, version):
+        """Installed extension of 'version' (tuple) provides 'route_name'."""
+        min_version = self.ROUTES_MIN_EXTENSION_VERSION.get(route_name)
+        if min_version is None:
+            return True
+        return version >= parse_extension_version(min_version)
+
+    def supports_route(self, route_name):
+        """Installed extension provides 'route_name' (current signature).
+
+        Args:
+            route_name (str): eg. 'AfterEffects.batch'
+        Returns:
+            (bool)
+        """
+        return self.is_route_supported_by(
+            route_name, self.get_installed_extension_version()
+        )
+
     def open(self, path):
         """
             Open file located at 'path' (local).
@@ -89,6 +269,7 @@ class AfterEffectsServerStub():
             path(string): file path locally
         Returns: None
         """
+        self._state_cache.invalidate()
         res = self.websocketserver.call_on_client(self,
                                         "AfterEffects.open", path=path)
 
@@ -102,16 +283,105 @@ class AfterEffectsServerStub():
             It contains containers loaded by any Loader OR instances created
             by Creator.
 
+            Parsed metadata are cached and reused until project generation
+            changes.
+
         Returns:
             (list)
         """
-        res = self.websocketserver.call_on_client(self,
-                                        "AfterEffects.get_metadata")
-        metadata = self._handle_return(res)
+        # callers are modifying returned values
+        return copy.deepcopy(self._get_cached_metadata())
+
+    def get_metadata_index(self):
+        """Get index of stored metadata for fast lookups.
 
-        return metadata or []
+        Index is built once per metadata snapshot and shared until project
+        generation changes.
 
-    def read(self, item, layers_meta=None):
+        Returns:
+            (MetadataIndex)
+        """
+        metadata = self._get_cached_metadata()
+        metadata_index = self._state_cache.get_metadata_index()
+        if metadata_index is None:
+            # metadata are not cached (old extension)
+            metadata_index = MetadataIndex(metadata)
+        return metadata_index
+
+    def get_rpc_stats(self):
+        """Statistics of calls made to AE per route.
+
+        Returns:
+            (dict): {"started": float, "methods": {route: {"count",
+                "errors", "retries", "total_ms", "avg_ms", "min_ms",
+                "max_ms", "measured_calls", "request_bytes", "response_bytes",
+                "histogram"}}}, sizes are None if no call was measured
+        """
+        return self.websocketserver.get_rpc_stats()
+
+    def get_project_generation(self):
+        """Returns stamp which changes with every change of project.
+
+        Stamp is changed by every mutating call made through extension, by
+        adding or removing of project items or by opening different project.
+
+        Returns:
+            (str|None): None if extension doesn't support generation
+                or it couldn't be pulled, caching of project state is
+                disabled for rest of session then
+        """
+        if not self.supports_route("AfterEffects.get_project_generation"):
+            return None
+        try:
+            res = self.websocketserver.call_on_client(
+                self, "AfterEffects.get_project_generation"
+            )
+            return self._handle_return(res)
+        except ValueError:
+            self.log.debug("Extension doesn't provide project generation.")
+        except (ConnectionError, OSError, asyncio.TimeoutError):
+            self.log.warning(
+                "Project generation couldn't be pulled, project state won't "
+                "be cached.",
+                exc_info=True
+            )
+        self._state_cache.disable()
+        return None
+
+    def hold_project_state(self):
+        """Reuse already pulled metadata and items without checking AE.
+
+        Useful for blocks querying project state multiple times, mutations
+        made via stub still invalidate cached state.
+
+        Example:
+            with stub.hold_project_state():
+                metadata = stub.get_metadata()
+                items = stub.get_items(comps=True)
+        """
+        return self._state_cache.hold()
+
+    def invalidate_project_state(self):
+        """Forget cached project state, next query pulls it from AE."""
+        self._state_cache.invalidate()
+
+    def _validate_state_cache(self):
+        if self._state_cache.needs_validation():
+            self._state_cache.validate(self.get_project_generation())
+
+    def _get_cached_metadata(self):
+        """Returns metadata shared with cache, must not be modified."""
+        self._validate_state_cache()
+        metadata = self._state_cache.get_metadata()
+        if metadata is None:
+            res = self.websocketserver.call_on_client(
+                self, "AfterEffects.get_metadata"
+            )
+            metadata = self._handle_return(res) or []
+            self._state_cache.set_metadata(metadata)
+        return metadata
+
+    def read(self, item, layers_meta=None, metadata_index=None):
         """
             Parses item metadata from Label field of active document.
             Used as filter to pick metadata for specific 'item' only.
@@ -120,15 +390,20 @@ class AfterEffectsServerStub():
             item (AEItem): pulled info from AE
             layers_meta (dict): full list from Headline
                 (load and inject for better performance in loops)
+            metadata_index (MetadataIndex): prepared index, preferred over
+                'layers_meta' in loops
         Returns:
             (dict):
         """
-        if layers_meta is None:
-            layers_meta = self.get_metadata()
-        for item_meta in layers_meta:
-            if 'container' in item_meta.get('id') and \
-                    str(item.id) == str(item_meta.get('members')[0]):
-                return item_meta
+        if metadata_index is None:
+            if layers_meta is None:
+                metadata_index = self.get_metadata_index()
+            else:
+                metadata_index = MetadataIndex(layers_meta)
+
+        item_meta = metadata_index.get_container(item.id)
+        if item_meta is not None:
+            return item_meta
 
         self.log.debug(f"Couldn't find layer metadata for item: {item}")
 
@@ -141,6 +416,7 @@ class AfterEffectsServerStub():
         Returns:
             Parsed response from AE.
         """
+        self._state_cache.invalidate()
         res = self.websocketserver.call_on_client(
             self, "AfterEffects.run_jsx_file", path=path
         )
@@ -149,60 +425,84 @@ class AfterEffectsServerStub():
     def imprint(self, item_id, data, all_items=None, items_meta=None):
         """
             Save item metadata to Label field of metadata of active document
+
+            Only entries of 'item_id' are patched in AE, entries of items
+            which don't exist anymore are removed there.
         Args:
             item_id (int|str): id of FootageItem or instance_id for workfiles
-            data(string): json representation for single layer
+            data(dict): metadata for single item, empty to remove them
             all_items (list of item): for performance, could be
-                injected for usage in loop, if not, single call will be
-                triggered
-            items_meta(string): json representation from Headline
-                           (for performance - provide only if imprint is in
-                           loop - value should be same)
+                injected for usage in loop, used only with extension
+                without 'imprint_patches' (whole metadata are written)
+            items_meta(list): current metadata, for performance - provide
+                only if imprint is in loop, used only with extension
+                without 'imprint_patches'
         Returns: None
         """
-        if not items_meta:
-            items_meta = self.get_metadata()
-
-        result_meta = []
-        # fix existing
-        is_new = True
-
-        for item_meta in items_meta:
-            if ((item_meta.get('members') and
-                    str(item_id) == str(item_meta.get('members')[0])) or
-                    item_meta.get("instance_id") == item_id):
-                is_new = False
-                if data:
-                    item_meta.update(data)
-                    result_meta.append(item_meta)
-            else:
-                result_meta.append(item_meta)
+        return self.apply_metadata_patches(
+            [get_imprint_patch(item_id, data)],
+            metadata=items_meta,
+            all_items=all_items,
+        )
 
-        if is_new:
-            result_meta.append(data)
+    def imprint_many(self, items_data):
+        """Save metadata of multiple items with single write in AE.
 
-        # Ensure only valid ids are stored.
-        if not all_items:
-            # loaders create FootageItem now
-            all_items = self.get_items(comps=True,
-                                       folders=True,
-                                       footages=True)
-        item_ids: set[int] = {int(item.id) for item in all_items}
-        cleaned_data = []
-        for meta in result_meta:
-            # do not added instance with nonexistend item id
-            if meta.get("members"):
-                if int(meta["members"][0]) not in item_ids:
-                    continue
+        Args:
+            items_data (list): of tuples (item_id, data), same as arguments
+                of 'imprint'
+        Returns: None
+        """
+        return self.apply_metadata_patches([
+            get_imprint_patch(item_id, data)
+            for item_id, data in items_data
+        ])
 
-            cleaned_data.append(meta)
+    def apply_metadata_patches(self, patches, metadata=None, all_items=None):
+        """Apply 'patches' to stored metadata with single write in AE.
 
-        payload = json.dumps(cleaned_data, indent=4)
+        Cached metadata are patched locally if they were current, so
+        following reads don't need to pull them again.
 
+        Extension without 'imprint_patches' route gets whole patched
+        metadata, 'metadata' and 'all_items' spare queries then.
+
+        Args:
+            patches (list): of dicts from 'get_imprint_patch' or
+                'get_remove_instance_patch'
+            metadata (list): current metadata, pulled if not provided
+            all_items (list): of AEItem, all project items, pulled if not
+                provided
+        Returns: None
+        """
+        if not patches:
+            return None
+
+        if not self.supports_route("AfterEffects.imprint_patches"):
+            return self._write_patched_metadata(patches, metadata, all_items)
+
+        cached_generation = self._state_cache.generation
+        cached_metadata = self._state_cache.get_metadata()
+        self._state_cache.invalidate()
         res = self.websocketserver.call_on_client(
-            self, "AfterEffects.imprint", payload=payload
+            self, "AfterEffects.imprint_patches", patches=patches
         )
-        return self._handle_return(res)
+        result = self._handle_return(res) or {}
+        if result.get("encoded"):
+            # compressed metadata couldn't be patched in AE
+            return self._write_patched_metadata(patches)
+
+        if (
+            cached_metadata is not None
+            and cached_generation is not None
+            and result.get("previous_generation") == cached_generation
+            and not result.get("pruned")
+        ):
+            self._state_cache.update_metadata(
+                result.get("generation"),
+                apply_metadata_patches(cached_metadata, patches)
+            )
+        return None
 
     def get_active_document_full_name(self):
         """
@@ -226,7 +526,8 @@ class AfterEffectsServerStub():
 
         return self._handle_return(res)
 
-    def get_items(self, comps, folders=False, footages=False):
+    def get_items(self, comps, folders=False, footages=False,
+                  fields=None, ids=None):
         """
             Get all items from Project panel according to arguments.
             There are multiple different types:
@@ -239,18 +540,45 @@ class AfterEffectsServerStub():
             comps (bool): return CompItems
             folders (bool): return FolderItem
             footages (bool: return FootageItem
+            fields (list): of str, properties to return (eg. ["name"]), all
+                if not provided, 'id' is always returned. Unrequested fields
+                are None on returned items.
+            ids (list): of int, return only items with these ids
+
+            Items are reused only inside of 'hold_project_state' block.
 
         Returns:
             (list) of namedtuples
         """
+        cache_key = (
+            bool(comps),
+            bool(folders),
+            bool(footages),
+            tuple(fields) if fields else None,
+            tuple(ids) if ids else None,
+        )
+        if self._state_cache.is_held:
+            self._validate_state_cache()
+            items = self._state_cache.get_items(cache_key)
+            if items is not None:
+                return list(items)
+
         res = self.websocketserver.call_on_client(
             self,
             "AfterEffects.get_items",
             comps=comps,
             folders=folders,
             footages=footages,
+            fields=fields,
+            ids=ids,
         )
-        return self._to_records(self._handle_return(res))
+        items = self._to_records(self._handle_return(res))
+        if ids and not self.supports_route("AfterEffects.get_items"):
+            # older extension returns all items
+            requested_ids = {int(item_id) for item_id in ids}
+            items = [item for item in items if int(item.id) in requested_ids]
+        self._state_cache.set_items(cache_key, items)
+        return list(items)
 
     def select_items(self, items):
         """
@@ -262,13 +590,15 @@ class AfterEffectsServerStub():
             self, "AfterEffects.select_items", items=items
         )
 
-    def get_selected_items(self, comps, folders=False, footages=False):
+    def get_selected_items(self, comps, folders=False, footages=False,
+                           fields=None):
         """
             Same as get_items but using selected items only
         Args:
             comps (bool): return CompItems
             folders (bool): return FolderItem
             footages (bool: return FootageItem
+            fields (list): of str, properties to return, all if not provided
 
         Returns:
             (list) of namedtuples
@@ -280,6 +610,7 @@ class AfterEffectsServerStub():
             comps=comps,
             folders=folders,
             footages=footages,
+            fields=fields,
         )
         return self._to_records(self._handle_return(res))
 
@@ -291,6 +622,7 @@ class AfterEffectsServerStub():
                 name (str)
                 item_type (str): COMP|FOLDER
         """
+        self._state_cache.invalidate()
         res = self.websocketserver.call_on_client(
             self, "AfterEffects.add_item", name=name, item_type=item_type
         )
@@ -304,9 +636,13 @@ class AfterEffectsServerStub():
             Args:
                 item_id (int, or string)
         """
-        for item in self.get_items(True, True, True):
-            if str(item.id) == str(item_id):
-                return item
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            return None
+        items = self.get_items(True, True, True, ids=[item_id])
+        if items:
+            return items[0]
 
         return None
 
@@ -320,6 +656,7 @@ class AfterEffectsServerStub():
                 config
 
         """
+        self._state_cache.invalidate()
         res = self.websocketserver.call_on_client(
             self,
             "AfterEffects.import_file",
@@ -331,6 +668,35 @@ class AfterEffectsServerStub():
         if records:
             return records.pop()
 
+    def import_files(self, items):
+        """Import multiple files in single round trip to AE.
+
+        Args:
+            items (list): of tuples (path, item_name, import_options), same
+                as arguments of 'import_file'
+
+        Returns:
+            (list): of AEItem or None (if import failed) in order of 'items'
+        """
+        results = self.call_many([
+            (
+                "import_file",
+                {
+                    "path": path,
+                    "item_name": item_name,
+                    "import_options": import_options,
+                }
+            )
+            for path, item_name, import_options in items
+        ])
+        loaded_items = []
+        for (path, _, _), result in zip(items, results):
+            if not result.success:
+                self.log.warning(
+                    "Import of '{}' failed: {}".format(path, result.error))
+            loaded_items.append(result.result[-1] if result.result else None)
+        return loaded_items
+
     def replace_item(self, item_id, path, item_name):
         """ Replace FootageItem with new file
 
@@ -340,6 +706,7 @@ class AfterEffectsServerStub():
                 item_name (string): label on item in Project list
 
         """
+        self._state_cache.invalidate()
         res = self.websocketserver.call_on_client(
             self,
             "AfterEffects.replace_item",
@@ -350,6 +717,53 @@ class AfterEffectsServerStub():
 
         return self._handle_return(res)
 
+    def replace_items(self, items):
+        """Replace multiple FootageItems in single round trip to AE.
+
+        Args:
+            items (list): of tuples (item_id, path, item_name), same as
+                arguments of 'replace_item'
+
+        Returns:
+            (list): of error messages (None if replaced) in order of 'items'
+        """
+        results = self.call_many([
+            (
+                "replace_item",
+                {"item_id": item_id, "path": path, "item_name": item_name}
+            )
+            for item_id, path, item_name in items
+        ])
+        return [result.error for result in results]
+
+    def set_proxy(self, item_id, path, is_sequence=False):
+        """ Attach proxy file(s) to FootageItem and enable it
+
+            Args:
+                item_id (int):
+                path (string): absolute path, first frame if sequence
+                is_sequence (bool): import 'path' as image sequence
+
+        """
+        if not self.supports_route("AfterEffects.set_proxy"):
+            raise ValueError(
+                "Proxies require extension version {} or newer, please "
+                "update installed extension".format(
+                    self.ROUTES_MIN_EXTENSION_VERSION[
+                        "AfterEffects.set_proxy"]
+                )
+            )
+        self._state_cache.invalidate()
+        res = self.websocketserver.call_on_client(
+            self,
+            "AfterEffects.set_proxy",
+            item_id=item_id,
+            path=path,
+            is_sequence=bool(is_sequence),
+        )
+
+        return self._handle_return(res)
+
     def rename_item(self, item_id, item_name):
         """ Replace item with item_name
 
@@ -358,6 +772,7 @@ class AfterEffectsServerStub():
                 item_name (string): label on item in Project list
 
         """
+        self._state_cache.invalidate()
         res = self.websocketserver.call_on_client(
             self,
             "AfterEffects.rename_item",
@@ -373,12 +788,58 @@ class AfterEffectsServerStub():
                 item_id (int):
 
         """
+        self._state_cache.invalidate()
         res = self.websocketserver.call_on_client(
             self, "AfterEffects.delete_item", item_id=item_id
         )
 
         return self._handle_return(res)
 
+    def migrate_metadata(self):
+        """Rewrite metadata stored in legacy format to current format.
+
+        Returns:
+            (bool): True if metadata were rewritten
+        """
+        res = self.websocketserver.call_on_client(
+            self, "AfterEffects.get_metadata"
+        )
+        if not needs_migration(res):
+            return False
+        self._write_metadata(self._handle_return(res))
+        return True
+
+    def _write_patched_metadata(self, patches, metadata=None,
+                                all_items=None):
+        """Apply 'patches' locally and write whole metadata to AE."""
+        with self.hold_project_state():
+            if metadata is None:
+                metadata = self._get_cached_metadata()
+            metadata = apply_metadata_patches(metadata, patches)
+            if not all_items:
+                all_items = self.get_items(comps=True,
+                                           folders=True,
+                                           footages=True,
+                                           fields=["id"])
+
+        # Ensure only valid ids are stored.
+        item_ids = {int(item.id) for item in all_items}
+        cleaned_data = [
+            item_meta
+            for item_meta in metadata
+            if (not item_meta.get("members")
+                or int(item_meta["members"][0]) in item_ids)
+        ]
+        return self._write_metadata(cleaned_data)
+
+    def _write_metadata(self, metadata):
+        """Replace all stored metadata with 'metadata'."""
+        self._state_cache.invalidate()
+        res = self.websocketserver.call_on_client(
+            self, "AfterEffects.imprint", payload=encode_metadata(metadata)
+        )
+        return self._handle_return(res)
+
     def remove_instance(self, instance_id, metadata=None):
         """
             Removes instance with 'instance_id' from file's metadata and
@@ -388,23 +849,109 @@ class AfterEffectsServerStub():
 
             Args:
                 instance_id(string): instance id
+                metadata(list): current metadata, used only with extension
+                    without 'imprint_patches'
         """
-        cleaned_data = []
+        return self.apply_metadata_patches(
+            [get_remove_instance_patch(instance_id)], metadata=metadata
+        )
 
-        if metadata is None:
-            metadata = self.get_metadata()
+    def call_many(self, operations):
+        """Run multiple operations in single round trip to AE.
+
+        All operations are evaluated in one ExtendScript evaluation, failure
+        of one operation doesn't stop following ones.
+
+        Args:
+            operations (list): of tuples (method_name, kwargs), where
+                method_name is route name without 'AfterEffects.' prefix
+                (eg. 'get_comp_properties') and kwargs are same arguments
+                as for single route call
+
+        Returns:
+            (list) of BatchResult in same order as 'operations', results of
+                methods returning items are converted to list of AEItem
+        """
+        if not operations:
+            return []
 
-        for instance in metadata:
-            inst_id = instance.get("instance_id") or instance.get("uuid")
-            if inst_id != instance_id:
-                cleaned_data.append(instance)
+        if not self.supports_route("AfterEffects.batch"):
+            return self._call_many_sequentially(operations)
 
-        payload = json.dumps(cleaned_data, indent=4)
+        payload = [
+            {"method": method_name, "args": kwargs or {}}
+            for method_name, kwargs in operations
+        ]
+        if any(method_name in self._MUTATING_METHODS
+               for method_name, _ in operations):
+            self._state_cache.invalidate()
         res = self.websocketserver.call_on_client(
-            self, "AfterEffects.imprint", payload=payload
+            self, "AfterEffects.batch", operations=payload
         )
-
-        return self._handle_return(res)
+        try:
+            raw_results = json.loads(res)
+        except (TypeError, json.decoder.JSONDecodeError):
+            raise ValueError("Received broken JSON {}".format(res))
+
+        if len(raw_results) != len(operations):
+            raise ValueError(
+                "Expected {} batch results, received {}".format(
+                    len(operations), len(raw_results)))
+
+        return [
+            self._get_batch_result(method_name, raw_result)
+            for (method_name, _), raw_result in zip(operations, raw_results)
+        ]
+
+    def _call_many_sequentially(self, operations):
+        """Fallback of 'call_many' for extension without 'batch' route."""
+        results = []
+        for method_name, kwargs in operations:
+            route_name = "AfterEffects.{}".format(method_name)
+            if not self.supports_route(route_name):
+                results.append(BatchResult(
+                    method_name,
+                    error="Route '{}' requires extension version {}".format(
+                        route_name,
+                        self.ROUTES_MIN_EXTENSION_VERSION[route_name]
+                    )
+                ))
+                continue
+            if method_name in self._MUTATING_METHODS:
+                self._state_cache.invalidate()
+            res = self.websocketserver.call_on_client(
+                self, route_name, **(kwargs or {})
+            )
+            results.append(self._get_batch_result(method_name, res))
+        return results
+
+    def _get_batch_result(self, method_name, raw_result):
+        batch_result = BatchResult(method_name)
+        try:
+            result = self._handle_return(raw_result)
+            if method_name in self._RECORDS_METHODS:
+                result = self._to_records(result)
+            batch_result.result = result
+        except ValueError as exc:
+            batch_result.error = str(exc)
+        return batch_result
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Collect operations and send them to AE in single round trip.
+
+        Example:
+            with stub.batch() as batch:
+                for comp_id in comp_ids:
+                    batch.add("get_comp_properties", item_id=comp_id)
+            comps = [result.result for result in batch.results]
+
+        Yields:
+            (StubBatch)
+        """
+        stub_batch = StubBatch(self)
+        yield stub_batch
+        stub_batch.send()
 
     def is_saved(self):
         # TODO
@@ -492,6 +1039,7 @@ class AfterEffectsServerStub():
             as_copy: <boolean>
         Returns: None
         """
+        self._state_cache.invalidate()
         res = self.websocketserver.call_on_client(
             self,
             "AfterEffects.saveAs",
@@ -514,6 +1062,82 @@ class AfterEffectsServerStub():
         records = self._to_records(self._handle_return(res))
         return records
 
+    def get_render_instances_info(self, comp_ids):
+        """Composition properties and render queue info of multiple comps.
+
+        Bulk version of 'get_comp_properties' and 'get_render_info' done in
+        single call, render queue is walked only once.
+
+        Args:
+            comp_ids (list): of int
+        Returns:
+            (dict): {comp_id (int): (AEItem, list of AEItem)}, (None, [])
+                for nonexistent compositions
+        Raises:
+            ValueError: if composition has no or multiple render queue items
+        """
+        if not self.supports_route("AfterEffects.get_render_instances_info"):
+            return {
+                int(comp_id): self._get_comp_render_data(comp_id)
+                for comp_id in comp_ids
+            }
+        res = self.websocketserver.call_on_client(
+            self, "AfterEffects.get_render_instances_info",
+            comp_ids=[int(comp_id) for comp_id in comp_ids]
+        )
+        return self._parse_render_instances_info(self._handle_return(res))
+
+    def _get_comp_render_data(self, comp_id):
+        """Fallback of 'get_render_instances_info' with legacy routes."""
+        try:
+            comp = self.get_comp_properties(comp_id)
+        except ValueError:
+            comp = None
+        if comp is None:
+            return None, []
+        render_queue = self.get_render_info(comp_id)
+        if not render_queue:
+            raise ValueError(
+                "There is no item in Render Queue for '{}'! Add composition "
+                "to Render Queue.".format(comp.name)
+            )
+        return comp, render_queue
+
+    def _parse_render_instances_info(self, payload):
+        """Converts result of 'getRenderInstancesInfo' to records."""
+        render_data_by_comp_id = {}
+        for comp_id, info in (payload or {}).items():
+            comp_records = self._to_records(info.get("comp"))
+            if not comp_records:
+                render_data_by_comp_id[int(comp_id)] = (None, [])
+                continue
+            if info.get("error"):
+                raise ValueError(info["error"])
+            render_data_by_comp_id[int(comp_id)] = (
+                comp_records[0], self._to_records(info["render_queue"])
+            )
+        return render_data_by_comp_id
+
+    def get_render_fingerprints(self, comp_ids):
+        """State of compositions affecting render, used for render cache.
+
+        Args:
+            comp_ids (list): of int
+        Returns:
+            (dict): {comp_id (str): dict|None} - 'layers', 'uncacheable',
+                'render_settings', 'output_modules' and 'footage' (list of
+                dict with 'id', 'path', 'is_sequence'), empty if extension
+                doesn't provide fingerprints
+        """
+        if not self.supports_route("AfterEffects.get_render_fingerprints"):
+            self.log.debug("Extension doesn't provide render fingerprints.")
+            return {}
+        res = self.websocketserver.call_on_client(
+            self, "AfterEffects.get_render_fingerprints",
+            comp_ids=[int(comp_id) for comp_id in comp_ids]
+        )
+        return self._handle_return(res) or {}
+
     def get_audio_url(self, item_id):
         """ Get audio layer absolute url for comp
 
@@ -550,6 +1174,7 @@ class AfterEffectsServerStub():
             Returns:
                 (AEItem): object with id of created folder, all imported images
         """
+        self._state_cache.invalidate()
         res = self.websocketserver.call_on_client(
             self,
             "AfterEffects.import_background",
@@ -562,12 +1187,13 @@ class AfterEffectsServerStub():
         if records:
             return records.pop()
 
-    def reload_background(self, comp_id, comp_name, files):
+    def reload_background(self, comp_id, comp_name, files,
+                          unchanged_files=None):
         """
             Reloads backgrounds images to existing composition.
 
-            It actually deletes complete folder with imported images and
-            created composition for safety.
+            Existing images are replaced in place, new are imported and
+            images not in 'files' anymore are deleted.
 
             Args:
                 comp_id (int): id of existing composition to be overwritten
@@ -575,15 +1201,20 @@ class AfterEffectsServerStub():
                     if version up only)
                 files (list): list of absolute paths to import and
                     add as layers
+                unchanged_files (list): subset of 'files' with same content
+                    as already loaded images, these are kept without
+                    replacing
             Returns:
                 (AEItem): object with id of created folder, all imported images
         """
+        self._state_cache.invalidate()
         res = self.websocketserver.call_on_client(
             self,
             "AfterEffects.reload_background",
             comp_id=comp_id,
             comp_name=comp_name,
             files=files,
+            unchanged_files=unchanged_files or [],
         )
 
         records = self._to_records(self._handle_return(res))
@@ -644,6 +1275,7 @@ class AfterEffectsServerStub():
                 fps (float)
                 duration (int)
         """
+        self._state_cache.invalidate()
         res = self.websocketserver.call_on_client(
             self,
             "AfterEffects.add_placeholder",
@@ -688,15 +1320,60 @@ class AfterEffectsServerStub():
         )
         return self._handle_return(res)
 
-    def render(self, folder_url, comp_id):
+    def render(self, folder_url, comp_id, frames_total=None, extension=None):
         """
             Render all renderqueueitem to 'folder_url'
+
+            Extension polls 'folder_url' during render and pushes progress
+            to 'AfterEffectsRoute.render_progress', see 'render_progress.py'.
         Args:
             folder_url(string): local folder path for collecting
+            comp_id (int): rendered composition
+            frames_total (int): expected count of frames, used for estimate
+                of remaining time
+            extension (str): extension of rendered files (without dot), only
+                these are counted as rendered frames
         Returns: None
         """
         res = self.websocketserver.call_on_client(
-            self, "AfterEffects.render", folder_url=folder_url, comp_id=comp_id
+            self, "AfterEffects.render", folder_url=folder_url,
+            comp_id=comp_id, frames_total=frames_total, extension=extension
+        )
+        return self._handle_return(res)
+
+    def render_many(self, items):
+        """Render multiple compositions in single Render Queue pass.
+
+        Frames of 'ranges' keep composition frame numbers ('Use Comp Frame
+        Number' is enabled for their render), if it cannot be ensured whole
+        composition is rendered.
+
+        Args:
+            items (list): of dict with 'comp_id' and 'folder' (output folder
+                of composition), optionally 'ranges' (list of inclusive
+                [start, end] frames to render), 'frames_total' and
+                'extension' used for render progress (see 'render')
+        Returns:
+            (dict): {"rendered_whole": list of comp_id} - items whose
+                'ranges' were ignored
+        """
+        if not self.supports_route("AfterEffects.render_many"):
+            # whole range of each composition is rendered, 'ranges' are
+            #   not supported by 'render' route
+            for item in items:
+                self.render(
+                    item["folder"],
+                    item["comp_id"],
+                    frames_total=item.get("frames_total"),
+                    extension=item.get("extension"),
+                )
+            return {
+                "rendered_whole": [
+                    item["comp_id"] for item in items if item.get("ranges")
+                ]
+            }
+        res = self.websocketserver.call_on_client(
+            self, "AfterEffects.render_many", items=items
         )
         return self._handle_return(res)
 
@@ -717,6 +1394,7 @@ class AfterEffectsServerStub():
         return self._handle_return(res)
 
     def close(self):
+        self._state_cache.invalidate()
         res = self.websocketserver.call_on_client(self, "AfterEffects.close")
 
         return self._handle_return(res)
@@ -729,6 +1407,9 @@ class AfterEffectsServerStub():
 
     def _handle_return(self, res):
         """Wraps return, throws ValueError if 'error' key is present."""
+        if is_compressed(res):
+            # metadata from 'xmp:Label' are returned as stored
+            return decode_metadata(res)
         if res and isinstance(res, str) and res != "undefined":
             try:
                 parsed = json.loads(res)
@@ -792,7 +1473,8 @@ class AfterEffectsServerStub():
                           d.get("is_placeholder"),
                           d.get("uuid"),
                           d.get("path"),
-                          d.get("containing_comps"),)
+                          d.get("containing_comps"),
+                          d.get("frames_count"),)
 
             ret.append(item)
         return ret
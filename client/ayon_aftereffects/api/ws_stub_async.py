@@ -0,0 +1,210 @@
+"""
+    Awaitable counterpart of stub handling connection from server to client.
+
+    Coroutines run on loop of webserver thread, so independent queries could
+    be in flight at once instead of waiting for each other.
+"""
+import asyncio
+
+from .ws_stub import (
+    AfterEffectsServerStub,
+    ConnectionNotEstablishedYet,
+    get_stub,
+)
+
+
+class AsyncAfterEffectsServerStub(object):
+    """Awaitable queries of project state in AE.
+
+    Only methods not changing project are provided, mutations should go
+    through 'AfterEffectsServerStub' which keeps its cache consistent.
+
+    Coroutines must be awaited on 'WebServerTool.webserver_thread.loop',
+    'run' is sync facade for code outside of that loop.
+
+    Example:
+        async_stub = AsyncAfterEffectsServerStub(stub)
+        render_infos = async_stub.run(async_stub.gather(
+            *(async_stub.get_render_info(comp_id) for comp_id in comp_ids)
+        ))
+
+    Args:
+        stub (AfterEffectsServerStub): used for connection and parsing of
+            results, new one is created if not provided
+    """
+    NON_IDEMPOTENT_ROUTES = AfterEffectsServerStub.NON_IDEMPOTENT_ROUTES
+
+    def __init__(self, stub=None):
+        if stub is None:
+            stub = AfterEffectsServerStub()
+        self._stub = stub
+        self.websocketserver = stub.websocketserver
+
+    @property
+    def client(self):
+        return self._stub.client
+
+    def run(self, coro):
+        """Run 'coro' on webserver loop and wait for its result.
+
+        Raises:
+            ConnectionNotEstablishedYet: if webserver loop is not running
+        """
+        if not self.websocketserver.webserver_thread.loop:
+            coro.close()
+            raise ConnectionNotEstablishedYet("Connection is not created yet")
+        return self.websocketserver.run_coroutine(coro)
+
+    @staticmethod
+    async def gather(*coros):
+        """Run 'coros' concurrently, results are in same order."""
+        return await asyncio.gather(*coros)
+
+    async def call(self, method_name, **kwargs):
+        """Call route 'AfterEffects.{method_name}' and parse its result.
+
+        Raises:
+            ValueError: if AE returned error
+        """
+        res = await self.websocketserver.call_on_client_async(
+            self, "AfterEffects.{}".format(method_name), **kwargs
+        )
+        return self._stub._handle_return(res)
+
+    async def supports_route(self, route_name):
+        """See 'AfterEffectsServerStub.supports_route'."""
+        client = self.client
+        cached = AfterEffectsServerStub._extension_version_by_client
+        if client is None or cached["client"] is not client:
+            try:
+                version = await self.get_extension_version()
+            except ValueError:
+                version = None
+            self._stub.set_installed_extension_version(client, version)
+        return self._stub.is_route_supported_by(
+            route_name, cached["version"]
+        )
+
+    async def get_metadata(self):
+        """Stored metadata, not cached, see 'AfterEffectsServerStub'."""
+        return await self.call("get_metadata") or []
+
+    async def get_project_generation(self):
+        if not await self.supports_route(
+            "AfterEffects.get_project_generation"
+        ):
+            return None
+        try:
+            return await self.call("get_project_generation")
+        except ValueError:
+            return None
+
+    async def get_active_document_full_name(self):
+        return await self.call("get_active_document_full_name")
+
+    async def get_active_document_name(self):
+        return await self.call("get_active_document_name")
+
+    async def get_items(self, comps, folders=False, footages=False,
+                        fields=None, ids=None):
+        result = await self.call(
+            "get_items",
+            comps=comps,
+            folders=folders,
+            footages=footages,
+            fields=fields,
+            ids=ids,
+        )
+        items = self._stub._to_records(result)
+        if ids and not await self.supports_route("AfterEffects.get_items"):
+            # older extension returns all items
+            requested_ids = {int(item_id) for item_id in ids}
+            items = [item for item in items if int(item.id) in requested_ids]
+        return items
+
+    async def get_selected_items(self, comps, folders=False, footages=False,
+                                 fields=None):
+        result = await self.call(
+            "get_selected_items",
+            comps=comps,
+            folders=folders,
+            footages=footages,
+            fields=fields,
+        )
+        return self._stub._to_records(result)
+
+    async def get_comp_properties(self, comp_id):
+        records = self._stub._to_records(
+            await self.call("get_comp_properties", item_id=comp_id)
+        )
+        if records:
+            return records.pop()
+
+    async def get_render_info(self, comp_id):
+        return self._stub._to_records(
+            await self.call("get_render_info", comp_id=comp_id)
+        )
+
+    async def get_audio_url(self, item_id):
+        return await self.call("get_audio_url", item_id=item_id)
+
+    async def get_app_version(self):
+        return await self.call("get_app_version")
+
+    async def get_extension_version(self):
+        return await self.call("get_extension_version")
+
+    async def get_render_instances_info(self, comp_ids):
+        """See 'AfterEffectsServerStub.get_render_instances_info'."""
+        if not await self.supports_route(
+            "AfterEffects.get_render_instances_info"
+        ):
+            render_data = await self.gather(*(
+                self._get_comp_render_data(comp_id) for comp_id in comp_ids
+            ))
+            return {
+                int(comp_id): comp_render_data
+                for comp_id, comp_render_data in zip(comp_ids, render_data)
+            }
+        payload = await self.call(
+            "get_render_instances_info",
+            comp_ids=[int(comp_id) for comp_id in comp_ids]
+        )
+        return self._stub._parse_render_instances_info(payload)
+
+    async def _get_comp_render_data(self, comp_id):
+        """Fallback of 'get_render_instances_info' with legacy routes."""
+        try:
+            comp = await self.get_comp_properties(comp_id)
+        except ValueError:
+            comp = None
+        if comp is None:
+            return None, []
+        render_queue = await self.get_render_info(comp_id)
+        if not render_queue:
+            raise ValueError(
+                "There is no item in Render Queue for '{}'! Add composition "
+                "to Render Queue.".format(comp.name)
+            )
+        return comp, render_queue
+
+    async def get_comps_render_data(self, comp_ids):
+        """Composition properties and render queue info for each comp.
+
+        Args:
+            comp_ids (list): of int
+
+        Returns:
+            (dict): {comp_id: (AEItem, list of AEItem)}, (None, []) for
+                nonexistent compositions
+        """
+        return await self.get_render_instances_info(comp_ids)
+
+
+def get_async_stub():
+    """
+        Convenience function to get awaitable server RPC stub.
+        It expects already created connection, same as 'get_stub'.
+    :return: <AsyncAfterEffectsServerStub>
+    """
+    return AsyncAfterEffectsServerStub(get_stub())
@@ -53,10 +53,12 @@ class RenderCreator(Creator):
 
         if pre_create_data.get("use_selection"):
             comps = stub.get_selected_items(
-                comps=True, folders=False, footages=False
+                comps=True, folders=False, footages=False,
+                fields=["id", "name"]
             )
         else:
-            comps = stub.get_items(comps=True, folders=False, footages=False)
+            comps = stub.get_items(comps=True, folders=False, footages=False,
+                                   fields=["id", "name"])
 
         if not comps:
             raise CreatorError(
@@ -222,13 +224,16 @@ class RenderCreator(Creator):
                 self._add_instance_to_context(instance)
 
     def update_instances(self, update_list):
+        stub = api.get_stub()
+        stub.imprint_many([
+            (created_inst.get("instance_id"), created_inst.data_to_store())
+            for created_inst, _changes in update_list
+        ])
         for created_inst, _changes in update_list:
-            api.get_stub().imprint(created_inst.get("instance_id"),
-                                   created_inst.data_to_store())
             name_change = _changes.get("productName")
             if self.rename_comp_to_product_name and name_change:
-                api.get_stub().rename_item(created_inst.data["members"][0],
-                                           name_change.new_value)
+                stub.rename_item(created_inst.data["members"][0],
+                                 name_change.new_value)
 
     def remove_instances(self, instances):
         """Removes metadata and renames to original comp name if available."""
@@ -0,0 +1,52 @@
+from ayon_core.pipeline import InventoryAction, get_current_project_name
+from ayon_core.pipeline.load import (
+    discover_loader_plugins,
+    get_representation_contexts_by_ids,
+)
+
+
+class GenerateProxies(InventoryAction):
+    """Generate low resolution proxies of selected footage in background.
+
+    Proxies are attached to footage items (and enabled) when ready.
+    """
+    label = "Generate proxies"
+    icon = "compress"
+    color = "#d8d8d8"
+
+    loader_name = "FileLoader"
+
+    def process(self, containers):
+        containers = [
+            container
+            for container in containers
+            if container["loader"] == self.loader_name
+        ]
+        if not containers:
+            self.log.info("No loaded footage selected")
+            return
+
+        project_name = get_current_project_name()
+        loader = next(
+            (
+                loader
+                for loader in discover_loader_plugins(project_name)
+                if loader.__name__ == self.loader_name
+            ),
+            None
+        )
+        if loader is None:
+            self.log.warning(f"Loader '{self.loader_name}' not found")
+            return
+
+        contexts = get_representation_contexts_by_ids(
+            project_name,
+            {container["representation"] for container in containers}
+        )
+        items_contexts = [
+            (container["layer"].id, contexts[container["representation"]])
+            for container in containers
+            if container["representation"] in contexts
+        ]
+        jobs = loader().generate_proxies(items_contexts)
+        self.log.info(f"Generating {len(jobs)} proxies in background")
@@ -1,9 +1,14 @@
+import os
 import re
 
 from ayon_core.pipeline import get_representation_path
 
 from ayon_aftereffects import api
-from ayon_aftereffects.api.lib import get_background_layers
+from ayon_aftereffects.api.lib import (
+    get_background_layers,
+    get_background_layer_fingerprints,
+)
+from ayon_aftereffects.api.pipeline import get_container_data
 
 
 class BackgroundLoader(api.AfterEffectsLoader):
@@ -14,7 +19,8 @@ class BackgroundLoader(api.AfterEffectsLoader):
         each layer for separate image.
 
         For each load container is created and stored in project (.aep)
-        metadata
+        metadata, together with fingerprints of images, so update reloads
+        only changed images, unchanged ones are only pointed to new files.
     """
     label = "Load JSON Background"
     product_base_types = {"background"}
@@ -25,7 +31,7 @@ class BackgroundLoader(api.AfterEffectsLoader):
     def load(self, context, name=None, namespace=None, data=None):
         stub = self.get_stub()
         loaded_item_name = f"{context['folder']['name']}_{name}"
-        comps = stub.get_items(comps=True)
+        comps = stub.get_items(comps=True, fields=["name"])
         loaded_item_name = self._get_unique_loaded_item_name(
             stub, comps, loaded_item_name
         )
@@ -48,13 +54,19 @@ class BackgroundLoader(api.AfterEffectsLoader):
         self[:] = [loaded_item]
         namespace = namespace or loaded_item
 
-        return api.containerise(
+        data = get_container_data(
             name,
             namespace,
             loaded_item,
             context,
             self.__class__.__name__
         )
+        data["layer_fingerprints"] = get_background_layer_fingerprints(
+            layers, context["representation"].get("files")
+        )
+        stub.imprint(loaded_item.id, data)
+
+        return loaded_item
 
     def update(self, container, context):
         stub = self.get_stub()
@@ -72,18 +84,35 @@ class BackgroundLoader(api.AfterEffectsLoader):
         loaded_item_name = f"{folder_name}_{product_name}"
         # switching assets
         if namespace_from_container != loaded_item_name:
+            comps = stub.get_items(comps=True, fields=["name"])
             loaded_item_name = self._get_unique_loaded_item_name(
-                stub, loaded_item_name)
+                stub, comps, loaded_item_name
+            )
         else:  # switching version - keep same name
             loaded_item_name = container["namespace"]
 
         path = get_representation_path(repre_entity)
 
         layers = get_background_layers(path)
+        fingerprints = get_background_layer_fingerprints(
+            layers, repre_entity.get("files")
+        )
+        unchanged_files = self._get_unchanged_files(
+            layers, fingerprints, container.get("layer_fingerprints") or {}
+        )
+        self.log.debug(
+            f"Reloading {len(layers) - len(unchanged_files)} "
+            f"of {len(layers)} background images, "
+            f"{len(unchanged_files)} are only repathed"
+        )
         loaded_item = stub.reload_background(
             container["members"][1],
             stub.LOADED_ICON + loaded_item_name,
-            layers
+            layers,
+            unchanged_files
+        )
+        self._repath_unchanged_files(
+            stub, loaded_item, layers, unchanged_files
         )
 
         # update container
@@ -91,5 +120,59 @@ class BackgroundLoader(api.AfterEffectsLoader):
         container["name"] = product_name
         container["namespace"] = loaded_item_name
         container["members"] = loaded_item.members
+        container["layer_fingerprints"] = fingerprints
 
         stub.imprint(loaded_item.id, container)
+
+    def _repath_unchanged_files(
+        self, stub, loaded_item, layers, unchanged_files
+    ):
+        """Point footage of 'unchanged_files' to files of loaded version.
+
+        Their footage was kept by 'reload_background', same content needs
+        no reload, but container must not reference files of previous
+        version. Footage already linked to same path is skipped.
+        """
+        if not unchanged_files:
+            return
+        # members end with footage of 'layers' in same order
+        item_ids_by_path = dict(
+            zip(layers, loaded_item.members[-len(layers):])
+        )
+        item_ids = [item_ids_by_path[path] for path in unchanged_files]
+        current_paths = {
+            item.id: (item.path or "").replace("\\", "/")
+            for item in stub.get_items(
+                comps=False, footages=True, fields=["path"], ids=item_ids
+            )
+        }
+        replace_items = [
+            (
+                item_ids_by_path[path],
+                path,
+                os.path.splitext(os.path.basename(path))[0],
+            )
+            for path in unchanged_files
+            if current_paths.get(item_ids_by_path[path]) != path
+        ]
+        if not replace_items:
+            return
+        for (_, path, _), error in zip(
+            replace_items, stub.replace_items(replace_items)
+        ):
+            if error:
+                self.log.warning(f"Repath of `{path}` failed: {error}")
+
+    @staticmethod
+    def _get_unchanged_files(layers, fingerprints, previous_fingerprints):
+        """Paths of 'layers' with same content as currently loaded ones."""
+        unchanged_files = []
+        for path in layers:
+            layer_name = os.path.splitext(os.path.basename(path))[0]
+            fingerprint = fingerprints.get(layer_name)
+            if (
+                fingerprint is not None
+                and fingerprint == previous_fingerprints.get(layer_name)
+            ):
+                unchanged_files.append(path)
+        return unchanged_files
@@ -1,6 +1,15 @@
+import os
 import re
 
+from ayon_core.lib import BoolDef
+
 from ayon_aftereffects import api
+from ayon_aftereffects.api.lib import get_unique_item_name
+from ayon_aftereffects.api.proxies import (
+    ProxyJob,
+    get_source_files,
+    start_proxy_generation,
+)
 import ayon_api
 
 
@@ -23,88 +32,249 @@ class FileLoader(api.AfterEffectsLoader):
     product_types = product_base_types
     representations = {"*"}
 
+    # proxy settings, overridden by project settings
+    proxy_scale = 0.5
+    proxy_format = "jpg"
+    proxy_location = "local"
+    proxy_workers = 4
+    proxy_extensions = ["exr", "dpx"]
+
+    @classmethod
+    def get_options(cls, contexts):
+        return [
+            BoolDef(
+                "generate_proxy",
+                label="Generate proxy",
+                default=False,
+                tooltip=(
+                    "Generate low resolution proxy of EXR/DPX footage "
+                    "in background and enable it when ready."
+                )
+            )
+        ]
+
     def load(self, context, name=None, namespace=None, options=None):
+        loaded_items = self._load_many([(context, name, namespace)], options)
+        self[:] = [item for item in loaded_items if item]
+        return loaded_items[0]
+
+    def load_many(self, contexts, options=None):
+        """Load all 'contexts' with single import and metadata write in AE.
+
+        Unique names are resolved from one listing of footage items.
+        """
+        return self._load_many(
+            [
+                (context, context["product"]["name"], None)
+                for context in contexts
+            ],
+            options
+        )
+
+    def _load_many(self, requests, options=None):
+        """Import files of 'requests' and containerise them.
+
+        Args:
+            requests (list): of tuples (context, name, namespace)
+            options (dict): loader options
+
+        Returns:
+            (list): of AEItem or None in order of 'requests'
+        """
         stub = self.get_stub()
-        loaded_item_name = f"{context['folder']['name']}_{name}"
-        footages = stub.get_items(comps=False, footages=True, folders=False)
-        loaded_item_name = self._get_unique_loaded_item_name(
-            stub, footages, loaded_item_name
+        footages = stub.get_items(
+            comps=False, footages=True, folders=False, fields=["name"]
         )
+        existing_item_names = [
+            item.name.replace(stub.LOADED_ICON, "") for item in footages
+        ]
 
-        import_options = {}
+        import_items = []
+        import_requests = []
+        for idx, (context, name, namespace) in enumerate(requests):
+            path = self.filepath_from_context(context)
+            if not path:
+                repr_id = context["representation"]["id"]
+                self.log.warning(
+                    f"Representation id `{repr_id}` is failing to load"
+                )
+                continue
 
-        path = self.filepath_from_context(context)
+            loaded_item_name = get_unique_item_name(
+                existing_item_names, f"{context['folder']['name']}_{name}"
+            )
+            # following items in this batch must not get same name
+            existing_item_names.append(loaded_item_name)
 
-        if len(context["representation"]["files"]) > 1:
-            import_options['sequence'] = True
+            path = path.replace("\\", "/")
+            import_items.append((
+                path,
+                stub.LOADED_ICON + loaded_item_name,
+                self._get_import_options(context, path),
+            ))
+            import_requests.append(
+                (idx, context, name, namespace or loaded_item_name)
+            )
+
+        loaded_items = [None] * len(requests)
+        if not import_items:
+            return loaded_items
+
+        containers = []
+        imported_items = stub.import_files(import_items)
+        for (path, _, _), request, loaded_item in zip(
+            import_items, import_requests, imported_items
+        ):
+            idx, context, name, namespace = request
+            if not loaded_item:
+                self.log.warning(
+                    f"Representation `{path}` is failing to load"
+                )
+                self.log.warning("Check host app for alert error.")
+                continue
+
+            loaded_items[idx] = loaded_item
+            containers.append((
+                name,
+                namespace,
+                loaded_item,
+                context,
+                self.__class__.__name__
+            ))
+
+        if containers:
+            api.containerise_many(containers)
+
+        if (options or {}).get("generate_proxy"):
+            self.generate_proxies([
+                (loaded_item.id, context)
+                for _, _, loaded_item, context, _ in containers
+            ])
+
+        return loaded_items
 
-        if not path:
-            repr_id = context["representation"]["id"]
-            self.log.warning(
-                f"Representation id `{repr_id}` is failing to load"
+    def generate_proxies(self, items_contexts):
+        """Start background generation of proxies of heavy footage.
+
+        Only representations with extension from 'proxy_extensions' are
+        processed.
+
+        Args:
+            items_contexts (list): of tuples (item_id, context)
+
+        Returns:
+            (list): of ProxyJob started
+        """
+        proxy_extensions = {
+            ext.lstrip(".").lower() for ext in self.proxy_extensions
+        }
+        jobs = []
+        for item_id, context in items_contexts:
+            path = self.filepath_from_context(context)
+            ext = os.path.splitext(path or "")[1].lstrip(".").lower()
+            if ext not in proxy_extensions:
+                self.log.debug(f"Proxy not needed for `{path}`")
+                continue
+            is_sequence = len(context["representation"]["files"]) > 1
+            jobs.append(ProxyJob(
+                context["representation"]["id"],
+                get_source_files(path, is_sequence),
+                item_id
+            ))
+
+        if jobs:
+            start_proxy_generation(
+                jobs,
+                self.get_stub(),
+                scale=self.proxy_scale,
+                proxy_format=self.proxy_format,
+                location=self.proxy_location,
+                max_workers=self.proxy_workers,
             )
-            return
+        return jobs
+
+    def _get_import_options(self, context, path):
+        import_options = {}
+
+        if len(context["representation"]["files"]) > 1:
+            import_options['sequence'] = True
 
-        path = path.replace("\\", "/")
         if '.psd' in path:
             import_options['ImportAsType'] = 'ImportAsType.COMP'
 
         if import_options.get("sequence"):
             import_options['fps'] = self._get_fps_data(context)
 
-        loaded_item = stub.import_file(
-            path, stub.LOADED_ICON + loaded_item_name, import_options
-        )
-        if not loaded_item:
-            self.log.warning(
-                f"Representation `{path}` is failing to load"
-            )
-            self.log.warning("Check host app for alert error.")
-            return
-
-        self[:] = [loaded_item]
-        namespace = namespace or loaded_item_name
-        return api.containerise(
-            name,
-            namespace,
-            loaded_item,
-            context,
-            self.__class__.__name__
-        )
+        return import_options
 
     def update(self, container, context):
+        error = self.update_many([(container, context)])[0]
+        if error:
+            raise ValueError(error)
+
+    def update_many(self, containers_contexts):
+        """Update all containers with single replace and metadata write.
+
+        Footage names are listed only once, and only if some container
+        switches to different product.
+        """
         stub = self.get_stub()
-        item = container.pop("layer")
+        existing_item_names = None
 
-        folder_name = context["folder"]["name"]
-        product_name = context["product"]["name"]
-        repre_entity = context["representation"]
+        replace_items = []
+        items_data = []
+        for container, context in containers_contexts:
+            item = container.pop("layer")
 
-        namespace_from_container = re.sub(
-            r"_\d{3}$", "", container["namespace"]
-        )
+            folder_name = context["folder"]["name"]
+            product_name = context["product"]["name"]
+            repre_entity = context["representation"]
 
-        loaded_item_name = f"{folder_name}_{product_name}"
-        if namespace_from_container != loaded_item_name:
-            footages = stub.get_items(
-                comps=False, footages=True, folders=False
+            namespace_from_container = re.sub(
+                r"_\d{3}$", "", container["namespace"]
             )
-            loaded_item_name = self._get_unique_loaded_item_name(
-                stub, footages, loaded_item_name
+
+            loaded_item_name = f"{folder_name}_{product_name}"
+            if namespace_from_container != loaded_item_name:
+                if existing_item_names is None:
+                    footages = stub.get_items(
+                        comps=False, footages=True, folders=False,
+                        fields=["name"]
+                    )
+                    existing_item_names = [
+                        footage.name.replace(stub.LOADED_ICON, "")
+                        for footage in footages
+                    ]
+                loaded_item_name = get_unique_item_name(
+                    existing_item_names, loaded_item_name
+                )
+                existing_item_names.append(loaded_item_name)
+            else:  # switching version - keep same name
+                loaded_item_name = container["namespace"]
+            path = self.filepath_from_context(context)
+
+            replace_items.append(
+                (item.id, path, stub.LOADED_ICON + loaded_item_name)
             )
-        else:  # switching version - keep same name
-            loaded_item_name = container["namespace"]
-        path = self.filepath_from_context(context)
-
-        stub.replace_item(item.id, path, stub.LOADED_ICON + loaded_item_name)
-        stub.imprint(
-            item.id,
-            {
-                "representation": repre_entity["id"],
-                "name": product_name,
-                "namespace": loaded_item_name
-            }
-        )
+            items_data.append((
+                item.id,
+                {
+                    "representation": repre_entity["id"],
+                    "name": product_name,
+                    "namespace": loaded_item_name
+                }
+            ))
+
+        if not replace_items:
+            return []
+
+        errors = stub.replace_items(replace_items)
+        stub.imprint_many([
+            item_data
+            for item_data, error in zip(items_data, errors)
+            if not error
+        ])
+        return errors
 
     def _get_fps_data(self, context: dict) -> float:
         """Get fps data from version. Fallback to task or folder
@@ -0,0 +1,119 @@
+import ayon_api
+
+from ayon_core.pipeline import ProductLoaderPlugin
+from ayon_core.pipeline.load import (
+    discover_loader_plugins,
+    get_representation_contexts_by_ids,
+)
+
+
+class FilesLoader(ProductLoaderPlugin):
+    """Load files of all selected products with single import in AE.
+
+    Representation of each version is picked by 'representation_priority',
+    loading is delegated to 'FileLoader.load_many', so loaded footage is
+    managed (updated, removed) by 'FileLoader'.
+    """
+    label = "Load files (single import)"
+    order = 1
+    icon = "files-o"
+    color = "orange"
+
+    is_multiple_contexts_compatible = True
+
+    product_base_types = {
+        "image",
+        "plate",
+        "render",
+        "prerender",
+        "review",
+        "audio",
+        "workfile",
+    }
+    product_types = product_base_types
+
+    loader_name = "FileLoader"
+    # names of representations in order of preference, other
+    #   representations are used only if none of these exists
+    representation_priority = [
+        "exr", "dpx", "png", "jpg", "tif", "psd", "mov", "mp4", "wav", "aep"
+    ]
+    skipped_representations = {"thumbnail", "review", "h264"}
+
+    def load(self, context, name=None, namespace=None, options=None):
+        version_contexts = context
+        if isinstance(version_contexts, dict):
+            version_contexts = [version_contexts]
+
+        project_name = version_contexts[0]["project"]["name"]
+        loader = self._get_file_loader(project_name)
+        if loader is None:
+            raise ValueError(f"Loader '{self.loader_name}' not found")
+
+        repre_ids_by_version_id = self._get_representation_ids(
+            project_name,
+            {
+                version_context["version"]["id"]
+                for version_context in version_contexts
+            }
+        )
+        repre_contexts_by_id = get_representation_contexts_by_ids(
+            project_name, set(repre_ids_by_version_id.values())
+        )
+        repre_contexts = []
+        for version_context in version_contexts:
+            version_id = version_context["version"]["id"]
+            repre_id = repre_ids_by_version_id.get(version_id)
+            if repre_id is None:
+                self.log.warning(
+                    f"Version `{version_id}` has no representation to load"
+                )
+                continue
+            repre_contexts.append(repre_contexts_by_id[repre_id])
+
+        if not repre_contexts:
+            return []
+
+        loaded_items = loader().load_many(repre_contexts, options)
+        self[:] = [item for item in loaded_items if item]
+        return loaded_items
+
+    def _get_file_loader(self, project_name):
+        return next(
+            (
+                loader
+                for loader in discover_loader_plugins(project_name)
+                if loader.__name__ == self.loader_name
+            ),
+            None
+        )
+
+    def _get_representation_ids(self, project_name, version_ids):
+        """Pick representation to load for each version.
+
+        Returns:
+            (dict): representation id by version id
+        """
+        priority = {
+            repre_name: idx
+            for idx, repre_name in enumerate(self.representation_priority)
+        }
+        picked = {}
+        for repre_entity in ayon_api.get_representations(
+            project_name,
+            version_ids=version_ids,
+            fields={"id", "name", "versionId"},
+        ):
+            repre_name = repre_entity["name"]
+            if repre_name in self.skipped_representations:
+                continue
+            rank = priority.get(repre_name, len(priority))
+            version_id = repre_entity["versionId"]
+            current = picked.get(version_id)
+            if current is None or rank < current[0]:
+                picked[version_id] = (rank, repre_entity["id"])
+
+        return {
+            version_id: repre_id
+            for version_id, (_, repre_id) in picked.items()
+        }
@@ -0,0 +1,26 @@
+import pyblish.api
+
+from ayon_core.pipeline.context_tools import get_current_project_settings
+
+from ayon_aftereffects.api.publish_profiler import (
+    is_publish_profiler_enabled,
+    start_publish_profiler,
+)
+
+
+class CollectPublishProfiler(pyblish.api.ContextPlugin):
+    """Start publish profiler if enabled by env var or project settings.
+
+    Runs first, so all following plugins are profiled. Profiler is stopped
+    and report is written by 'WritePublishProfile'.
+    """
+
+    order = pyblish.api.CollectorOrder - 0.51
+    label = "Collect Publish Profiler"
+    hosts = ["aftereffects"]
+
+    def process(self, context):
+        if not is_publish_profiler_enabled(get_current_project_settings()):
+            return
+        self.log.info("Publish profiler enabled")
+        start_publish_profiler(context)
@@ -11,6 +11,11 @@ from ayon_core.pipeline.publish import RenderInstance
 from ayon_core.pipeline import PublishValidationError
 
 from ayon_aftereffects.api import get_stub
+from ayon_aftereffects.api.frame_sequence import (
+    FRAME_TOKEN,
+    ExpectedFiles,
+    FrameSequenceSpec,
+)
 
 @attr.s
 class AERenderInstance(RenderInstance):
@@ -65,8 +70,10 @@ class CollectAERender(publish.AbstractCollectRender):
 
         project_entity = context.data["projectEntity"]
 
-        compositions = stub.get_items(True)
+        compositions = stub.get_items(True, fields=["id", "name"])
         compositions_by_id = {item.id: item for item in compositions}
+
+        render_insts = []
         for inst in context:
             if not inst.data.get("active", True):
                 continue
@@ -77,9 +84,17 @@ class CollectAERender(publish.AbstractCollectRender):
                 product_base_type = product_type
             if product_base_type != "render":
                 continue
+            render_insts.append((inst, product_type, product_base_type))
+
+        # query all compositions at once, render queue is walked only once
+        render_data_by_comp_id = stub.get_render_instances_info(list({
+            int(inst.data["members"][0])
+            for inst, _, _ in render_insts
+        }))
 
+        for inst, product_type, product_base_type in render_insts:
             comp_id = int(inst.data["members"][0])
-            comp_info = stub.get_comp_properties(comp_id)
+            comp_info, render_queue = render_data_by_comp_id[comp_id]
 
             if not comp_info:
                 self.log.warning("Orphaned instance, deleting metadata")
@@ -95,7 +110,6 @@ class CollectAERender(publish.AbstractCollectRender):
 
             task_name = inst.data.get("task")
 
-            render_queue = stub.get_render_info(comp_id)
             if not render_queue:
                 raise PublishValidationError(
                     "No file extension set in Render Queue")
@@ -180,13 +194,13 @@ class CollectAERender(publish.AbstractCollectRender):
                 in url
 
         Returns:
-            (list) of absolute urls to rendered file
+            (ExpectedFiles) lazy sequence of absolute urls to rendered file
         """
         start = render_instance.frameStart
         end = render_instance.frameEnd
 
         base_dir = self._get_output_dir(render_instance)
-        expected_files = []
+        specs = []
         for file_name in render_instance.render_queue_file_paths:
             _, ext = os.path.splitext(os.path.basename(file_name))
             ext = ext.replace('.', '')
@@ -197,20 +211,22 @@ class CollectAERender(publish.AbstractCollectRender):
                     version_str,
                     ext
                 )
-                file_path = os.path.join(base_dir, file_name)
-                expected_files.append(file_path)
+                specs.append(
+                    FrameSequenceSpec(os.path.join(base_dir, file_name)))
             else:
-                for frame in range(start, end + 1):
-                    file_name = "{}_{}.{}.{}".format(
-                        render_instance.productName,
-                        version_str,
-                        str(frame).zfill(self.padding_width),
-                        ext
-                    )
-
-                    file_path = os.path.join(base_dir, file_name)
-                    expected_files.append(file_path)
-        return expected_files
+                file_name = "{}_{}.{}.{}".format(
+                    render_instance.productName,
+                    version_str,
+                    FRAME_TOKEN,
+                    ext
+                )
+                specs.append(FrameSequenceSpec(
+                    os.path.join(base_dir, file_name),
+                    self.padding_width,
+                    start,
+                    end
+                ))
+        return ExpectedFiles(specs)
 
     def _get_output_dir(self, render_instance):
         """Return dir path of rendered files, used in submit_publish_job
@@ -1,13 +1,19 @@
 import os
 import platform
 import collections
-import re
 import urllib.parse
 
 import pyblish.api
 
 from ayon_core.pipeline.publish import KnownPublishError
 
+from ayon_aftereffects.api.frame_inventory import FrameInventory
+from ayon_aftereffects.api.frame_sequence import (
+    EXPECTED_SPECS_KEY,
+    ExpectedFiles,
+    FrameSequenceSpec,
+)
+
 
 class CollectExistingFrames(pyblish.api.InstancePlugin):
     """Collect existing files rendered via Render in Render Queues.
@@ -20,7 +26,9 @@ class CollectExistingFrames(pyblish.api.InstancePlugin):
     It is expected if there are multiple output modules per Render Queue,
     they must have different extension!
 
-    Prepares representations to allow integration later.
+    Prepares representations to allow integration later. Listed files are
+    stored as 'FrameInventory' per extension in 'frameInventories' to be
+    reused by validators.
     """
 
     order = pyblish.api.CollectorOrder + 0.150
@@ -43,7 +51,8 @@ class CollectExistingFrames(pyblish.api.InstancePlugin):
         render_queue_file_paths = instance.data["render_queue_file_paths"]
         files_by_ext = collections.defaultdict(list)
         folders_by_ext = collections.defaultdict(list)
-        expected_files = []
+        inventories_by_ext = {}
+        expected_specs = []
         for render_queue_file_path in render_queue_file_paths:
             render_queue_file_path = (
                 self._normalize_path(render_queue_file_path))
@@ -58,8 +67,11 @@ class CollectExistingFrames(pyblish.api.InstancePlugin):
             )
             render_queue_extension = render_queue_extension.lstrip(".")
 
-            self._add_expected_files(
-                instance, render_queue_file_path, expected_files)
+            expected_specs.append(FrameSequenceSpec.from_render_queue_path(
+                urllib.parse.unquote(render_queue_file_path),
+                instance.data["frameStart"],
+                instance.data["frameEnd"]
+            ))
 
             if render_queue_extension in folders_by_ext:
                 raise KnownPublishError(
@@ -70,10 +82,14 @@ class CollectExistingFrames(pyblish.api.InstancePlugin):
 
             folders_by_ext[render_queue_extension] = render_queue_folder
             self.log.debug(f"Searching for files in '{render_queue_folder}'")
-            for file_name in os.listdir(render_queue_folder):
-                if not file_name.endswith(render_queue_extension):
-                    continue
-                files_by_ext[render_queue_extension].append(file_name)
+            inventory = FrameInventory.scan(
+                render_queue_folder,
+                render_queue_extension,
+                urllib.parse.unquote(render_queue_file_path)
+            )
+            inventories_by_ext[render_queue_extension] = inventory
+            if inventory.file_names:
+                files_by_ext[render_queue_extension] = inventory.file_names
 
         if not files_by_ext:
             self.log.warning("No expected files collected, "
@@ -105,29 +121,9 @@ class CollectExistingFrames(pyblish.api.InstancePlugin):
             representations.append(repre_data)
 
         instance.data["representations"] = representations
-        instance.data["expectedFiles"] = expected_files
-
-    def _add_expected_files(self, instance, render_queue_path, expected_files):
-        """Calculate expected files from file patterns in Render Queue"""
-        render_queue_path = urllib.parse.unquote(render_queue_path)
-        frames_pattern = re.search("\[#*\]", render_queue_path)
-
-        if not frames_pattern:
-            expected_files.append(render_queue_path)
-            return
-
-        frames_pattern = frames_pattern.group()
-
-        frame_start = instance.data["frameStart"]
-        frame_end = instance.data["frameEnd"]
-
-        frames_length = frames_pattern.count("#")
-        for frame in range(frame_start, frame_end + 1):
-            frame_str = "%0*d" % (frames_length, int(frame))
-            render_queue_path = render_queue_path.replace(
-                frames_pattern, frame_str)
-            expected_files.append(render_queue_path)
-
+        instance.data["expectedFiles"] = ExpectedFiles(expected_specs)
+        instance.data[EXPECTED_SPECS_KEY] = expected_specs
+        instance.data["frameInventories"] = inventories_by_ext
 
     def _normalize_path(self, path):
         """AE might return path like '/c/Users/...', convert to proper path"""
@@ -22,7 +22,8 @@ class ExtractSaveScene(pyblish.api.InstancePlugin):
         comp_items =  stub.get_items(
             comps=True,
             folders=False,
-            footages=False
+            footages=False,
+            fields=["name"]
         )
         if "data" not in representation:
             representation["data"] = {}
@@ -1,44 +1,322 @@
 import os
+import shutil
+import hashlib
+import tempfile
+import urllib.parse
 
-from ayon_core.pipeline import publish
+import pyblish.api
 
 from ayon_aftereffects.api import get_stub
+from ayon_aftereffects.api.render_progress import RenderProgressTracker
+from ayon_aftereffects.api.frame_inventory import (
+    FrameInventory,
+    get_missing_frame_ranges,
+)
+from ayon_aftereffects.api.frame_integrity import check_frames_integrity
+from ayon_aftereffects.api.frame_sequence import (
+    EXPECTED_SPECS_KEY,
+    FrameSequenceSpec,
+)
+from ayon_aftereffects.api.render_cache import (
+    RenderCache,
+    get_render_cache_key,
+)
 
-class ExtractLocalRender(publish.Extractor):
-    """Render RenderQueue locally."""
 
-    order = publish.Extractor.order - 0.47
+class ExtractLocalRender(pyblish.api.ContextPlugin):
+    """Render RenderQueue locally.
+
+    All 'render.local' instances are rendered in single pass of Render
+    Queue, so render engine starts only once. Rendered files are then
+    distributed to representations of their instances.
+
+    With 'resume' enabled each instance renders into stable staging dir
+    (based on workfile, folder and product), valid frames left there by
+    previous failed publish are kept and only missing frame ranges are
+    rendered. Composition is not compared with previous state, artist is
+    expected to fix only failed render.
+
+    With 'use_render_cache' enabled frames of unchanged composition are
+    reused from render cache (see 'render_cache.py') instead of rendering.
+    """
+
+    order = pyblish.api.ExtractorOrder - 0.47
     label = "Extract Local Render"
     hosts = ["aftereffects"]
     families = ["render.local"]
+    settings_category = "aftereffects"
+
+    resume = False
+    use_render_cache = False
+
+    def process(self, context):
+        instances = self._get_local_render_instances(context)
+        if not instances:
+            self.log.debug("No instances to render locally")
+            return
 
-    def process(self, instance):
         stub = get_stub()
+        cache_keys = {}
+        if self.use_render_cache:
+            cache_keys = self._get_cache_keys(stub, instances)
+        render_cache = RenderCache()
+
+        render_items = []
+        for instance in instances:
+            # pull file name collected value from Render Queue Output module
+            if not instance.data["render_queue_file_paths"]:
+                raise ValueError("No file extension set in Render Queue")
+
+            if self.resume:
+                self._use_resume_staging_dir(instance)
+            staging_dir = instance.data["stagingDir"]
+            self.log.debug("staging_dir::{}".format(staging_dir))
+
+            cache_key = cache_keys.get(instance.id)
+            if cache_key and render_cache.restore(cache_key, staging_dir):
+                self.log.info(
+                    f"{instance.data['name']}: composition not changed, "
+                    f"reusing frames from render cache ({cache_key})"
+                )
+                cache_keys.pop(instance.id)
+                continue
+
+            _, first_ext = os.path.splitext(
+                instance.data["render_queue_file_paths"][0])
+            render_item = {
+                "comp_id": instance.data["comp_id"],
+                "folder": staging_dir,
+                "frames_total": (
+                    instance.data["frameEnd"]
+                    - instance.data["frameStart"] + 1
+                ),
+                "extension": first_ext[1:],
+            }
+            if self.resume and self._prepare_resume(instance, render_item):
+                continue
+            render_items.append(render_item)
+
+        if not render_items:
+            self.log.info("All frames already rendered")
+            for instance in instances:
+                self._add_representations(instance)
+            return
+
+        comp_ids = [item["comp_id"] for item in render_items]
+        # other listeners (eg. UI) could use
+        # 'register_render_progress_callback'
+        with RenderProgressTracker(comp_ids, logger=self.log) as tracker:
+            render_result = stub.render_many(render_items) or {}
+        rendered_whole = set(render_result.get("rendered_whole") or [])
+        if rendered_whole:
+            self.log.info(
+                "'Use Comp Frame Number' couldn't be enabled in output "
+                "module, whole compositions were rendered instead of "
+                "missing frames: {}".format(sorted(rendered_whole))
+            )
+
+        for instance in instances:
+            frame_times = tracker.get_frame_times(instance.data["comp_id"])
+            instance.data["renderFrameTimes"] = frame_times
+            if frame_times:
+                self.log.info(
+                    "{}: rendered {} frames in {:.1f}s, slowest frame {} "
+                    "({:.1f}s)".format(
+                        instance.data["name"],
+                        len(frame_times),
+                        sum(frame_times.values()),
+                        *max(frame_times.items(), key=lambda item: item[1])
+                    )
+                )
+            self._add_representations(instance)
+
+            cache_key = cache_keys.get(instance.id)
+            if cache_key:
+                file_names = self._get_representation_files(instance)
+                if file_names:
+                    render_cache.store(
+                        cache_key, instance.data["stagingDir"], file_names)
+
+    def _get_cache_keys(self, stub, instances):
+        """Render cache key of each instance, fingerprints in single call.
+
+        Returns:
+            (dict): {instance.id: str}, instances which cannot be cached are
+                missing
+        """
+        fingerprints = stub.get_render_fingerprints(
+            [instance.data["comp_id"] for instance in instances]
+        )
+        cache_keys = {}
+        for instance in instances:
+            fingerprint = fingerprints.get(str(instance.data["comp_id"]))
+            if not fingerprint:
+                continue
+            cache_key = get_render_cache_key(
+                fingerprint,
+                instance.data["frameStart"],
+                instance.data["frameEnd"],
+                [
+                    get_rendered_file_name(file_path)
+                    for file_path in instance.data["render_queue_file_paths"]
+                ]
+            )
+            if cache_key:
+                cache_keys[instance.id] = cache_key
+        return cache_keys
+
+    def _get_representation_files(self, instance):
+        file_names = []
+        for repre in instance.data.get("representations", []):
+            repre_files = repre["files"]
+            if isinstance(repre_files, str):
+                repre_files = [repre_files]
+            file_names.extend(repre_files)
+        return file_names
+
+    def _use_resume_staging_dir(self, instance):
+        """Switch instance to stable staging dir."""
+        staging_dir = self._get_resume_staging_dir(instance)
+        previous_staging_dir = instance.data["stagingDir"]
+        if previous_staging_dir != staging_dir:
+            # empty dir created by collector
+            if (
+                os.path.isdir(previous_staging_dir)
+                and not os.listdir(previous_staging_dir)
+            ):
+                shutil.rmtree(previous_staging_dir, ignore_errors=True)
+            instance.data["stagingDir"] = staging_dir
+        os.makedirs(staging_dir, exist_ok=True)
+
+    def _prepare_resume(self, instance, render_item):
+        """Find frames to render in stable staging dir.
+
+        Invalid (truncated) frames are deleted, missing frame ranges are
+        stored in 'render_item["ranges"]'.
+
+        Returns:
+            (bool): True if all frames are already rendered
+        """
         staging_dir = instance.data["stagingDir"]
-        self.log.debug("staging_dir::{}".format(staging_dir))
+        file_paths = instance.data["render_queue_file_paths"]
+        if any(
+            "#" not in get_rendered_file_name(file_path)
+            for file_path in file_paths
+        ):
+            # single file output (eg. mov) must be rendered whole
+            return False
+
+        frame_start = instance.data["frameStart"]
+        frame_end = instance.data["frameEnd"]
+        valid_frames = set(range(frame_start, frame_end + 1))
+        for file_path in file_paths:
+            _, ext = os.path.splitext(file_path)
+            inventory = FrameInventory.scan(
+                staging_dir, ext[1:],
+                file_pattern=get_rendered_file_name(file_path)
+            )
+            entries_by_frame = inventory.entries_by_frame
+            valid_frames &= set(entries_by_frame)
+
+            problems = check_frames_integrity(
+                [entry.path for entry in entries_by_frame.values()],
+                sizes={
+                    entry.path: entry.get_size
+                    for entry in entries_by_frame.values()
+                }
+            )
+            for frame, entry in list(entries_by_frame.items()):
+                problem = problems.get(entry.path)
+                if problem is None and frame_start <= frame <= frame_end:
+                    continue
+                if problem is None:
+                    problem = "out of frame range"
+                self.log.info(f"Removing frame {entry.path}: {problem}")
+                inventory.remove(entry.name)
+                valid_frames.discard(frame)
+
+        ranges = get_missing_frame_ranges(valid_frames, frame_start, frame_end)
+        if not ranges:
+            self.log.info(
+                f"{instance.data['name']}: all frames already rendered "
+                f"in {staging_dir}"
+            )
+            return True
+
+        if valid_frames:
+            self.log.info(
+                "{}: resuming render, {} valid frames found, rendering {}"
+                .format(
+                    instance.data["name"],
+                    len(valid_frames),
+                    ", ".join(f"{start}-{end}" for start, end in ranges)
+                )
+            )
+            render_item["ranges"] = ranges
+            render_item["frames_total"] = sum(
+                end - start + 1 for start, end in ranges
+            )
+        return False
 
-        # pull file name collected value from Render Queue Output module
-        if not instance.data["render_queue_file_paths"]:
-            raise ValueError("No file extension set in Render Queue")
+    def _get_resume_staging_dir(self, instance):
+        """Same dir for same workfile, folder and product."""
+        key = "|".join((
+            instance.data["source"],
+            instance.data["folderPath"],
+            instance.data["productName"],
+        ))
+        dir_name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(
+            tempfile.gettempdir(), "ayon_aftereffects_render", dir_name
+        )
 
-        comp_id = instance.data['comp_id']
-        stub.render(staging_dir, comp_id)
+    def _get_local_render_instances(self, context):
+        instances = []
+        for instance in context:
+            if not instance.data.get("publish", True):
+                continue
+            if not instance.data.get("active", True):
+                continue
+            if "render.local" in instance.data.get("families", []):
+                instances.append(instance)
+        return instances
+
+    def _add_representations(self, instance):
+        """Representation of rendered files for each output module.
+
+        Only frames of output module's sequence in instance frame range are
+        used, staging dir might contain frames of previous (resumed) render.
+        Expected files in staging dir are stored for validators.
+        """
+        staging_dir = instance.data["stagingDir"]
+        frame_start = instance.data["frameStart"]
+        frame_end = instance.data["frameEnd"]
 
         representations = []
-        for file_name in instance.data["render_queue_file_paths"]:
-            _, ext = os.path.splitext(os.path.basename(file_name))
+        expected_specs = []
+        instance.data[EXPECTED_SPECS_KEY] = expected_specs
+        for file_path in instance.data["render_queue_file_paths"]:
+            file_name = get_rendered_file_name(file_path)
+            _, ext = os.path.splitext(file_name)
             ext = ext[1:]
+            expected_specs.append(FrameSequenceSpec.from_render_queue_path(
+                os.path.join(staging_dir, file_name), frame_start, frame_end
+            ))
 
-            first_file_path = None
-            files = []
-            for found_file_name in os.listdir(staging_dir):
-                if not found_file_name.endswith(ext):
-                    continue
-
-                files.append(found_file_name)
-                if first_file_path is None:
-                    first_file_path = os.path.join(staging_dir,
-                                                   found_file_name)
+            inventory = FrameInventory.scan(
+                staging_dir, ext, file_pattern=file_name
+            )
+            if "#" in file_name:
+                files = [
+                    entry.name
+                    for frame, entry in sorted(
+                        inventory.entries_by_frame.items()
+                    )
+                    if frame_start <= frame <= frame_end
+                ]
+            else:
+                # single file output (eg. mov)
+                files = inventory.file_names
 
             if not files:
                 self.log.info("no files")
@@ -67,3 +345,16 @@ class ExtractLocalRender(publish.Extractor):
             representations.append(repre_data)
 
         instance.data["representations"] = representations
+
+
+def get_rendered_file_name(render_queue_file_path):
+    """Name of files rendered by output module with 'render_queue_file_path'.
+
+    Path from Render Queue is URL encoded and rendering removes publish
+    icon from name (see 'renderMany').
+    """
+    file_name = urllib.parse.unquote(
+        os.path.basename(render_queue_file_path)
+    )
+    return file_name.replace("\u2117", "")
+
@@ -2,14 +2,13 @@
 """Validate presence of footage items in composition
 Requires:
 """
-import os
-
 import pyblish.api
 
 from ayon_core.pipeline import (
     PublishXmlValidationError
 )
 from ayon_aftereffects.api import get_stub
+from ayon_aftereffects.api.footage_inventory import FootageInventory
 
 
 class ValidateFootageItems(pyblish.api.InstancePlugin):
@@ -19,10 +18,11 @@ class ValidateFootageItems(pyblish.api.InstancePlugin):
     AE fails silently and doesn't render anything if footage item file is
     missing. This will result in nonresponsiveness of AE UI as it expects
     reaction from user, but it will not provide dialog.
-    This validator tries to check existence of the files.
-    It will not protect from missing frame in multiframes though
-    (as AE api doesn't provide this information and it cannot be told how many
-    frames should be there easily). Missing frame is replaced by placeholder.
+    This validator tries to check existence of the files and of all frames
+    of image sequences (missing frame would be replaced by placeholder).
+
+    Footage is queried and checked only once per publish, inventory is
+    shared by all instances in 'context.data["aeFootageInventory"]'.
     """
 
     order = pyblish.api.ValidatorOrder
@@ -31,19 +31,43 @@ class ValidateFootageItems(pyblish.api.InstancePlugin):
     hosts = ["aftereffects"]
     optional = True
 
+    max_workers = 16
+
     def process(self, instance):
         """Plugin entry point."""
+        inventory = self._get_inventory(instance.context)
 
         comp_id = instance.data["comp_id"]
-        for footage_item in get_stub().get_items(
-                comps=False, folders=False, footages=True):
+        for footage_item in inventory.get_comp_footage(comp_id):
             self.log.debug(f"Validating footage item: {footage_item.name}")
-            if comp_id not in footage_item.containing_comps:
+            state = inventory.get_state(footage_item.path)
+            if state is None:
                 continue
 
-            path = footage_item.path
-            if path and not os.path.exists(path):
-                msg = f"File {path} not found."
-                formatting = {"name": footage_item.name, "path": path}
+            if not state.exists:
+                msg = f"File {state.path} not found."
+                formatting = {"name": footage_item.name, "path": state.path}
                 raise PublishXmlValidationError(
                     self, msg, formatting_data=formatting)
+
+            if state.missing_frames:
+                missing = ", ".join(state.missing_frames[:10])
+                if len(state.missing_frames) > 10:
+                    missing += ", ... ({} frames)".format(
+                        len(state.missing_frames))
+                msg = f"Sequence {state.path} is missing frames {missing}."
+                formatting = {
+                    "name": footage_item.name,
+                    "path": "{} (missing frames: {})".format(
+                        state.path, missing)
+                }
+                raise PublishXmlValidationError(
+                    self, msg, formatting_data=formatting)
+
+    def _get_inventory(self, context):
+        inventory = context.data.get("aeFootageInventory")
+        if inventory is None:
+            inventory = FootageInventory.build(
+                get_stub(), max_workers=self.max_workers)
+            context.data["aeFootageInventory"] = inventory
+        return inventory
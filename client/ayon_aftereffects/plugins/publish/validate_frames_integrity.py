@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Validate that all rendered frames exist and are not truncated.
+Requires:
+    instance    -> representations
+"""
+import os
+
+import clique
+import pyblish.api
+
+from ayon_core.pipeline import (
+    PublishXmlValidationError,
+    OptionalPyblishPluginMixin
+)
+from ayon_core.pipeline.publish import Extractor
+
+from ayon_aftereffects.api.frame_integrity import check_frames_integrity
+from ayon_aftereffects.api.frame_sequence import EXPECTED_SPECS_KEY
+
+
+class ValidateFramesIntegrity(
+    OptionalPyblishPluginMixin, pyblish.api.InstancePlugin
+):
+    """Checks that every expected frame is rendered and complete.
+
+    Crashed render might leave missing, empty or truncated frames which
+    would be published without any warning. Expected frames are taken from
+    expected file specs (stored by 'ExtractLocalRender' and
+    'CollectExistingFrames') or from frame range of representations. Size
+    of each frame is checked and its header and trailer are read (PNG IEND
+    chunk, OpenEXR magic number and chunk table, JPEG EOI marker).
+
+    Runs after 'ExtractLocalRender' to check freshly rendered frames and
+    frames rendered previously by artist ('Use existing frames').
+    Files listed by 'CollectExistingFrames' are reused.
+    """
+
+    order = Extractor.order - 0.46
+    label = "Validate Frames Integrity"
+    families = ["render"]
+    hosts = ["aftereffects"]
+    optional = True
+    settings_category = "aftereffects"
+
+    max_workers = 8
+
+    def process(self, instance):
+        if not self.is_active(instance.data):
+            return
+
+        paths = []
+        for repre in instance.data.get("representations", []):
+            repre_files = repre["files"]
+            if isinstance(repre_files, str):
+                repre_files = [repre_files]
+            paths.extend(
+                os.path.join(repre["stagingDir"], file_name)
+                for file_name in repre_files
+            )
+
+        missing_paths = self._get_missing_paths(instance, paths)
+        if not paths and not missing_paths:
+            self.log.debug("No rendered frames to check")
+            return
+
+        problems = check_frames_integrity(
+            paths,
+            sizes=self._get_known_sizes(instance),
+            max_workers=self.max_workers
+        )
+        for path in missing_paths:
+            problems[path] = "missing frame"
+        if not problems:
+            self.log.debug(f"All {len(paths)} frames are complete")
+            return
+
+        bad_frames = sorted(problems)
+        for path in bad_frames:
+            self.log.error(f"{path}: {problems[path]}")
+
+        msg = "{} of {} expected frames are missing or damaged".format(
+            len(bad_frames), len(paths) + len(missing_paths))
+        formatting_data = {
+            "bad_frames": "<br/>".join(
+                f"{os.path.basename(path)}: {problems[path]}"
+                for path in bad_frames
+            )
+        }
+        raise PublishXmlValidationError(
+            self, msg, formatting_data=formatting_data
+        )
+
+    @staticmethod
+    def _get_missing_paths(instance, paths):
+        """Paths of expected frames which are not in 'paths'."""
+        specs = instance.data.get(EXPECTED_SPECS_KEY)
+        if specs is not None:
+            # outputs have different extensions, names never collide
+            file_names = {os.path.basename(path) for path in paths}
+            return [
+                os.path.join(spec.directory, file_name)
+                for spec in specs
+                for file_name in spec.get_missing_names(file_names)
+            ]
+
+        missing_paths = []
+        for repre in instance.data.get("representations", []):
+            repre_files = repre["files"]
+            if isinstance(repre_files, str):
+                # single file (eg. mov) or single frame
+                continue
+            collections, _ = clique.assemble(repre_files)
+            if len(collections) != 1:
+                continue
+            collection = collections[0]
+            frame_start = repre.get("frameStart", instance.data["frameStart"])
+            frame_end = repre.get("frameEnd", instance.data["frameEnd"])
+            missing_paths.extend(
+                os.path.join(
+                    repre["stagingDir"],
+                    "{}{}{}".format(
+                        collection.head,
+                        str(frame).zfill(collection.padding),
+                        collection.tail
+                    )
+                )
+                for frame in range(int(frame_start), int(frame_end) + 1)
+                if frame not in collection.indexes
+            )
+        return missing_paths
+
+    @staticmethod
+    def _get_known_sizes(instance):
+        """Sizes of files listed by 'CollectExistingFrames'."""
+        sizes = {}
+        for inventory in instance.data.get("frameInventories", {}).values():
+            for entry in inventory.entries:
+                # stat is done by integrity check in worker threads
+                sizes[entry.path] = entry.get_size
+        return sizes
@@ -9,6 +9,8 @@ import pyblish.api
 
 from ayon_core.pipeline.publish import PublishValidationError, RepairAction
 
+from ayon_aftereffects.api.frame_sequence import get_expected_specs
+
 
 class ValidateRenderedFiles(pyblish.api.InstancePlugin):
     """Validates if locally pre rendered files are all as expected.
@@ -19,6 +21,9 @@ class ValidateRenderedFiles(pyblish.api.InstancePlugin):
     expected to be rendered.
 
     Applies only on instances created with 'Use existing frames'.
+
+    Reuses 'frameInventories' listed by 'CollectExistingFrames', output
+    folders are not listed again.
     """
 
     order = pyblish.api.ValidatorOrder
@@ -39,8 +44,7 @@ class ValidateRenderedFiles(pyblish.api.InstancePlugin):
             self.log.debug("Not using existing frames, skipping")
             return
 
-        expected_files = {os.path.basename(file_path)
-                          for file_path in instance.data["expectedFiles"]}
+        expected_specs = get_expected_specs(instance.data)
 
         collected_files = self._get_collected_files(instance)
 
@@ -48,7 +52,9 @@ class ValidateRenderedFiles(pyblish.api.InstancePlugin):
         # single folder
         checked_folders = self._get_checked_folders(instance)
 
-        missing = expected_files - collected_files
+        missing = []
+        for spec in expected_specs:
+            missing.extend(spec.get_missing_names(collected_files))
         if missing:
             raise PublishValidationError(
                 "<b>Checked:</b> {}<br/><br/>"
@@ -57,7 +63,10 @@ class ValidateRenderedFiles(pyblish.api.InstancePlugin):
                 "Existing files: {}".format(
                     sorted(checked_folders),
                     sorted(missing),
-                    sorted(expected_files),
+                    ", ".join(
+                        os.path.basename(str(spec))
+                        for spec in expected_specs
+                    ),
                     sorted(collected_files)
                 )
             )
@@ -65,7 +74,7 @@ class ValidateRenderedFiles(pyblish.api.InstancePlugin):
             self.log.debug("Matching expected and found files")
 
         collections, remainders = (
-            self._get_collections_and_remainders(collected_files))
+            self._get_collections_and_remainders(instance))
 
         if remainders:
             raise PublishValidationError(
@@ -87,21 +96,42 @@ class ValidateRenderedFiles(pyblish.api.InstancePlugin):
     @classmethod
     def _get_checked_folders(cls, instance):
         """Parses physical output dirs from Render Queue Output Module(s)"""
-        checked_folders = {os.path.dirname(file_path)
-                           for file_path in instance.data["expectedFiles"]}
+        checked_folders = {
+            spec.directory
+            for spec in get_expected_specs(instance.data)
+        }
         return checked_folders
 
     @classmethod
-    def _get_collections_and_remainders(cls, collected_files):
+    def _get_collections_and_remainders(cls, instance):
         """Looks for similarly named files outside of collected sequence.
 
         Could cause an issue in ExtractReview or Integrate.
         """
-        return clique.assemble(collected_files)
+        inventories = instance.data.get("frameInventories")
+        if inventories is None:
+            return clique.assemble(cls._get_collected_files(instance))
+
+        # files with different extensions are never in same collection
+        collections = []
+        remainders = []
+        for inventory in inventories.values():
+            inv_collections, inv_remainders = (
+                inventory.get_collections_and_remainders())
+            collections.extend(inv_collections)
+            remainders.extend(inv_remainders)
+        return collections, remainders
 
     @classmethod
     def _get_collected_files(cls, instance):
         """Returns all physically found frames for output dir(s)"""
+        inventories = instance.data.get("frameInventories")
+        if inventories is not None:
+            collected_files = set()
+            for inventory in inventories.values():
+                collected_files.update(inventory.file_names)
+            return collected_files
+
         collected_files = []
         for repre in instance.data["representations"]:
             repre_files = repre["files"]
@@ -115,10 +145,19 @@ class ValidateRenderedFiles(pyblish.api.InstancePlugin):
     @classmethod
     def repair(cls, instance):
         """Deletes out of sequence files from output dir(s)."""
-        collected_files = cls._get_collected_files(instance)
+        inventories = instance.data.get("frameInventories")
+        if inventories is not None:
+            for inventory in inventories.values():
+                _, remainders = inventory.get_collections_and_remainders()
+                for remainder_file_name in list(remainders):
+                    file_path = inventory.remove(remainder_file_name)
+                    if file_path:
+                        cls.log.warning(f"Removing {file_path}")
+            return
+
         checked_folders = cls._get_checked_folders(instance)
 
-        _, remainders = cls._get_collections_and_remainders(collected_files)
+        _, remainders = cls._get_collections_and_remainders(instance)
 
         for remainder_file_name in remainders:
             for checked_folder in checked_folders:
@@ -0,0 +1,25 @@
+import pyblish.api
+
+from ayon_aftereffects.api.publish_profiler import (
+    get_publish_profiler,
+    stop_publish_profiler,
+)
+
+
+class WritePublishProfile(pyblish.api.ContextPlugin):
+    """Stop publish profiler started by 'CollectPublishProfiler'.
+
+    Report is written next to workfile.
+    """
+
+    order = pyblish.api.IntegratorOrder + 9.5
+    label = "Write Publish Profile"
+    hosts = ["aftereffects"]
+
+    def process(self, context):
+        profiler = get_publish_profiler()
+        if profiler is None or not profiler.is_active:
+            return
+        report_path = stop_publish_profiler()
+        if report_path:
+            self.log.info(f"Publish profile written to {report_path}")
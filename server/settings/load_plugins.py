@@ -0,0 +1,68 @@
+from ayon_server.settings import BaseSettingsModel, SettingsField
+
+
+def proxy_format_enum():
+    return [
+        {"value": "jpg", "label": "JPEG"},
+        {"value": "png", "label": "PNG"},
+    ]
+
+
+def proxy_location_enum():
+    return [
+        {"value": "local", "label": "Local cache"},
+        {"value": "publish", "label": "Next to published files"},
+    ]
+
+
+class FileLoaderModel(BaseSettingsModel):
+    proxy_scale: float = SettingsField(
+        0.5,
+        ge=0.05,
+        le=1.0,
+        title="Proxy scale",
+        description="Resolution of proxy relative to source footage."
+    )
+    proxy_format: str = SettingsField(
+        "jpg",
+        enum_resolver=proxy_format_enum,
+        title="Proxy format"
+    )
+    proxy_location: str = SettingsField(
+        "local",
+        enum_resolver=proxy_location_enum,
+        title="Proxy location",
+        description=(
+            "Local cache is keyed by representation id, its root could be "
+            "changed by AYON_AFTEREFFECTS_PROXY_CACHE_DIR."
+        )
+    )
+    proxy_workers: int = SettingsField(
+        4,
+        ge=1,
+        title="Proxy workers",
+        description="Count of frames converted in parallel."
+    )
+    proxy_extensions: list[str] = SettingsField(
+        default_factory=list,
+        title="Proxy extensions",
+        description="Proxy is generated only for footage with these."
+    )
+
+
+class AfterEffectsLoadPlugins(BaseSettingsModel):
+    FileLoader: FileLoaderModel = SettingsField(
+        title="Load file",
+        default_factory=FileLoaderModel,
+    )
+
+
+AE_LOAD_PLUGINS_DEFAULTS = {
+    "FileLoader": {
+        "proxy_scale": 0.5,
+        "proxy_format": "jpg",
+        "proxy_location": "local",
+        "proxy_workers": 4,
+        "proxy_extensions": ["exr", "dpx"],
+    }
+}
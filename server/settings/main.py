@@ -2,6 +2,10 @@ from ayon_server.settings import BaseSettingsModel, SettingsField
 
 from .imageio import AfterEffectsImageIOModel
 from .creator_plugins import AfterEffectsCreatorPlugins
+from .load_plugins import (
+    AfterEffectsLoadPlugins,
+    AE_LOAD_PLUGINS_DEFAULTS,
+)
 from .publish_plugins import (
     AfterEffectsPublishPlugins,
     AE_PUBLISH_PLUGINS_DEFAULTS,
@@ -27,12 +31,24 @@ class AfterEffectsSettings(BaseSettingsModel):
         ),
     )
 
+    publish_profiler: bool = SettingsField(
+        False,
+        title="Publish Profiler",
+        description=(
+            "Write per-plugin timings, RPC calls and filesystem calls of "
+            "each publish next to workfile."
+        ),
+    )
+
     imageio: AfterEffectsImageIOModel = SettingsField(
         default_factory=AfterEffectsImageIOModel, title="OCIO config"
     )
     create: AfterEffectsCreatorPlugins = SettingsField(
         default_factory=AfterEffectsCreatorPlugins, title="Creator plugins"
     )
+    load: AfterEffectsLoadPlugins = SettingsField(
+        default_factory=AfterEffectsLoadPlugins, title="Loader plugins"
+    )
     publish: AfterEffectsPublishPlugins = SettingsField(
         default_factory=AfterEffectsPublishPlugins, title="Publish plugins"
     )
@@ -52,6 +68,7 @@ class AfterEffectsSettings(BaseSettingsModel):
 DEFAULT_AFTEREFFECTS_SETTING = {
     "auto_install_extension": True,
     "auto_open_panel": True,
+    "publish_profiler": False,
     "create": {
         "RenderCreator": {
             "mark_for_review": True,
@@ -60,6 +77,7 @@ DEFAULT_AFTEREFFECTS_SETTING = {
             "rename_comp_to_product_name": True,
         }
     },
+    "load": AE_LOAD_PLUGINS_DEFAULTS,
     "publish": AE_PUBLISH_PLUGINS_DEFAULTS,
     "workfile_builder": {
         "create_first_version": False,
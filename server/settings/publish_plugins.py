@@ -22,6 +22,38 @@ class ValidateSceneSettingsModel(BaseSettingsModel):
     )
 
 
+class ExtractLocalRenderModel(BaseSettingsModel):
+    resume: bool = SettingsField(
+        False,
+        title="Resume Failed Render",
+        description=(
+            "Render into stable staging folder and render only frames"
+            " missing after previous failed publish"
+        ),
+    )
+    use_render_cache: bool = SettingsField(
+        False,
+        title="Use Render Cache",
+        description=(
+            "Reuse frames rendered previously from unchanged composition"
+        ),
+    )
+
+
+class ValidateFramesIntegrityModel(BaseSettingsModel):
+    """Check that rendered frames are not empty or truncated"""
+
+    enabled: bool = SettingsField(False, title="Enabled")
+    optional: bool = SettingsField(True, title="Optional")
+    active: bool = SettingsField(True, title="Active")
+    max_workers: int = SettingsField(
+        8,
+        title="Max Parallel Checks",
+        ge=1,
+        description="Count of frames read at the same time",
+    )
+
+
 class AfterEffectsPublishPlugins(BaseSettingsModel):
     CollectReview: CollectReviewPluginModel = SettingsField(
         default_factory=CollectReviewPluginModel,
@@ -31,6 +63,14 @@ class AfterEffectsPublishPlugins(BaseSettingsModel):
         default_factory=ValidateSceneSettingsModel,
         title="Validate Scene Settings",
     )
+    ExtractLocalRender: ExtractLocalRenderModel = SettingsField(
+        default_factory=ExtractLocalRenderModel,
+        title="Extract Local Render",
+    )
+    ValidateFramesIntegrity: ValidateFramesIntegrityModel = SettingsField(
+        default_factory=ValidateFramesIntegrityModel,
+        title="Validate Frames Integrity",
+    )
 
 
 AE_PUBLISH_PLUGINS_DEFAULTS = {
@@ -48,4 +88,14 @@ AE_PUBLISH_PLUGINS_DEFAULTS = {
             ".*"
         ]
     },
+    "ExtractLocalRender": {
+        "resume": False,
+        "use_render_cache": False
+    },
+    "ValidateFramesIntegrity": {
+        "enabled": False,
+        "optional": True,
+        "active": True,
+        "max_workers": 8
+    },
 }
@@ -0,0 +1,42 @@
+"""Make modules of 'ayon_aftereffects' importable in tests.
+
+With 'ayon_core' available (CI checks it out) addon is imported as is and
+integration tests run stub and host against mocked CEP panel from 'tools'.
+
+Without it 'ayon_aftereffects' and 'ayon_aftereffects.api' packages are
+registered only by their paths, their '__init__' imports host integration
+(ayon_core, Qt, websocket server), so only pure modules (standard library,
+'attr', 'clique' and 'ayon_api') are importable and integration tests are
+skipped.
+"""
+import os
+import sys
+import types
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLIENT_DIR = os.path.join(ROOT_DIR, "client")
+TOOLS_DIR = os.path.join(ROOT_DIR, "tools")
+ADDON_DIR = os.path.join(CLIENT_DIR, "ayon_aftereffects")
+
+try:
+    import ayon_core  # noqa: F401
+    HAS_AYON_CORE = True
+except ImportError:
+    HAS_AYON_CORE = False
+
+
+def _register_package(name, path):
+    if name in sys.modules:
+        return
+    module = types.ModuleType(name)
+    module.__path__ = [path]
+    sys.modules[name] = module
+
+
+if HAS_AYON_CORE:
+    sys.path.insert(0, CLIENT_DIR)
+    sys.path.insert(0, TOOLS_DIR)
+else:
+    _register_package("ayon_aftereffects", ADDON_DIR)
+    _register_package(
+        "ayon_aftereffects.api", os.path.join(ADDON_DIR, "api"))
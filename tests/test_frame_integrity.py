@@ -0,0 +1,105 @@
+import struct
+
+import pytest
+
+from ayon_aftereffects.api.frame_integrity import (
+    PNG_SIGNATURE,
+    PNG_IEND,
+    JPEG_SOI,
+    JPEG_EOI,
+    EXR_MAGIC,
+    check_frame_integrity,
+    check_frames_integrity,
+)
+
+PNG = PNG_SIGNATURE + b"\x00" * 16 + PNG_IEND
+JPEG = JPEG_SOI + b"\x00" * 16 + JPEG_EOI
+
+
+def _exr_attribute(name, type_name, value):
+    return (
+        name + b"\x00" + type_name + b"\x00"
+        + struct.pack("<i", len(value)) + value
+    )
+
+
+def _build_exr(lines=32, compression=3):
+    """Single part scanline OpenEXR with dummy pixel data."""
+    header = (
+        EXR_MAGIC
+        + struct.pack("<I", 2)
+        + _exr_attribute(
+            b"dataWindow", b"box2i",
+            struct.pack("<iiii", 0, 0, 9, lines - 1))
+        + _exr_attribute(
+            b"compression", b"compression", bytes([compression]))
+        + b"\x00"
+    )
+    lines_per_chunk = 16 if compression == 3 else 1
+    chunk_count = -(-lines // lines_per_chunk)
+    position = len(header) + chunk_count * 8
+    offsets = []
+    chunks = b""
+    for chunk_idx in range(chunk_count):
+        offsets.append(position + len(chunks))
+        chunks += struct.pack("<ii", chunk_idx * lines_per_chunk, 4) + b"data"
+    return header + struct.pack(f"<{chunk_count}Q", *offsets) + chunks
+
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+@pytest.mark.parametrize("name, content", [
+    ("frame.png", PNG),
+    ("frame.jpg", JPEG),
+    ("frame.jpg", JPEG + b"\x00\x00"),
+    ("frame.exr", _build_exr()),
+    ("frame.exr", _build_exr(lines=3, compression=0)),
+    ("frame.tif", b"unknown format is not checked"),
+])
+def test_valid_frames(tmp_path, name, content):
+    assert check_frame_integrity(_write(tmp_path, name, content)) is None
+
+
+@pytest.mark.parametrize("name, content, problem", [
+    ("frame.png", b"", "empty file"),
+    ("frame.png", PNG[:-4], "missing PNG IEND chunk (truncated)"),
+    ("frame.png", b"x" * 40, "missing PNG signature"),
+    ("frame.jpg", JPEG[:-2], "missing JPEG EOI marker (truncated)"),
+    ("frame.exr", _build_exr()[:-2], "truncated OpenEXR pixel data"),
+    ("frame.exr", _build_exr()[:40], "truncated OpenEXR header"),
+    ("frame.exr", b"\x00" * 16, "missing OpenEXR magic number"),
+])
+def test_damaged_frames(tmp_path, name, content, problem):
+    assert check_frame_integrity(_write(tmp_path, name, content)) == problem
+
+
+def test_missing_file(tmp_path):
+    problem = check_frame_integrity(str(tmp_path / "missing.png"))
+    assert problem.startswith("unreadable")
+
+
+def test_known_size(tmp_path):
+    path = _write(tmp_path, "frame.png", PNG)
+    assert check_frame_integrity(path, size=0) == "empty file"
+    assert check_frame_integrity(path, size=lambda: len(PNG)) is None
+
+
+def test_check_frames_integrity(tmp_path):
+    valid_path = _write(tmp_path, "a.0001.png", PNG)
+    damaged_path = _write(tmp_path, "a.0002.png", PNG[:-4])
+    empty_path = _write(tmp_path, "a.0003.png", PNG)
+
+    problems = check_frames_integrity(
+        [valid_path, damaged_path, empty_path],
+        sizes={empty_path: lambda: 0},
+        max_workers=2
+    )
+    assert problems == {
+        damaged_path: "missing PNG IEND chunk (truncated)",
+        empty_path: "empty file",
+    }
+    assert check_frames_integrity([]) == {}
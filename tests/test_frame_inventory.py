@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+pytest.importorskip("attr")
+pytest.importorskip("clique")
+
+from ayon_aftereffects.api.frame_inventory import (  # noqa: E402
+    FrameInventory,
+    get_missing_frame_ranges,
+)
+
+
+def _write(folder, names):
+    for name in names:
+        with open(os.path.join(folder, name), "wb") as stream:
+            stream.write(b"data")
+
+
+def test_scan_with_pattern(tmp_path):
+    _write(tmp_path, [
+        "sh010_00001.png", "sh010_00002.png", "sh010_00002.exr", "other.png"
+    ])
+    os.mkdir(tmp_path / "sub.png")
+
+    inventory = FrameInventory.scan(
+        str(tmp_path), "png", file_pattern="sh010_[#####].png"
+    )
+    assert inventory.file_names == [
+        "other.png", "sh010_00001.png", "sh010_00002.png"
+    ]
+    assert sorted(inventory.entries_by_frame) == [1, 2]
+    assert "sh010_00002.exr" not in inventory
+    assert len(inventory) == 3
+
+    entry = inventory.get_entry("sh010_00001.png")
+    assert entry.frame == 1
+    assert entry.path == os.path.join(str(tmp_path), "sh010_00001.png")
+    assert entry.size == 4
+    assert entry.get_size() == 4
+    assert entry.mtime > 0
+
+
+def test_scan_without_pattern_uses_trailing_digits(tmp_path):
+    _write(tmp_path, ["a_v001.0010.png"])
+    inventory = FrameInventory.scan(str(tmp_path), "png")
+    assert list(inventory.entries_by_frame) == [10]
+
+
+def test_scan_missing_folder(tmp_path):
+    inventory = FrameInventory.scan(str(tmp_path / "missing"), "png")
+    assert len(inventory) == 0
+
+
+def test_collections_and_remove(tmp_path):
+    _write(tmp_path, ["a.0001.png", "a.0002.png", "stray.png"])
+    inventory = FrameInventory.scan(str(tmp_path), "png")
+
+    collections, remainders = inventory.get_collections_and_remainders()
+    assert len(collections) == 1
+    assert remainders == ["stray.png"]
+
+    removed_path = inventory.remove("stray.png")
+    assert removed_path == os.path.join(str(tmp_path), "stray.png")
+    assert not os.path.exists(removed_path)
+    assert "stray.png" not in inventory
+    assert inventory.remove("stray.png") is None
+    _, remainders = inventory.get_collections_and_remainders()
+    assert remainders == []
+
+
+@pytest.mark.parametrize("existing, expected", [
+    (set(), [[1, 10]]),
+    (set(range(1, 11)), []),
+    ({1, 2, 5, 10}, [[3, 4], [6, 9]]),
+    ({5}, [[1, 4], [6, 10]]),
+    ({0, 11}, [[1, 10]]),
+])
+def test_get_missing_frame_ranges(existing, expected):
+    assert get_missing_frame_ranges(existing, 1, 10) == expected
@@ -0,0 +1,99 @@
+import pytest
+
+pytest.importorskip("attr")
+clique = pytest.importorskip("clique")
+
+from ayon_aftereffects.api.frame_sequence import (  # noqa: E402
+    EXPECTED_SPECS_KEY,
+    ExpectedFiles,
+    FrameSequenceSpec,
+    get_expected_specs,
+)
+
+
+def test_spec_from_render_queue_path():
+    spec = FrameSequenceSpec.from_render_queue_path(
+        "/renders/sh010_[#####].png", 1001, 1003
+    )
+    assert spec.is_sequence
+    assert spec.padding == 5
+    assert spec.directory == "/renders"
+    assert list(spec) == [
+        "/renders/sh010_01001.png",
+        "/renders/sh010_01002.png",
+        "/renders/sh010_01003.png",
+    ]
+    assert len(spec) == 3
+    assert spec[-1] == "/renders/sh010_01003.png"
+    assert str(spec) == "/renders/sh010_[01001-01003].png"
+
+
+def test_single_file_spec():
+    spec = FrameSequenceSpec.from_render_queue_path(
+        "/renders/sh010.mov", 1, 10)
+    assert not spec.is_sequence
+    assert list(spec) == ["/renders/sh010.mov"]
+    assert spec.get_frame("sh010.mov") == 0
+    assert spec.get_missing_names(["sh010.mov"]) == []
+    assert spec.get_missing_names([]) == ["sh010.mov"]
+
+
+def test_spec_matches_names():
+    spec = FrameSequenceSpec.from_render_queue_path(
+        "/renders/sh010_[####].exr", 1, 3
+    )
+    assert spec.get_frame("sh010_0002.exr") == 2
+    assert spec.get_frame("sh010_10000.exr") == 10000
+    assert spec.get_frame("sh010_02.exr") is None
+    assert spec.get_frame("other_0002.exr") is None
+    assert spec.contains_name("sh010_0003.exr")
+    assert not spec.contains_name("sh010_0004.exr")
+    assert spec.get_missing_names(
+        ["sh010_0001.exr", "sh010_0003.exr", "other.exr"]
+    ) == ["sh010_0002.exr"]
+
+
+def test_expected_files_sequence():
+    expected_files = ExpectedFiles([
+        FrameSequenceSpec("/r/a.{frame}.png", 2, 1, 2),
+        FrameSequenceSpec("/r/a.mov"),
+    ])
+    assert len(expected_files) == 3
+    assert expected_files.to_list() == [
+        "/r/a.01.png", "/r/a.02.png", "/r/a.mov"
+    ]
+    assert expected_files[2] == "/r/a.mov"
+    assert expected_files[-3] == "/r/a.01.png"
+    assert expected_files[1:] == ["/r/a.02.png", "/r/a.mov"]
+    with pytest.raises(IndexError):
+        expected_files[3]
+
+
+def test_expected_files_used_as_list():
+    expected_files = ExpectedFiles([
+        FrameSequenceSpec("/r/a.{frame}.png", 4, 1, 100000),
+    ])
+    assert expected_files == ExpectedFiles(list(expected_files.specs))
+    assert expected_files[:2] == ["/r/a.0001.png", "/r/a.0002.png"]
+    assert ExpectedFiles([FrameSequenceSpec("/r/a.mov")]) == ["/r/a.mov"]
+    assert ExpectedFiles([FrameSequenceSpec("/r/a.mov")]) != ["/r/b.mov"]
+
+    collections, remainders = clique.assemble(
+        ExpectedFiles([FrameSequenceSpec("/r/a.{frame}.png", 4, 1, 10)]))
+    assert not remainders
+    assert list(collections[0].indexes) == list(range(1, 11))
+
+
+def test_get_expected_specs():
+    specs = [FrameSequenceSpec("/r/a.{frame}.png", 2, 1, 2)]
+    assert get_expected_specs({
+        EXPECTED_SPECS_KEY: specs,
+        "expectedFiles": ["/r/a.01.png", "/r/a.02.png"],
+    }) is specs
+
+    assert get_expected_specs(
+        {"expectedFiles": ExpectedFiles(specs)}) == specs
+
+    specs = get_expected_specs({"expectedFiles": ["/r/a.mov"]})
+    assert specs == [FrameSequenceSpec("/r/a.mov")]
+    assert get_expected_specs({}) == []
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from ayon_aftereffects.api.metadata_format import (
+    COMPRESSED_PREFIX,
+    COMPRESS_THRESHOLD_ENV,
+    DEFAULT_COMPRESS_THRESHOLD,
+    get_compress_threshold,
+    encode_metadata,
+    decode_metadata,
+    needs_migration,
+)
+
+METADATA = [{"id": "ayon.load.container", "members": [1], "name": "čaj"}]
+
+
+def test_encode_minified():
+    encoded = encode_metadata(METADATA, compress_threshold=0)
+    assert encoded == json.dumps(
+        METADATA, separators=(",", ":"), ensure_ascii=False)
+    assert decode_metadata(encoded) == METADATA
+
+
+def test_encode_compressed_over_threshold():
+    encoded = encode_metadata(METADATA, compress_threshold=10)
+    assert encoded.startswith(COMPRESSED_PREFIX)
+    assert decode_metadata(encoded) == METADATA
+
+
+def test_decode_legacy_pretty_printed():
+    assert decode_metadata(json.dumps(METADATA, indent=4)) == METADATA
+
+
+@pytest.mark.parametrize("value", [
+    "{broken",
+    COMPRESSED_PREFIX + "not base64 zlib",
+])
+def test_decode_broken(value):
+    with pytest.raises(ValueError):
+        decode_metadata(value)
+
+
+def test_compress_threshold_from_env(monkeypatch):
+    monkeypatch.delenv(COMPRESS_THRESHOLD_ENV, raising=False)
+    assert get_compress_threshold() == DEFAULT_COMPRESS_THRESHOLD
+
+    monkeypatch.setenv(COMPRESS_THRESHOLD_ENV, "100")
+    assert get_compress_threshold() == 100
+
+    monkeypatch.setenv(COMPRESS_THRESHOLD_ENV, "-5")
+    assert get_compress_threshold() == 0
+
+    monkeypatch.setenv(COMPRESS_THRESHOLD_ENV, "invalid")
+    assert get_compress_threshold() == DEFAULT_COMPRESS_THRESHOLD
+
+
+def test_needs_migration():
+    current = encode_metadata(METADATA, compress_threshold=0)
+    assert not needs_migration(current, compress_threshold=0)
+    assert needs_migration(json.dumps(METADATA, indent=4), 0)
+    # crossing of threshold requires rewrite
+    assert needs_migration(current, compress_threshold=10)
+
+    assert not needs_migration("", 0)
+    assert not needs_migration("undefined", 0)
+    assert not needs_migration("{broken", 0)
+    assert not needs_migration("{}", 0)
@@ -0,0 +1,151 @@
+import threading
+
+import pytest
+
+ayon_api = pytest.importorskip("ayon_api")
+
+from ayon_aftereffects.api import outdated_containers  # noqa: E402
+from ayon_aftereffects.api.outdated_containers import (  # noqa: E402
+    get_latest_representation_ids,
+    get_outdated_representation_ids,
+    get_outdated_containers,
+    invalidate_outdated_cache,
+    start_outdated_check,
+)
+
+REPRESENTATIONS = {
+    "repre_old": "version_1",
+    "repre_last": "version_2",
+    "repre_hero": "version_hero",
+    "repre_old_mov": "version_1",
+}
+REPRESENTATION_NAMES = {"repre_old_mov": "mov"}
+VERSIONS = {
+    "version_1": {"id": "version_1", "productId": "product", "version": 1},
+    "version_2": {"id": "version_2", "productId": "product", "version": 2},
+    "version_hero": {
+        "id": "version_hero", "productId": "product", "version": -2
+    },
+}
+
+
+@pytest.fixture
+def server_calls(monkeypatch):
+    calls = []
+
+    def get_representations(
+        project_name, representation_ids=None, version_ids=None, fields=None
+    ):
+        calls.append("representations")
+        return [
+            {
+                "id": repre_id,
+                "name": REPRESENTATION_NAMES.get(repre_id, "png"),
+                "versionId": version_id,
+            }
+            for repre_id, version_id in REPRESENTATIONS.items()
+            if (representation_ids and repre_id in representation_ids)
+            or (version_ids and version_id in version_ids)
+        ]
+
+    def get_versions(project_name, version_ids, fields):
+        calls.append("versions")
+        return [VERSIONS[version_id] for version_id in version_ids]
+
+    def get_last_versions(project_name, product_ids, fields):
+        calls.append("last_versions")
+        return {"product": VERSIONS["version_2"]}
+
+    monkeypatch.setattr(
+        ayon_api, "get_representations", get_representations)
+    monkeypatch.setattr(ayon_api, "get_versions", get_versions)
+    monkeypatch.setattr(ayon_api, "get_last_versions", get_last_versions)
+    invalidate_outdated_cache()
+    yield calls
+    invalidate_outdated_cache()
+
+
+def _containers(*repre_ids):
+    return [{"representation": repre_id} for repre_id in repre_ids]
+
+
+def test_outdated_representation_ids(server_calls):
+    assert get_outdated_representation_ids(
+        "project", REPRESENTATIONS
+    ) == {"repre_old", "repre_old_mov"}
+    # single query of each kind
+    assert server_calls == ["representations", "versions", "last_versions"]
+    assert get_outdated_representation_ids("project", []) == set()
+
+
+def test_latest_representation_ids(server_calls):
+    assert get_latest_representation_ids("project", REPRESENTATIONS) == {
+        "repre_old": "repre_last",
+        "repre_last": "repre_last",
+        "repre_hero": "repre_hero",
+    }
+    assert len(server_calls) == 4
+    assert get_latest_representation_ids("project", []) == {}
+
+
+def test_outdated_containers_cached_per_workfile(server_calls):
+    containers = _containers("repre_old", "repre_last")
+    assert get_outdated_containers(
+        containers, "project", "/work/a.aep"
+    ) == containers[:1]
+    assert get_outdated_containers(
+        containers, "project", "/work/a.aep"
+    ) == containers[:1]
+    assert len(server_calls) == 3
+
+    # different set of loaded representations
+    get_outdated_containers(containers[:1], "project", "/work/a.aep")
+    assert len(server_calls) == 6
+
+    invalidate_outdated_cache("/work/a.aep")
+    get_outdated_containers(containers[:1], "project", "/work/a.aep")
+    assert len(server_calls) == 9
+
+    # without workfile nothing is cached
+    get_outdated_containers(containers, "project")
+    get_outdated_containers(containers, "project")
+    assert len(server_calls) == 15
+
+
+def test_outdated_cache_expires(server_calls, monkeypatch):
+    containers = _containers("repre_old")
+    get_outdated_containers(containers, "project", "/work/a.aep")
+    monkeypatch.setattr(outdated_containers, "OUTDATED_CACHE_TTL", 0)
+    get_outdated_containers(containers, "project", "/work/a.aep")
+    assert len(server_calls) == 6
+
+
+def test_start_outdated_check(server_calls):
+    result = []
+    finished = threading.Event()
+
+    def callback(outdated):
+        result.extend(outdated)
+        finished.set()
+
+    thread = start_outdated_check(
+        lambda: _containers("repre_old", "repre_hero"),
+        lambda: None,
+        callback,
+        "project"
+    )
+    thread.join(5)
+    assert finished.is_set()
+    assert result == _containers("repre_old")
+
+
+def test_failed_check_does_not_call_callback(server_calls):
+    def list_containers():
+        raise RuntimeError("AE is not connected")
+
+    callback_calls = []
+    thread = start_outdated_check(
+        list_containers, lambda: None, callback_calls.append, "project"
+    )
+    thread.join(5)
+    assert callback_calls == []
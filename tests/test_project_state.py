@@ -0,0 +1,134 @@
+from ayon_aftereffects.api.project_state import (
+    ProjectStateCache,
+    MetadataIndex,
+    get_imprint_patch,
+    get_remove_instance_patch,
+    apply_metadata_patches,
+)
+
+CONTAINER = {"id": "ayon.load.container", "members": [1], "name": "a"}
+INSTANCE = {"instance_id": "inst", "members": [2], "productName": "b"}
+LEGACY_INSTANCE = {"uuid": "legacy", "members": [3]}
+PLACEHOLDER = {"is_placeholder": True, "uuid": "ph", "members": [4]}
+
+
+def test_cache_validation_by_generation():
+    cache = ProjectStateCache()
+    metadata = [CONTAINER]
+    cache.validate("1")
+    cache.set_metadata(metadata)
+    assert cache.get_metadata() is metadata
+
+    cache.validate("1")
+    assert cache.get_metadata() is metadata
+
+    cache.validate("2")
+    assert cache.get_metadata() is None
+
+
+def test_cache_without_generation_stores_nothing():
+    cache = ProjectStateCache()
+    cache.validate(None)
+    cache.set_metadata([CONTAINER])
+    assert cache.get_metadata() is None
+
+
+def test_items_cached_only_inside_hold():
+    cache = ProjectStateCache()
+    cache.validate("1")
+    cache.set_items("comps", ["comp"])
+    assert cache.get_items("comps") is None
+
+    with cache.hold():
+        assert not cache.needs_validation()
+        cache.set_items("comps", ["comp"])
+        assert cache.get_items("comps") == ["comp"]
+    assert cache.needs_validation()
+    assert cache.get_items("comps") is None
+
+
+def test_update_metadata_keeps_items():
+    cache = ProjectStateCache()
+    cache.validate("1")
+    with cache.hold():
+        cache.set_items("comps", ["comp"])
+        cache.update_metadata("2", [INSTANCE])
+        assert cache.generation == "2"
+        assert cache.get_metadata() == [INSTANCE]
+        assert cache.get_items("comps") == ["comp"]
+
+        cache.update_metadata(None, [INSTANCE])
+        assert cache.get_metadata() is None
+        assert cache.get_items("comps") is None
+
+
+def test_disabled_cache():
+    cache = ProjectStateCache()
+    cache.validate("1")
+    cache.set_metadata([CONTAINER])
+    cache.disable()
+
+    assert cache.is_disabled
+    assert not cache.needs_validation()
+    assert cache.get_metadata() is None
+    cache.validate("1")
+    cache.set_metadata([CONTAINER])
+    assert cache.get_metadata() is None
+    cache.update_metadata("2", [CONTAINER])
+    assert cache.get_metadata() is None
+
+
+def test_metadata_index_lookups():
+    metadata = [CONTAINER, INSTANCE, LEGACY_INSTANCE, PLACEHOLDER]
+    index = MetadataIndex(metadata)
+
+    assert index.get_container(1) == CONTAINER
+    assert index.get_container("1") == CONTAINER
+    assert index.get_container(2) is None
+    assert index.get_instance("inst") == INSTANCE
+    assert index.get_placeholder("ph") == PLACEHOLDER
+    assert index.get_placeholder("p") is None
+    assert index.get_item_positions(2) == [1]
+    assert index.get_item_positions("inst") == [1]
+    assert index.get_instance_positions("legacy") == [2]
+
+
+def test_metadata_index_returns_copies():
+    metadata = [CONTAINER]
+    index = MetadataIndex(metadata)
+    container = index.get_container(1)
+    container["members"].append(10)
+    assert CONTAINER["members"] == [1]
+
+
+def test_apply_patches_updates_and_adds():
+    metadata = [CONTAINER, INSTANCE]
+    result = apply_metadata_patches(metadata, [
+        get_imprint_patch(1, {"name": "changed"}),
+        get_imprint_patch(5, {"members": [5], "name": "new"}),
+    ])
+
+    assert result == [
+        dict(CONTAINER, name="changed"),
+        INSTANCE,
+        {"members": [5], "name": "new"},
+    ]
+    # input is not modified, unchanged entries are shared
+    assert metadata == [CONTAINER, INSTANCE]
+    assert result[1] is INSTANCE
+
+
+def test_apply_patches_removes():
+    metadata = [CONTAINER, INSTANCE, LEGACY_INSTANCE]
+    result = apply_metadata_patches(metadata, [
+        get_imprint_patch(1, {}),
+        get_remove_instance_patch("legacy"),
+    ])
+    assert result == [INSTANCE]
+
+
+def test_apply_patches_matches_instance_id():
+    result = apply_metadata_patches(
+        [INSTANCE], [get_imprint_patch("inst", {"active": False})]
+    )
+    assert result == [dict(INSTANCE, active=False)]
@@ -0,0 +1,150 @@
+import os
+import time
+
+from ayon_aftereffects.api.render_cache import (
+    MANIFEST_NAME,
+    RENDER_CACHE_MAX_AGE_ENV,
+    RENDER_CACHE_MAX_SIZE_ENV,
+    RenderCache,
+    get_footage_state,
+    get_render_cache_key,
+    get_render_cache_max_age,
+    get_render_cache_max_size,
+)
+
+
+def _fingerprint(**kwargs):
+    fingerprint = {
+        "layers": "comp|1\nlayer|1|Solid",
+        "uncacheable": False,
+        "render_settings": {"Quality": "Best"},
+        "output_modules": [{"Format": "PNG"}],
+        "footage": [],
+    }
+    fingerprint.update(kwargs)
+    return fingerprint
+
+
+def _write_frames(folder, names, size=100):
+    os.makedirs(folder, exist_ok=True)
+    for name in names:
+        with open(os.path.join(folder, name), "wb") as stream:
+            stream.write(b"x" * size)
+
+
+def test_cache_key_changes_with_state():
+    key = get_render_cache_key(_fingerprint(), 1, 10)
+    assert key == get_render_cache_key(_fingerprint(), 1, 10)
+    assert key != get_render_cache_key(_fingerprint(), 1, 11)
+    assert key != get_render_cache_key(
+        _fingerprint(layers="comp|1\nlayer|1|Changed"), 1, 10)
+    assert key != get_render_cache_key(
+        _fingerprint(render_settings={"Quality": "Draft"}), 1, 10)
+
+
+def test_cache_key_changes_with_output_names():
+    key = get_render_cache_key(_fingerprint(), 1, 10, ["sh010_[####].png"])
+    assert key == get_render_cache_key(
+        _fingerprint(), 1, 10, ["sh010_[####].png"])
+    assert key != get_render_cache_key(
+        _fingerprint(), 1, 10, ["sh020_[####].png"])
+    assert key != get_render_cache_key(
+        _fingerprint(), 1, 10, ["sh010_[####].jpg"])
+    assert key != get_render_cache_key(
+        _fingerprint(), 1, 10, ["sh010_[#####].png"])
+
+
+def test_uncacheable_composition_has_no_key():
+    assert get_render_cache_key(_fingerprint(uncacheable=True), 1, 10) is None
+
+
+def test_cache_key_of_footage(tmp_path):
+    footage_path = str(tmp_path / "plate.mov")
+    _write_frames(str(tmp_path), ["plate.mov"])
+    footage = [{"id": 1, "path": footage_path, "is_sequence": False}]
+
+    key = get_render_cache_key(_fingerprint(footage=footage), 1, 10)
+    assert key is not None
+
+    _write_frames(str(tmp_path), ["plate.mov"], size=200)
+    assert key != get_render_cache_key(_fingerprint(footage=footage), 1, 10)
+
+    os.remove(footage_path)
+    assert get_render_cache_key(_fingerprint(footage=footage), 1, 10) is None
+
+
+def test_footage_state_of_sequence(tmp_path):
+    _write_frames(str(tmp_path), ["a.0001.exr", "a.0002.exr", "a.txt"])
+    state = get_footage_state({
+        "path": str(tmp_path / "a.0001.exr"), "is_sequence": True
+    })
+    assert state[:2] == [2, 200]
+    assert get_footage_state({"path": None}) is None
+
+
+def test_store_and_restore(tmp_path):
+    staging_dir = str(tmp_path / "staging")
+    names = ["a.0001.png", "a.0002.png"]
+    _write_frames(staging_dir, names)
+    cache = RenderCache(str(tmp_path / "cache"), max_size=10 ** 6,
+                        max_age=3600)
+
+    assert cache.restore("abcd", staging_dir) is None
+    entry_dir = cache.store("abcd", staging_dir, names)
+    assert entry_dir == os.path.join(str(tmp_path / "cache"), "ab", "abcd")
+    assert cache.get_file_names("abcd") == names
+
+    restore_dir = str(tmp_path / "restored")
+    assert cache.restore("abcd", restore_dir) == names
+    assert sorted(os.listdir(restore_dir)) == names
+
+
+def test_prune_by_age(tmp_path):
+    staging_dir = str(tmp_path / "staging")
+    _write_frames(staging_dir, ["a.png"])
+    cache = RenderCache(str(tmp_path / "cache"), max_size=10 ** 6,
+                        max_age=3600)
+    cache.store("aa01", staging_dir, ["a.png"])
+    old_time = time.time() - 7200
+    os.utime(
+        os.path.join(cache.get_entry_dir("aa01"), MANIFEST_NAME),
+        (old_time, old_time)
+    )
+
+    cache.store("bb02", staging_dir, ["a.png"])
+    assert cache.get_file_names("aa01") is None
+    assert not os.path.exists(cache.get_entry_dir("aa01"))
+    assert cache.get_file_names("bb02") == ["a.png"]
+
+
+def test_prune_least_recently_used_by_size(tmp_path):
+    staging_dir = str(tmp_path / "staging")
+    _write_frames(staging_dir, ["a.png"], size=1000)
+    # two entries fit (including manifests)
+    cache = RenderCache(str(tmp_path / "cache"), max_size=2500,
+                        max_age=3600)
+    for idx, key in enumerate(("aa01", "bb02")):
+        cache.store(key, staging_dir, ["a.png"])
+        used_time = time.time() - 100 + idx
+        os.utime(
+            os.path.join(cache.get_entry_dir(key), MANIFEST_NAME),
+            (used_time, used_time)
+        )
+    # restore marks older entry as recently used
+    cache.restore("aa01", str(tmp_path / "restored"))
+
+    cache.store("cc03", staging_dir, ["a.png"])
+    assert cache.get_file_names("aa01") == ["a.png"]
+    assert cache.get_file_names("bb02") is None
+    assert cache.get_file_names("cc03") == ["a.png"]
+
+
+def test_limits_from_env(monkeypatch):
+    monkeypatch.setenv(RENDER_CACHE_MAX_SIZE_ENV, "0.5")
+    monkeypatch.setenv(RENDER_CACHE_MAX_AGE_ENV, "2")
+    assert get_render_cache_max_size() == 512 * 1024 ** 2
+    assert get_render_cache_max_age() == 2 * 24 * 3600
+
+    monkeypatch.setenv(RENDER_CACHE_MAX_AGE_ENV, "invalid")
+    cache = RenderCache("root")
+    assert cache.max_age == get_render_cache_max_age() == 14 * 24 * 3600
@@ -0,0 +1,87 @@
+import json
+
+from ayon_aftereffects.api.rpc_stats import (
+    LATENCY_BUCKETS_MS,
+    SLOW_CALL_ENV,
+    STATS_PATH_ENV,
+    RPCStats,
+    get_payload_size,
+    get_slow_call_threshold,
+)
+
+
+def _create_stats(monkeypatch, slow_call_ms="0", stats_path=None):
+    monkeypatch.setenv(SLOW_CALL_ENV, slow_call_ms)
+    if stats_path:
+        monkeypatch.setenv(STATS_PATH_ENV, stats_path)
+    else:
+        monkeypatch.delenv(STATS_PATH_ENV, raising=False)
+    return RPCStats()
+
+
+def test_payload_size():
+    assert get_payload_size(None) == 0
+    assert get_payload_size("čaj") == 4
+    assert get_payload_size({"a": 1}) == len('{"a": 1}')
+    assert get_payload_size({"a": object()}) > 0
+
+
+def test_slow_call_threshold(monkeypatch):
+    monkeypatch.setenv(SLOW_CALL_ENV, "150")
+    assert get_slow_call_threshold() == 150
+    monkeypatch.setenv(SLOW_CALL_ENV, "invalid")
+    assert get_slow_call_threshold() == 2000
+
+
+def test_record_aggregates(monkeypatch):
+    stats = _create_stats(monkeypatch)
+    stats.record("AfterEffects.get_items", 3.0)
+    stats.record("AfterEffects.get_items", 30000.0, retries=2, failed=True)
+
+    method_stats = stats.get_stats()["methods"]["AfterEffects.get_items"]
+    assert method_stats["count"] == 2
+    assert method_stats["errors"] == 1
+    assert method_stats["retries"] == 2
+    assert method_stats["min_ms"] == 3.0
+    assert method_stats["max_ms"] == 30000.0
+    assert method_stats["avg_ms"] == 15001.5
+    histogram = method_stats["histogram"]
+    assert histogram["<={}ms".format(LATENCY_BUCKETS_MS[0])] == 1
+    assert histogram[">{}ms".format(LATENCY_BUCKETS_MS[-1])] == 1
+
+
+def test_payloads_measured_only_when_enabled(monkeypatch):
+    stats = _create_stats(monkeypatch)
+    stats.record("route", 1.0, request={"a": 1}, response="abc")
+    method_stats = stats.get_stats()["methods"]["route"]
+    assert method_stats["measured_calls"] == 0
+    assert method_stats["request_bytes"] is None
+    assert method_stats["response_bytes"] is None
+
+    stats.measure_payloads = True
+    stats.record("route", 1.0, request={"a": 1}, response="abc")
+    method_stats = stats.get_stats()["methods"]["route"]
+    assert method_stats["count"] == 2
+    assert method_stats["measured_calls"] == 1
+    assert method_stats["request_bytes"] == len('{"a": 1}')
+    assert method_stats["response_bytes"] == 3
+
+
+def test_slow_call_measures_payloads(monkeypatch):
+    stats = _create_stats(monkeypatch, slow_call_ms="10")
+    stats.record("route", 50.0, request="abcd")
+    assert stats.get_stats()["methods"]["route"]["request_bytes"] == 4
+
+
+def test_dump(monkeypatch, tmp_path):
+    path = str(tmp_path / "stats" / "rpc.json")
+    stats = _create_stats(monkeypatch, stats_path=path)
+    assert stats.measure_payloads
+    stats.record("route", 1.0)
+
+    assert stats.dump() == path
+    with open(path) as stream:
+        assert json.load(stream)["methods"]["route"]["count"] == 1
+
+    stats.reset()
+    assert stats.get_stats()["methods"] == {}
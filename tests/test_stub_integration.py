@@ -0,0 +1,354 @@
+"""Stub and host integration against mocked CEP panel from 'tools'."""
+import os
+import json
+import time
+import importlib.util
+
+import pytest
+
+pytest.importorskip("ayon_core")
+pytest.importorskip("qtpy.QtWidgets")
+
+from mock_cep_client import (  # noqa: E402
+    MockCEPClient,
+    SyntheticProject,
+    mock_client_connected,
+)
+
+
+def _load_plugin_module(*parts):
+    from ayon_aftereffects import AFTEREFFECTS_ADDON_ROOT
+
+    path = os.path.join(AFTEREFFECTS_ADDON_ROOT, "plugins", *parts)
+    module_name = os.path.splitext(parts[-1])[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _get_file_loader():
+    module = _load_plugin_module("load", "load_file.py")
+
+    class FileLoader(module.FileLoader):
+        def filepath_from_context(self, context):
+            return context["representation"]["attrib"]["path"]
+
+    return FileLoader
+
+
+def _get_representation_context(idx):
+    return {
+        "folder": {"name": f"shot_{idx}"},
+        "product": {"name": "imageMain"},
+        "version": {"id": f"version_{idx}"},
+        "representation": {
+            "id": f"representation_{idx}",
+            "files": [{}],
+            "attrib": {"path": f"/synthetic/load/image_{idx}.png"},
+        },
+    }
+
+
+@pytest.fixture
+def client():
+    project = SyntheticProject.build(comps=5, footages=20, folders=2)
+    mock_client = MockCEPClient(project)
+    with mock_client_connected(mock_client):
+        yield mock_client
+
+
+def test_get_items_honors_fields(client):
+    from ayon_aftereffects.api import get_stub
+
+    items = get_stub().get_items(comps=True, footages=True, fields=["id"])
+
+    assert len(items) == 25
+    assert all(item.id for item in items)
+    assert all(item.name is None for item in items)
+
+
+def test_ls_fills_object_name(client):
+    from ayon_aftereffects.api.pipeline import ls
+
+    containers = list(ls())
+
+    assert len(containers) == 20
+    for container in containers:
+        assert container["objectName"]
+        assert container["objectName"].startswith("folder_")
+
+
+def test_list_instances(client):
+    from ayon_aftereffects.api.pipeline import AfterEffectsHost
+
+    instances = AfterEffectsHost().list_instances()
+
+    assert len(instances) == 5
+    assert {instance["creator_identifier"] for instance in instances} == {
+        "render"
+    }
+
+
+def test_imprint_round_trip(client):
+    from ayon_aftereffects.api import get_stub
+
+    stub = get_stub()
+    instance = next(
+        item for item in stub.get_metadata() if item.get("instance_id")
+    )
+    stub.imprint(instance["instance_id"], {**instance, "active": False})
+    imprint_calls = len(client.calls)
+
+    # patched cache answers read, value was written to mocked panel
+    metadata = stub.get_metadata()
+    stub.invalidate_project_state()
+    stored = stub.get_metadata()
+
+    for items in (metadata, stored):
+        imprinted = next(
+            item for item in items
+            if item.get("instance_id") == instance["instance_id"]
+        )
+        assert imprinted["active"] is False
+    assert "AfterEffects.get_metadata" in client.calls[imprint_calls:]
+
+
+def test_benchmark_reports_failed_scenario(monkeypatch):
+    import benchmark_rpc
+
+    def scenario_broken(client):
+        raise RuntimeError("broken scenario")
+
+    monkeypatch.setitem(benchmark_rpc.SCENARIOS, "broken", scenario_broken)
+    results = benchmark_rpc.run_benchmark(
+        [10], ["ls", "list_instances", "imprint", "load_file", "broken"],
+        repeat=1, latency=0.0, metadata_padding=0,
+    )
+
+    assert benchmark_rpc.get_failed_scenarios(results) == ["broken[10]"]
+    assert "broken scenario" in results["broken[10]"]["error"]
+    assert results["ls[10]"]["rpc_calls"] > 0
+    assert benchmark_rpc.compare_with_baseline(
+        results, {"broken[10]": {"median_s": 0.0}}, 1.5) == []
+
+
+def test_load_many_imports_in_single_round_trip(client):
+    from ayon_aftereffects.api.pipeline import ls
+
+    contexts = [_get_representation_context(idx) for idx in range(4)]
+    calls_before = len(client.calls)
+
+    loaded_items = _get_file_loader()().load_many(contexts)
+
+    calls = client.calls[calls_before:]
+    assert all(loaded_items)
+    assert calls.count("AfterEffects.batch") == 1
+    assert "AfterEffects.import_file" not in calls
+    assert len(list(ls())) == 24
+
+
+def test_files_loader_loads_selected_products(client, monkeypatch):
+    module = _load_plugin_module("load", "load_files.py")
+    contexts_by_repre_id = {}
+    representations = []
+    for idx in range(3):
+        context = _get_representation_context(idx)
+        contexts_by_repre_id[context["representation"]["id"]] = context
+        for repre_name in ("thumbnail", "png", "exr"):
+            representations.append({
+                "id": f"{repre_name}_{idx}",
+                "name": repre_name,
+                "versionId": f"version_{idx}",
+            })
+            if repre_name == "exr":
+                representations[-1]["id"] = context["representation"]["id"]
+
+    monkeypatch.setattr(
+        module.ayon_api, "get_representations",
+        lambda *args, **kwargs: iter(representations)
+    )
+    monkeypatch.setattr(
+        module, "get_representation_contexts_by_ids",
+        lambda project_name, repre_ids: {
+            repre_id: contexts_by_repre_id[repre_id]
+            for repre_id in repre_ids
+        }
+    )
+    monkeypatch.setattr(
+        module, "discover_loader_plugins",
+        lambda project_name: [_get_file_loader()]
+    )
+    version_contexts = [
+        {
+            "project": {"name": "synthetic"},
+            "version": {"id": f"version_{idx}"},
+        }
+        for idx in range(3)
+    ]
+    calls_before = len(client.calls)
+
+    loaded_items = module.FilesLoader().load(version_contexts)
+
+    assert len(loaded_items) == 3
+    assert all(loaded_items)
+    assert client.calls[calls_before:].count("AfterEffects.batch") == 1
+
+
+def _publish_background(root, version, hashes):
+    version_dir = root / f"v{version:03d}"
+    version_dir.mkdir()
+    files = []
+    children = []
+    for layer_name, file_hash in hashes.items():
+        file_name = f"{layer_name}.png"
+        (version_dir / file_name).write_bytes(b"png")
+        files.append({"name": file_name, "hash": file_hash})
+        children.append({"filename": file_name})
+    json_path = version_dir / "background.json"
+    json_path.write_text(json.dumps({"children": children}))
+    return {
+        "folder": {"name": "shot"},
+        "product": {"name": "backgroundMain"},
+        "representation": {
+            "id": f"representation_{version}",
+            "files": files,
+            "path": json_path.as_posix(),
+        },
+    }
+
+
+def test_background_update_repaths_unchanged_layers(
+    client, tmp_path, monkeypatch
+):
+    from ayon_aftereffects.api import get_stub
+    from ayon_aftereffects.api.pipeline import ls
+
+    module = _load_plugin_module("load", "load_background.py")
+    monkeypatch.setattr(
+        module, "get_representation_path",
+        lambda repre_entity: repre_entity["path"]
+    )
+
+    class BackgroundLoader(module.BackgroundLoader):
+        def filepath_from_context(self, context):
+            return context["representation"]["path"]
+
+    first = _publish_background(
+        tmp_path, 1, {"sky": "a", "ground": "b", "tree": "c"})
+    second = _publish_background(
+        tmp_path, 2, {"sky": "a", "ground": "b", "tree": "changed"})
+
+    loader = BackgroundLoader()
+    loader.load(first, "backgroundMain", "shot_backgroundMain")
+    container = next(
+        container for container in ls()
+        if container["loader"] == "BackgroundLoader"
+    )
+    calls_before = len(client.calls)
+
+    loader.update(container, second)
+
+    calls = client.calls[calls_before:]
+    assert calls.count("AfterEffects.reload_background") == 1
+    # both unchanged layers are repathed with single batch
+    assert calls.count("AfterEffects.batch") == 1
+
+    container = next(
+        container for container in ls()
+        if container["loader"] == "BackgroundLoader"
+    )
+    footages = get_stub().get_items(
+        comps=False, footages=True, ids=container["members"][2:]
+    )
+    assert len(footages) == 3
+    for footage in footages:
+        assert footage.path.startswith((tmp_path / "v002").as_posix())
+    assert container["representation"] == "representation_2"
+
+
+def test_update_containers_to_latest_grouped(client, monkeypatch):
+    from ayon_aftereffects.api import pipeline
+
+    loader = _get_file_loader()
+    loader().load_many(
+        [_get_representation_context(idx) for idx in range(3)])
+    containers = [
+        container for container in pipeline.ls()
+        if container["representation"].startswith("representation_")
+    ]
+    latest_contexts = {}
+    for idx in range(3):
+        context = _get_representation_context(idx)
+        context["representation"]["id"] = f"latest_{idx}"
+        context["representation"]["attrib"]["path"] = (
+            f"/synthetic/load/v002/image_{idx}.png")
+        latest_contexts[f"latest_{idx}"] = context
+
+    monkeypatch.setattr(
+        pipeline, "get_latest_representation_ids",
+        lambda project_name, repre_ids: {
+            repre_id: repre_id.replace("representation_", "latest_")
+            for repre_id in repre_ids
+        }
+    )
+    monkeypatch.setattr(
+        pipeline, "get_representation_contexts_by_ids",
+        lambda project_name, repre_ids: {
+            repre_id: latest_contexts[repre_id] for repre_id in repre_ids
+        }
+    )
+    monkeypatch.setattr(
+        pipeline, "discover_loader_plugins", lambda project_name: [loader]
+    )
+    calls_before = len(client.calls)
+
+    assert pipeline.update_containers_to_latest(containers) == []
+
+    calls = client.calls[calls_before:]
+    # replace of all items in one batch, metadata written once
+    assert calls.count("AfterEffects.batch") == 1
+    assert calls.count("AfterEffects.imprint_patches") == 1
+    repre_ids = {container["representation"] for container in pipeline.ls()}
+    assert {"latest_0", "latest_1", "latest_2"} <= repre_ids
+    assert not any(
+        repre_id.startswith("representation_") for repre_id in repre_ids)
+
+
+def test_ls_concurrently_matches_ls(client):
+    from ayon_aftereffects.api.pipeline import ls, ls_concurrently
+
+    calls_before = len(client.calls)
+    containers = ls_concurrently()
+
+    calls = client.calls[calls_before:]
+    assert sorted(calls) == [
+        "AfterEffects.get_items", "AfterEffects.get_metadata"
+    ]
+    assert [
+        (container["objectName"], container["representation"])
+        for container in containers
+    ] == [
+        (container["objectName"], container["representation"])
+        for container in ls()
+    ]
+
+
+def test_async_stub_queries_run_concurrently(client):
+    from ayon_aftereffects.api import get_async_stub
+
+    async_stub = get_async_stub()
+    client.latency = 0.3
+    start = time.perf_counter()
+    metadata, items, name = async_stub.run(async_stub.gather(
+        async_stub.get_metadata(),
+        async_stub.get_items(comps=True, fields=["id"]),
+        async_stub.get_active_document_name(),
+    ))
+    duration = time.perf_counter() - start
+
+    assert len(metadata) == 25
+    assert len(items) == 5
+    assert name == "project.aep"
+    # sequential calls would take at least 0.9s
+    assert duration < 0.75
@@ -0,0 +1,264 @@
+"""Benchmark of RPC heavy code paths against mocked After Effects.
+
+Drives 'ls()', 'AfterEffectsHost.list_instances', 'imprint',
+'CollectAERender.get_instances' and 'FileLoader.load' against synthetic
+projects of multiple sizes served by 'MockCEPClient'.
+
+Requires same environment as addon itself (ayon_core, pyblish,
+wsrpc_aiohttp), After Effects is not needed.
+
+Usage:
+    python tools/benchmark_rpc.py --sizes 100 1000 10000 --output out.json
+    python tools/benchmark_rpc.py --baseline out.json --tolerance 1.5
+
+Exit code is 1 if any scenario failed or, with '--baseline', if any
+scenario is slower than baseline multiplied by tolerance, so it could be
+used to catch regressions on CI.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import traceback
+import statistics
+import importlib.util
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+CLIENT_DIR = os.path.join(os.path.dirname(CURRENT_DIR), "client")
+sys.path.insert(0, CLIENT_DIR)
+sys.path.insert(0, CURRENT_DIR)
+
+import pyblish.api  # noqa: E402
+
+from ayon_aftereffects import AFTEREFFECTS_ADDON_ROOT  # noqa: E402
+from ayon_aftereffects.api import ls, get_stub  # noqa: E402
+from ayon_aftereffects.api.pipeline import AfterEffectsHost  # noqa: E402
+
+from mock_cep_client import (  # noqa: E402
+    SyntheticProject,
+    MockCEPClient,
+    mock_client_connected,
+)
+
+
+def _load_plugin_module(*parts):
+    path = os.path.join(AFTEREFFECTS_ADDON_ROOT, "plugins", *parts)
+    module_name = os.path.splitext(parts[-1])[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _build_project(size, metadata_padding):
+    """Project with 'size' footages, tenth of them are compositions."""
+    return SyntheticProject.build(
+        comps=max(size // 10, 1),
+        footages=size,
+        metadata_padding=metadata_padding,
+    )
+
+
+def scenario_ls(client):
+    get_stub().invalidate_project_state()
+    return lambda: list(ls())
+
+
+def scenario_list_instances(client):
+    host = AfterEffectsHost()
+    get_stub().invalidate_project_state()
+    return host.list_instances
+
+
+def scenario_imprint(client):
+    stub = get_stub()
+    instance = next(
+        item for item in stub.get_metadata() if item.get("instance_id")
+    )
+
+    def run():
+        stub.imprint(instance["instance_id"], {"active": True})
+    return run
+
+
+def scenario_collect_render(client):
+    module = _load_plugin_module("publish", "collect_render.py")
+    host = AfterEffectsHost()
+    context = pyblish.api.Context()
+    context.data.update({
+        "currentFile": client.project.path,
+        "version": 1,
+        "projectEntity": {"name": "synthetic"},
+    })
+    for instance_data in host.list_instances():
+        instance = context.create_instance(instance_data["productName"])
+        instance.data.update(instance_data)
+
+    plugin = module.CollectAERender()
+    module.CollectAERender._stub = None
+    return lambda: plugin.get_instances(context)
+
+
+def scenario_load_file(client):
+    module = _load_plugin_module("load", "load_file.py")
+
+    class BenchmarkFileLoader(module.FileLoader):
+        def filepath_from_context(self, context):
+            return context["representation"]["attrib"]["path"]
+
+    loader = BenchmarkFileLoader()
+    counter = iter(range(sys.maxsize))
+
+    def run():
+        idx = next(counter)
+        context = {
+            "folder": {"name": f"bench_{idx}"},
+            "representation": {
+                "id": f"representation_{idx}",
+                "files": [{}],
+                "attrib": {"path": f"/synthetic/load/image_{idx}.png"},
+            },
+        }
+        loader.load(context, "imageMain")
+    return run
+
+
+SCENARIOS = {
+    "ls": scenario_ls,
+    "list_instances": scenario_list_instances,
+    "imprint": scenario_imprint,
+    "collect_render": scenario_collect_render,
+    "load_file": scenario_load_file,
+}
+
+
+def _run_scenario(scenario_name, client, repeat):
+    with mock_client_connected(client):
+        func = SCENARIOS[scenario_name](client)
+        timings = []
+        calls = []
+        for _ in range(repeat):
+            calls_before = len(client.calls)
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+            calls.append(len(client.calls) - calls_before)
+    return {
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "rpc_calls": max(calls),
+    }
+
+
+def run_benchmark(sizes, scenario_names, repeat, latency, metadata_padding):
+    """Run scenarios for each size.
+
+    Failed scenario does not stop the run, its result contains only
+        'error' with formatted traceback.
+
+    Returns:
+        dict[str, dict[str, Any]]: result by 'scenario[size]' key
+    """
+    results = {}
+    for size in sizes:
+        for scenario_name in scenario_names:
+            project = _build_project(size, metadata_padding)
+            client = MockCEPClient(project, latency=latency)
+            key = f"{scenario_name}[{size}]"
+            try:
+                result = _run_scenario(scenario_name, client, repeat)
+            except Exception:
+                error = traceback.format_exc()
+                results[key] = {"error": error}
+                print(f"{key:<28} FAILED")
+                print(error)
+                continue
+
+            results[key] = result
+            print("{:<28} min {:>9.4f}s  median {:>9.4f}s  calls {:>6}".format(
+                key,
+                result["min_s"],
+                result["median_s"],
+                result["rpc_calls"],
+            ))
+    return results
+
+
+def get_failed_scenarios(results):
+    """Returns keys of scenarios which raised an error."""
+    return [key for key, result in results.items() if "error" in result]
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Returns list of messages about regressed scenarios."""
+    regressions = []
+    for key, result in results.items():
+        baseline_result = baseline.get(key)
+        if (
+            not baseline_result
+            or "error" in result
+            or "error" in baseline_result
+        ):
+            continue
+        limit = baseline_result["median_s"] * tolerance
+        if result["median_s"] > limit:
+            regressions.append(
+                f"{key}: {result['median_s']:.4f}s > {limit:.4f}s"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=sorted(SCENARIOS),
+        default=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--latency", type=float, default=0.0,
+        help="seconds added to each RPC call")
+    parser.add_argument(
+        "--metadata-padding", type=int, default=0,
+        help="characters added to each metadata entry")
+    parser.add_argument("--output", help="write results to JSON file")
+    parser.add_argument("--baseline", help="JSON file with previous results")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        args.sizes,
+        args.scenarios,
+        args.repeat,
+        args.latency,
+        args.metadata_padding,
+    )
+    if args.output:
+        with open(args.output, "w") as stream:
+            json.dump(results, stream, indent=4)
+
+    exit_code = 0
+    failed = get_failed_scenarios(results)
+    if failed:
+        print("Failed scenarios:")
+        for key in failed:
+            print("    " + key)
+        exit_code = 1
+
+    if args.baseline:
+        with open(args.baseline, "r") as stream:
+            baseline = json.load(stream)
+        regressions = compare_with_baseline(
+            results, baseline, args.tolerance)
+        if regressions:
+            print("Performance regressions:")
+            for message in regressions:
+                print("    " + message)
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
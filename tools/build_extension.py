@@ -0,0 +1,254 @@
+"""Build signed 'extension.zxp' from sources of CEP panel.
+
+Produces same package as 'ZXPSignCmd -sign' (see README): zip of extension
+folder with 'mimetype' and 'META-INF/signatures.xml', which contains sha256
+digest of each file signed by RSA-SHA1 XML signature. Signing is done by
+'openssl', so it runs on any platform without Adobe tools.
+
+Self signed certificate is created for each build if '--key' and '--cert'
+are not provided, same as 'ZXPSignCmd -selfSignedCert', that is enough for
+auto install of the extension.
+
+Usage:
+    python tools/build_extension.py
+    python tools/build_extension.py --key key.pem --cert cert.pem
+
+!!! Bump 'ExtensionBundleVersion' in 'CSXS/manifest.xml' before build,
+otherwise already installed extension won't be updated.
+"""
+import os
+import sys
+import base64
+import shutil
+import hashlib
+import zipfile
+import argparse
+import tempfile
+import subprocess
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.join(
+    os.path.dirname(CURRENT_DIR), "client", "ayon_aftereffects", "api"
+)
+EXTENSION_DIR = os.path.join(API_DIR, "extension")
+ZXP_PATH = os.path.join(API_DIR, "extension.zxp")
+
+MIMETYPE = b"application/vnd.adobe.air-ucf-package+zip"
+SIGNATURES_PATH = "META-INF/signatures.xml"
+SELF_SIGNED_SUBJECT = "/C=NA/ST=NA/O=Ayon/CN=Avalon-After-Effects"
+
+XMLDSIG_NS = "http://www.w3.org/2000/09/xmldsig#"
+C14N_ALGORITHM = "http://www.w3.org/TR/2001/REC-xml-c14n-20010315"
+SHA256_ALGORITHM = "http://www.w3.org/2001/04/xmlenc#sha256"
+RSA_SHA1_ALGORITHM = "http://www.w3.org/2000/09/xmldsig#rsa-sha1"
+
+# elements are written in canonical form (no self closing tags), namespace
+#   is added to top element of signed part when it is canonicalized
+REFERENCE_TEMPLATE = (
+    '<Reference URI="{uri}">'
+    '<DigestMethod Algorithm="' + SHA256_ALGORITHM + '"></DigestMethod>'
+    '<DigestValue>{digest}</DigestValue>'
+    '</Reference>'
+)
+MANIFEST_TEMPLATE = (
+    '<Manifest{ns} Id="PackageContents">\n{references}</Manifest>'
+)
+SIGNED_INFO_TEMPLATE = (
+    '<SignedInfo{ns}>\n'
+    '<CanonicalizationMethod Algorithm="' + C14N_ALGORITHM + '">'
+    '</CanonicalizationMethod>\n'
+    '<SignatureMethod Algorithm="' + RSA_SHA1_ALGORITHM + '">'
+    '</SignatureMethod>\n'
+    '<Reference Type="' + XMLDSIG_NS + 'Manifest" URI="#PackageContents">\n'
+    '<Transforms>\n'
+    '<Transform Algorithm="' + C14N_ALGORITHM + '"></Transform>\n'
+    '</Transforms>\n'
+    '<DigestMethod Algorithm="' + SHA256_ALGORITHM + '"></DigestMethod>\n'
+    '<DigestValue>{digest}</DigestValue>\n'
+    '</Reference>\n'
+    '</SignedInfo>'
+)
+SIGNATURES_TEMPLATE = (
+    '<signatures>\n'
+    '<Signature xmlns="' + XMLDSIG_NS + '" Id="PackageSignature">\n'
+    '{signed_info}\n'
+    '<SignatureValue Id="PackageSignatureValue">{signature}'
+    '</SignatureValue>\n'
+    '\n'
+    '<KeyInfo>\n'
+    '<X509Data>\n'
+    '<X509Certificate>{certificate}</X509Certificate>\n'
+    '</X509Data>\n'
+    '</KeyInfo>\n'
+    '<Object>\n'
+    '{manifest}\n'
+    '</Object>\n'
+    '</Signature>\n'
+    '</signatures>'
+)
+
+
+def _sort_key(path):
+    return path.lower()
+
+
+def get_extension_files(extension_dir):
+    """Relative paths of files to package, sorted same as by ZXPSignCmd."""
+    file_paths = []
+    for root, dir_names, file_names in os.walk(extension_dir):
+        dir_names[:] = [
+            dir_name
+            for dir_name in dir_names
+            if dir_name not in ("META-INF", "__pycache__")
+        ]
+        for file_name in file_names:
+            path = os.path.join(root, file_name)
+            file_paths.append(
+                os.path.relpath(path, extension_dir).replace("\\", "/")
+            )
+    return sorted(file_paths, key=_sort_key)
+
+
+def _digest(content):
+    return base64.b64encode(hashlib.sha256(content).digest()).decode()
+
+
+def _wrap_base64(content, width=64):
+    return "\n".join(
+        content[idx:idx + width] for idx in range(0, len(content), width)
+    )
+
+
+def build_manifest(extension_dir, file_paths, ns=""):
+    references = [
+        REFERENCE_TEMPLATE.format(uri="mimetype", digest=_digest(MIMETYPE))
+    ]
+    for file_path in file_paths:
+        with open(os.path.join(extension_dir, file_path), "rb") as stream:
+            content = stream.read()
+        references.append(
+            REFERENCE_TEMPLATE.format(uri=file_path, digest=_digest(content))
+        )
+    return MANIFEST_TEMPLATE.format(ns=ns, references="".join(references))
+
+
+def _run_openssl(*args, input_data=None):
+    process = subprocess.run(
+        ["openssl", *args],
+        input=input_data,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(
+            "openssl {} failed: {}".format(
+                args[0], process.stderr.decode(errors="replace")
+            )
+        )
+    return process.stdout
+
+
+def create_self_signed_certificate(tmp_dir):
+    key_path = os.path.join(tmp_dir, "key.pem")
+    cert_path = os.path.join(tmp_dir, "cert.pem")
+    _run_openssl(
+        "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+        "-days", "3650",
+        "-subj", SELF_SIGNED_SUBJECT,
+        "-keyout", key_path,
+        "-out", cert_path,
+    )
+    return key_path, cert_path
+
+
+def read_certificate(cert_path):
+    """Base64 content of PEM certificate."""
+    with open(cert_path, "r") as stream:
+        lines = [
+            line.strip()
+            for line in stream
+            if line.strip() and not line.startswith("-----")
+        ]
+    return _wrap_base64("".join(lines)) + "\n"
+
+
+def build_signatures(extension_dir, file_paths, key_path, cert_path):
+    """Content of 'META-INF/signatures.xml'."""
+    canonical_manifest = build_manifest(
+        extension_dir, file_paths, ns=' xmlns="{}"'.format(XMLDSIG_NS)
+    )
+    signed_info_digest = _digest(canonical_manifest.encode("utf-8"))
+    canonical_signed_info = SIGNED_INFO_TEMPLATE.format(
+        ns=' xmlns="{}"'.format(XMLDSIG_NS), digest=signed_info_digest
+    )
+    signature = _run_openssl(
+        "dgst", "-sha1", "-sign", key_path,
+        input_data=canonical_signed_info.encode("utf-8"),
+    )
+    return SIGNATURES_TEMPLATE.format(
+        signed_info=SIGNED_INFO_TEMPLATE.format(
+            ns="", digest=signed_info_digest
+        ),
+        signature=_wrap_base64(base64.b64encode(signature).decode()),
+        certificate=read_certificate(cert_path),
+        manifest=build_manifest(extension_dir, file_paths),
+    )
+
+
+def build_extension(extension_dir, output_path, key_path=None,
+                    cert_path=None):
+    file_paths = get_extension_files(extension_dir)
+    tmp_dir = tempfile.mkdtemp(prefix="ayon_ae_zxp")
+    try:
+        if not key_path or not cert_path:
+            key_path, cert_path = create_self_signed_certificate(tmp_dir)
+        signatures = build_signatures(
+            extension_dir, file_paths, key_path, cert_path
+        )
+
+        entries = {
+            SIGNATURES_PATH: signatures.encode("utf-8"),
+            "mimetype": MIMETYPE,
+        }
+        for file_path in file_paths:
+            with open(os.path.join(extension_dir, file_path), "rb") as stream:
+                entries[file_path] = stream.read()
+        dir_paths = set()
+        for path in entries:
+            parts = path.split("/")[:-1]
+            for idx in range(1, len(parts) + 1):
+                dir_paths.add("/".join(parts[:idx]) + "/")
+
+        tmp_zxp = os.path.join(tmp_dir, os.path.basename(output_path))
+        with zipfile.ZipFile(tmp_zxp, "w") as zip_file:
+            for path in sorted(set(entries) | dir_paths, key=_sort_key):
+                if path in dir_paths:
+                    zip_file.writestr(path, b"")
+                    continue
+                compress_type = zipfile.ZIP_DEFLATED
+                if path == "mimetype":
+                    compress_type = zipfile.ZIP_STORED
+                zip_file.writestr(
+                    path, entries[path], compress_type=compress_type
+                )
+        shutil.move(tmp_zxp, output_path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--source", default=EXTENSION_DIR)
+    parser.add_argument("--output", default=ZXP_PATH)
+    parser.add_argument("--key", help="PEM private key")
+    parser.add_argument("--cert", help="PEM certificate of '--key'")
+    args = parser.parse_args()
+
+    build_extension(args.source, args.output, args.key, args.cert)
+    print("Extension built to {}".format(args.output))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,607 @@
+"""Mock of AYON CEP panel running in After Effects.
+
+Implements 'AfterEffects.*' routes of 'api/extension/js/main.js' (and JSX
+functions behind them) in pure Python against in-memory synthetic project,
+so RPC layer, stub, host and plugins could be exercised without After
+Effects.
+
+'MockCEPClient.call' has same signature as 'call' of WSRPC client, so it is
+used as connected client of 'AfterEffectsServerStub'.
+
+Example:
+    project = SyntheticProject.build(comps=100, footages=1000)
+    with mock_client_connected(MockCEPClient(project)):
+        stub = get_stub()
+        items = stub.get_items(comps=True)
+"""
+import os
+import re
+import json
+import time
+import uuid
+import socket
+import asyncio
+import contextlib
+
+from ayon_core.pipeline import AYON_CONTAINER_ID, AYON_INSTANCE_ID
+
+from ayon_aftereffects.api.lib import get_extension_manifest_path
+from ayon_aftereffects.api.webserver import WebServerTool
+from ayon_aftereffects.api.ws_stub import AfterEffectsServerStub
+from ayon_aftereffects.api.project_state import apply_metadata_patches
+from ayon_aftereffects.api.metadata_format import COMPRESSED_PREFIX
+
+SESSION_ID = uuid.uuid4().hex[:8]
+
+
+def get_source_extension_version():
+    """'ExtensionBundleVersion' of extension sources mocked here."""
+    with open(get_extension_manifest_path()) as stream:
+        found = re.search(
+            r'ExtensionBundleVersion="([0-9\.]+)"', stream.read()
+        )
+    return found.group(1) if found else None
+
+
+def _prepare_single_value(value):
+    return json.dumps({"result": value})
+
+
+def _prepare_error(error_msg):
+    return json.dumps({"error": error_msg})
+
+
+class SyntheticProject(object):
+    """In-memory model of AE project.
+
+    Items are dicts with same keys as returned by 'getItems' and
+    'getCompProperties'. Render queue items are dicts with 'comp_id' and
+    'file_name'. Metadata are kept as text, same as in 'xmp:Label'.
+    """
+    def __init__(self, path="/synthetic/project.aep"):
+        self.path = path
+        self.items = {}
+        self.render_queue = []
+        self.label = None
+        self.selection = []
+        self.generation = 0
+        self._next_id = 1
+
+    @classmethod
+    def build(
+        cls,
+        comps=10,
+        footages=100,
+        folders=0,
+        render_items=None,
+        metadata_padding=0,
+    ):
+        """Create project with containers and render instances.
+
+        Args:
+            comps (int): count of compositions
+            footages (int): count of loaded footages, each has container
+            folders (int): count of folders
+            render_items (int): count of compositions in render queue with
+                publishable instance, all comps by default
+            metadata_padding (int): count of characters added to each
+                metadata entry to simulate larger metadata
+        """
+        project = cls()
+        if render_items is None:
+            render_items = comps
+
+        comp_ids = []
+        for idx in range(comps):
+            comp = project.add_item(f"comp_{idx:05d}", "comp")
+            comp_ids.append(comp["id"])
+
+        for idx in range(folders):
+            project.add_item(f"folder_{idx:05d}", "folder")
+
+        metadata = []
+        padding = "x" * metadata_padding
+        for idx in range(footages):
+            containing_comps = []
+            if comp_ids:
+                containing_comps.append(comp_ids[idx % len(comp_ids)])
+            footage = project.add_item(
+                f"▼folder_{idx:05d}_imageMain",
+                "footage",
+                path=f"/synthetic/footage/footage_{idx:05d}.png",
+                containing_comps=containing_comps,
+            )
+            container = {
+                "schema": "ayon:container-3.0",
+                "id": AYON_CONTAINER_ID,
+                "name": "imageMain",
+                "namespace": f"folder_{idx:05d}_imageMain",
+                "loader": "FileLoader",
+                "representation": uuid.uuid4().hex,
+                "members": [str(footage["id"])],
+            }
+            if padding:
+                container["padding"] = padding
+            metadata.append(container)
+
+        for idx, comp_id in enumerate(comp_ids[:render_items]):
+            project.render_queue.append({
+                "comp_id": comp_id,
+                "file_name": (
+                    f"/synthetic/renders/comp_{idx:05d}/"
+                    f"comp_{idx:05d}_[#####].png"
+                ),
+            })
+            instance = {
+                "id": AYON_INSTANCE_ID,
+                "instance_id": uuid.uuid4().hex,
+                "creator_identifier": "render",
+                "productType": "render",
+                "productBaseType": "render",
+                "productName": f"renderComp{idx:05d}",
+                "folderPath": "/synthetic/shot",
+                "task": "comp",
+                "variant": f"Comp{idx:05d}",
+                "active": True,
+                "members": [str(comp_id)],
+                "creator_attributes": {
+                    "render_target": "farm",
+                    "mark_for_review": False,
+                },
+                "publish_attributes": {},
+            }
+            if padding:
+                instance["padding"] = padding
+            metadata.append(instance)
+
+        project.label = json.dumps(metadata, indent=4)
+        return project
+
+    def add_item(self, name, item_type, path="", containing_comps=None):
+        item_id = self._next_id
+        self._next_id += 1
+        item = {
+            "id": item_id,
+            "name": name,
+            "type": item_type,
+            "path": path,
+            "containing_comps": list(containing_comps or []),
+        }
+        if item_type == "comp":
+            item.update({
+                "frameStart": 1001,
+                "framesDuration": 100,
+                "frameRate": 25.0,
+                "width": 1920,
+                "height": 1080,
+                "pixelAspect": 1.0,
+            })
+        self.items[item_id] = item
+        return item
+
+    def bump_generation(self):
+        self.generation += 1
+
+    def get_generation_stamp(self):
+        return "{}:{}:{}:{}".format(
+            SESSION_ID, self.generation, len(self.items), self.path
+        )
+
+
+class MockCEPClient(object):
+    """Answers 'AfterEffects.*' routes same way as CEP panel in AE.
+
+    Args:
+        project (SyntheticProject): project routes are answered from
+        latency (float): seconds added to each call, simulates round trip
+        extension_version (str): reported version of extension, version
+            of extension sources if not provided, older version makes stub
+            use legacy routes
+    """
+    def __init__(self, project, latency=0.0, extension_version=None):
+        self.project = project
+        self.latency = latency
+        self.extension_version = (
+            extension_version or get_source_extension_version()
+        )
+        self.calls = []
+
+    async def call(self, method_name, **kwargs):
+        self.calls.append(method_name)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        route_name = method_name.split(".", 1)[-1]
+        handler = getattr(self, f"route_{route_name}", None)
+        if handler is None:
+            raise ValueError(f"Route '{method_name}' is not implemented")
+        return handler(**kwargs)
+
+    # routes
+    def route_ping(self):
+        return None
+
+    def route_open(self, path):
+        self.project.bump_generation()
+        self.project.path = path
+        return _prepare_single_value(True)
+
+    def route_get_metadata(self):
+        if self.project.label is None:
+            return _prepare_single_value([])
+        return self.project.label
+
+    def route_get_project_generation(self):
+        return _prepare_single_value(self.project.get_generation_stamp())
+
+    def route_imprint(self, payload):
+        self.project.bump_generation()
+        self.project.label = payload
+        return None
+
+    def route_imprint_patches(self, patches):
+        project = self.project
+        previous_generation = project.get_generation_stamp()
+        project.bump_generation()
+        label = project.label
+        if label and label.startswith(COMPRESSED_PREFIX):
+            return _prepare_single_value({"encoded": True})
+        entries = json.loads(label) if label else []
+        entries = apply_metadata_patches(entries, patches)
+
+        cleaned = []
+        pruned = 0
+        for entry in entries:
+            members = entry.get("members")
+            if members and int(members[0]) not in project.items:
+                pruned += 1
+                continue
+            cleaned.append(entry)
+        project.label = json.dumps(
+            cleaned, separators=(",", ":"), ensure_ascii=False
+        )
+        return _prepare_single_value({
+            "previous_generation": previous_generation,
+            "generation": project.get_generation_stamp(),
+            "pruned": pruned,
+        })
+
+    def route_get_active_document_name(self):
+        return _prepare_single_value(os.path.basename(self.project.path))
+
+    def route_get_active_document_full_name(self):
+        return _prepare_single_value(self.project.path)
+
+    def route_add_item(self, name, item_type):
+        self.project.bump_generation()
+        if item_type not in {"COMP", "FOLDER"}:
+            return _prepare_error("Only 'COMP' or 'FOLDER' can be created")
+        item = self.project.add_item(name, item_type.lower())
+        return _prepare_single_value(item["id"])
+
+    def route_get_items(
+        self, comps, folders=False, footages=False, fields=None, ids=None
+    ):
+        if ids:
+            items = [
+                self.project.items[int(item_id)]
+                for item_id in ids
+                if int(item_id) in self.project.items
+            ]
+        else:
+            items = self.project.items.values()
+        return json.dumps(
+            self._filter_items(items, comps, folders, footages, fields)
+        )
+
+    def route_select_items(self, items):
+        self.project.selection = [
+            item_id for item_id in items if item_id in self.project.items
+        ]
+        return None
+
+    def route_get_selected_items(
+        self, comps, folders=False, footages=False, fields=None
+    ):
+        items = [
+            self.project.items[item_id]
+            for item_id in self.project.selection
+            if item_id in self.project.items
+        ]
+        return json.dumps(
+            self._filter_items(items, comps, folders, footages, fields)
+        )
+
+    def route_import_file(self, path, item_name, import_options=None):
+        self.project.bump_generation()
+        item = self.project.add_item(item_name, "footage", path=path)
+        return json.dumps({"name": item["name"], "id": item["id"]})
+
+    def route_replace_item(self, item_id, path, item_name):
+        self.project.bump_generation()
+        item = self.project.items.get(int(item_id))
+        if not item:
+            return _prepare_error("There is no item with " + str(item_id))
+        item["path"] = path
+        item["name"] = item_name
+        return _prepare_single_value(True)
+
+    def route_import_background(self, comp_id, comp_name, files):
+        self.project.bump_generation()
+        if comp_id:
+            return _prepare_error("Import to existing comp is not mocked")
+        folder = self.project.add_item(comp_name, "folder")
+        comp = self.project.add_item(comp_name, "comp")
+        comp["parent_id"] = folder["id"]
+        members = [folder["id"], comp["id"]]
+        for path in files:
+            members.append(
+                self._add_background_footage(path, folder, comp)["id"])
+        return json.dumps(
+            {"name": comp["name"], "id": folder["id"], "members": members}
+        )
+
+    def route_reload_background(
+        self, comp_id, comp_name, files, unchanged_files=None
+    ):
+        project = self.project
+        project.bump_generation()
+        comp = project.items[int(comp_id)]
+        folder = project.items[comp["parent_id"]]
+        comp["name"] = folder["name"] = comp_name
+        unchanged_files = unchanged_files or []
+
+        existing_by_name = {
+            item["name"]: item
+            for item in project.items.values()
+            if item.get("parent_id") == folder["id"]
+            and item["type"] == "footage"
+        }
+        members = [folder["id"], comp["id"]]
+        new_names = set()
+        for path in files:
+            name = _get_file_name(path)
+            new_names.add(name)
+            item = existing_by_name.get(name)
+            if item is None:
+                item = self._add_background_footage(path, folder, comp)
+            elif path not in unchanged_files:
+                item["path"] = path
+            members.append(item["id"])
+
+        for name, item in existing_by_name.items():
+            if name not in new_names:
+                project.items.pop(item["id"])
+        return json.dumps(
+            {"name": comp["name"], "id": folder["id"], "members": members}
+        )
+
+    def _add_background_footage(self, path, folder, comp):
+        item = self.project.add_item(
+            _get_file_name(path),
+            "footage",
+            path=path,
+            containing_comps=[comp["id"]],
+        )
+        item["parent_id"] = folder["id"]
+        return item
+
+    def route_rename_item(self, item_id, item_name):
+        self.project.bump_generation()
+        item = self.project.items.get(int(item_id))
+        if not item:
+            return _prepare_error("There is no item with " + str(item_id))
+        item["name"] = item_name
+        return _prepare_single_value(True)
+
+    def route_delete_item(self, item_id):
+        self.project.bump_generation()
+        self.project.items.pop(int(item_id), None)
+        return _prepare_single_value(True)
+
+    def route_set_label_color(self, item_id, color_idx):
+        return None
+
+    def route_get_comp_properties(self, item_id):
+        comp = self.project.items.get(int(item_id))
+        if not comp:
+            return _prepare_error(f"There is no composition with {item_id}")
+        return json.dumps({
+            key: comp.get(key)
+            for key in (
+                "id", "name", "frameStart", "framesDuration", "frameRate",
+                "width", "height", "pixelAspect"
+            )
+        })
+
+    def route_set_comp_properties(self, item_id, start, duration,
+                                  frame_rate, width, height):
+        comp = self.project.items.get(int(item_id))
+        if not comp:
+            return _prepare_error(f"There is no composition with {item_id}")
+        comp.update({
+            "frameStart": start,
+            "framesDuration": duration,
+            "frameRate": frame_rate,
+            "width": width,
+            "height": height,
+        })
+        return None
+
+    def route_get_render_info(self, comp_id):
+        comp = self.project.items.get(int(comp_id))
+        if not comp:
+            return _prepare_error(
+                f"Composition with '{comp_id}' wasn't found! "
+                "Recreate publishable instance(s)"
+            )
+        render_items = [
+            render_item
+            for render_item in self.project.render_queue
+            if render_item["comp_id"] == comp["id"]
+        ]
+        if len(render_items) > 1:
+            return _prepare_error(
+                "There cannot be more items in Render Queue for "
+                f"'{comp['name']}'!"
+            )
+        if not render_items:
+            return _prepare_error(
+                f"There is no item in Render Queue for '{comp['name']}'! "
+                "Add composition to Render Queue."
+            )
+        return json.dumps([{
+            "file_name": render_items[0]["file_name"],
+            "width": comp["width"],
+            "height": comp["height"],
+        }])
+
+    def route_get_render_instances_info(self, comp_ids):
+        render_items_by_comp = {}
+        for render_item in self.project.render_queue:
+            render_items_by_comp.setdefault(
+                render_item["comp_id"], []).append(render_item)
+
+        result = {}
+        for comp_id in comp_ids:
+            comp = self.project.items.get(int(comp_id))
+            if not comp or comp.get("type") != "comp":
+                result[comp_id] = {"comp": None, "render_queue": []}
+                continue
+            info = {
+                "comp": {
+                    key: comp.get(key)
+                    for key in (
+                        "id", "name", "frameStart", "framesDuration",
+                        "frameRate", "width", "height", "pixelAspect"
+                    )
+                },
+                "render_queue": [],
+            }
+            render_items = render_items_by_comp.get(comp["id"], [])
+            if len(render_items) > 1:
+                info["error"] = (
+                    "There cannot be more items in Render Queue for "
+                    f"'{comp['name']}'!"
+                )
+            elif not render_items:
+                info["error"] = (
+                    f"There is no item in Render Queue for '{comp['name']}'!"
+                    " Add composition to Render Queue."
+                )
+            else:
+                info["render_queue"].append({
+                    "file_name": render_items[0]["file_name"],
+                    "width": comp["width"],
+                    "height": comp["height"],
+                })
+            result[comp_id] = info
+        return json.dumps(result)
+
+    def route_get_audio_url(self, item_id):
+        return _prepare_single_value("")
+
+    def route_add_comp_to_render_queue(self, comp_id, output_path=None):
+        self.project.render_queue.append({
+            "comp_id": int(comp_id),
+            "file_name": output_path or "",
+        })
+        return _prepare_single_value(True)
+
+    def route_remove_comp_from_render_queue(self, comp_id):
+        self.project.render_queue = [
+            render_item
+            for render_item in self.project.render_queue
+            if render_item["comp_id"] != int(comp_id)
+        ]
+        return _prepare_single_value(True)
+
+    def route_save(self):
+        return _prepare_single_value(True)
+
+    def route_saveAs(self, image_path, as_copy):
+        self.project.bump_generation()
+        if not as_copy:
+            self.project.path = image_path
+        return _prepare_single_value(True)
+
+    def route_get_extension_version(self):
+        return _prepare_single_value(self.extension_version)
+
+    def route_get_app_version(self):
+        return _prepare_single_value("25.0.0")
+
+    def route_print_msg(self, msg):
+        return None
+
+    def route_close(self):
+        return None
+
+    def route_batch(self, operations):
+        results = []
+        for operation in operations:
+            handler = getattr(self, f"route_{operation['method']}", None)
+            if handler is None:
+                results.append(_prepare_error(
+                    f"Unknown batch operation '{operation['method']}'"))
+                continue
+            try:
+                results.append(handler(**operation.get("args") or {}))
+            except Exception as exc:
+                results.append(_prepare_error(str(exc)))
+        return json.dumps(results)
+
+    @staticmethod
+    def _filter_items(items, comps, folders, footages, fields):
+        allowed_types = set()
+        if comps:
+            allowed_types.add("comp")
+        if folders:
+            allowed_types.add("folder")
+        if footages:
+            allowed_types.add("footage")
+
+        result = []
+        for item in items:
+            if item["type"] not in allowed_types:
+                continue
+            result.append({
+                key: item[key]
+                for key in ("id", "name", "type", "path", "containing_comps")
+                if key == "id" or not fields or key in fields
+            })
+        return result
+
+
+def _get_file_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _get_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def mock_client_connected(client):
+    """Run webserver loop and use 'client' as connected CEP panel.
+
+    Args:
+        client (MockCEPClient): answers all calls made through stub
+    """
+    os.environ.setdefault(
+        "WEBSOCKET_URL", "ws://localhost:{}/ws/".format(_get_free_port())
+    )
+    server = WebServerTool.get_instance()
+    server.start_server()
+    while server.webserver_thread.loop is None:
+        time.sleep(0.01)
+
+    original_get_client = AfterEffectsServerStub.__dict__["get_client"]
+    AfterEffectsServerStub.get_client = staticmethod(lambda: client)
+    AfterEffectsServerStub._state_cache.invalidate()
+    try:
+        yield client
+    finally:
+        AfterEffectsServerStub.get_client = original_get_client
+        AfterEffectsServerStub._state_cache.invalidate()